@@ -4,11 +4,16 @@ import sys
 import os
 import socket
 import re
-import subprocess
 import hashlib
 import logging
 import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from src.downloader import Downloader
+from src.multipart import MultipartParser, parse_boundary
+from src.metadata import MetadataStore
+from src.detection_queue import MediaDetectionQueue
 
 # Configure logging
 logging.basicConfig(
@@ -22,39 +27,24 @@ sys.path.append(installpath + '/python')
 
 HOST = ''
 PORT = 8282
-
-for arg in sys.argv:
-    arg_arr = arg.rsplit('=', 1)
-    
-    if len(arg_arr) == 2:
-        if arg_arr[0] == "ip":
-            HOST = arg_arr[1]
-        elif arg_arr[0] == "port":
-            try:
-                PORT = int(arg_arr[1])
-            except ValueError:
-                logger.error(f"Invalid port number: {arg_arr[1]}")
-                PORT = 8282
-
-try:
-    listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    listen_socket.bind((HOST, PORT))
-    listen_socket.listen(1)
-except socket.error as e:
-    logger.error(f"Socket error: {e}")
-    sys.exit(1)
+WORKERS = 16   # Worker threads handling requests concurrently
+BACKLOG = 64   # Pending connections queued by the kernel
+CLIENT_TIMEOUT = 30     # Seconds a worker waits on a silent client
+ACCEPT_TIMEOUT = 1.0    # Accept loop wakes up this often to check server_running
+KEEPALIVE_TIMEOUT = 5   # Seconds an idle keep-alive connection stays open
+KEEPALIVE_MAX_REQUESTS = 1000
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 16 * 1024 * 1024
+MAX_UPLOAD_SIZE = 256 * 1024 * 1024   # Streamed to disk, not held in memory
+MAX_BATCH_FILES = 500
+EVENTS_HEARTBEAT = 15   # Seconds between SSE keep-alive comments
 
 scriptPath = os.path.abspath(os.path.dirname(sys.argv[0]))  # script path
 scriptParent = os.path.abspath(os.path.join(scriptPath, os.pardir))  # parent path
 
-# Initialize SFDL Downloader
-config_file = os.path.join(scriptPath, '.env')
-status_file = os.path.join(scriptPath, 'static', 'status.json')
-downloader = Downloader(config_file, status_file)
-
-# Create initial status.json if it doesn't exist
-downloader.update_status(status='idle', action='done', sfdl_name='')
+# Created in main(), the module is also imported by worker processes
+downloader = None
+detection_queue = None
 
 # Load password hashes from config
 def load_config_passwords():
@@ -104,10 +94,44 @@ def verify_password(password, password_type):
     password_hash = hashlib.sha256(password.encode()).hexdigest()
     return password_hash == PASSWORD_HASHES[password_type]
 
-if not HOST:
-    print(f'✓ Webserver auf Port {PORT} gestartet!')
-else:
-    print(f'✓ Webserver mit IP {HOST} und Port {PORT} gestartet!')
+def build_response(status, body=b'', content_type='application/json', headers=None):
+    """Build a complete HTTP/1.1 response with CRLF header framing and Content-Length"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    
+    header_lines = [
+        f'HTTP/1.1 {status}',
+        f'Content-Type: {content_type}',
+        f'Content-Length: {len(body)}'
+    ]
+    for name, value in (headers or {}).items():
+        header_lines.append(f'{name}: {value}')
+    
+    return ('\r\n'.join(header_lines) + '\r\n\r\n').encode('utf-8') + body
+
+def json_response(status, data, headers=None):
+    """Build a JSON response"""
+    return build_response(status, json.dumps(data), 'application/json', headers)
+
+def html_error_response(status, message):
+    """Build a small HTML error page"""
+    code = status.split(' ', 1)[0]
+    body = f"<html><head><title>{code}</title></head><body><h1>{code} - {message}</h1></body></html>\n"
+    return build_response(status, body, 'text/html; charset=utf-8')
+
+def cgi_response(data, default_content_type):
+    """Turn php-cgi output (CGI headers + body) into a framed HTTP response"""
+    content_type = default_content_type
+    head, sep, body = data.replace('\r\n', '\n').partition('\n\n')
+    if not sep:
+        return build_response('200 OK', data, content_type)
+    
+    for line in head.split('\n'):
+        name, _, value = line.partition(':')
+        if name.strip().lower() == 'content-type':
+            content_type = value.strip()
+    
+    return build_response('200 OK', body, content_type)
 
 def post_file(file, req):
     """Handle POST requests"""
@@ -133,14 +157,13 @@ def post_file(file, req):
             if file_ext == "php":
                 cmd = f'CONTENT_LENGTH=1000; php-cgi -c "{scriptPath}" "{scriptPath}/status/{file} {req}"'
                 data = os.popen(cmd).read()
-                output = "HTTP/1.1 200 OK\nContent-Type: application/octet-stream\n" + data
-                return output.encode('utf-8')
+                return cgi_response(data, 'application/octet-stream')
         
-        return b"HTTP/1.1 404 Not Found\r\n\r\n"
+        return build_response('404 Not Found', b'', 'text/plain')
     
     except Exception as e:
         logger.error(f"Error in post_file: {e}")
-        return b"HTTP/1.1 500 Internal Server Error\r\n\r\n"
+        return build_response('500 Internal Server Error', b'', 'text/plain')
 
 def load_file(file):
     """Load and serve static files"""
@@ -183,172 +206,239 @@ def load_file(file):
             if file_ext == "php":
                 cmd = f'php-cgi -c "{scriptPath}" "{scriptPath}/status/{file}"'
                 data = os.popen(cmd).read()
-                output = "HTTP/1.1 200 OK\n" + data
-            else:
-                with open(file_path, 'r', encoding='utf-8') as htmlfile:
-                    data = htmlfile.read()
-                
-                output = f"HTTP/1.1 200 OK\n{content}\r\n\n{data}"
+                return cgi_response(data, content)
+            
+            # Read as bytes so Content-Length matches what goes over the wire
+            with open(file_path, 'rb') as static_file:
+                data = static_file.read()
             
-            return output.encode('utf-8')
+            return build_response('200 OK', data, content)
         
         else:
-            error_response = """HTTP/1.1 404 Not Found
-Content-Type: text/html; charset=utf-8\r\n
-<html><head><title>404</title></head><body><h1>404 - Seite nicht gefunden!</h1></body></html>
-"""
-            return error_response.encode('utf-8')
+            return html_error_response('404 Not Found', 'Seite nicht gefunden!')
     
     except Exception as e:
         logger.error(f"Error in load_file: {e}")
-        error_response = """HTTP/1.1 500 Internal Server Error
-Content-Type: text/html; charset=utf-8\r\n
-<html><head><title>500</title></head><body><h1>500 - Interner Serverfehler!</h1></body></html>
-"""
-        return error_response.encode('utf-8')
-
-def upload_sfdl(req):
-    """Upload SFDL file to files directory"""
+        return html_error_response('500 Internal Server Error', 'Interner Serverfehler!')
+
+def status_response(request):
+    """Serve the downloader's in-memory status snapshot, 304 if the client already has this version"""
+    snapshot = downloader.get_status_snapshot()
+    etag = f'"{snapshot.version}"'
+    headers = {'Cache-Control': 'no-cache', 'ETag': etag}
+    
+    if request['headers'].get('if-none-match') == etag:
+        return build_response('304 Not Modified', b'', 'application/json', headers)
+    return build_response('200 OK', snapshot.body, 'application/json', headers)
+
+def status_delta(previous, current):
+    """Fields of the status entry that changed between two snapshots"""
+    old_entry = previous.data['data'][0]
+    new_entry = current.data['data'][0]
+    changes = {key: value for key, value in new_entry.items() if old_entry.get(key) != value or key not in old_entry}
+    removed = [key for key in old_entry if key not in new_entry]
+    return {'changes': changes, 'removed': removed}
+
+def sse_event(event, version, data):
+    """Encode one Server-Sent Event"""
+    return f"id: {version}\nevent: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+
+def stream_events(client_connection):
+    """Push status changes to the client as Server-Sent Events until it disconnects
+    
+    The first event carries the full status, after that only changed fields are sent.
+    """
+    global active_event_streams
+    with connections_lock:
+        if active_event_streams >= MAX_EVENT_STREAMS:
+            # Client falls back to polling status.json
+            client_connection.sendall(add_connection_header(
+                build_response('503 Service Unavailable', b'', 'text/plain', {'Retry-After': '30'}), False))
+            return
+        active_event_streams += 1
+    
     try:
-        # Extract boundary from Content-Type header
-        boundary_match = re.search(r'boundary=([^\r\n]+)', req)
-        if not boundary_match:
-            error_data = {"error": "No boundary found in multipart request"}
-            error_response = f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-"""
-            return error_response.encode('utf-8')
-        
-        boundary = boundary_match.group(1).strip()
-        
-        # Extract file content from multipart data
-        parts = req.split(f'--{boundary}')
-        
-        filename = None
-        file_content = None
-        
-        for part in parts:
-            if 'Content-Disposition' in part and 'filename' in part:
-                # Extract filename
-                filename_match = re.search(r'filename="([^"]+)"', part)
-                if filename_match:
-                    filename = filename_match.group(1)
-                    
-                    # Extract content (after double newline)
-                    content_start = part.find('\r\n\r\n')
-                    if content_start != -1:
-                        file_content = part[content_start+4:].strip()
-                        # Remove trailing boundary markers
-                        if file_content.endswith('--'):
-                            file_content = file_content[:-2].strip()
+        client_connection.sendall((
+            'HTTP/1.1 200 OK\r\n'
+            'Content-Type: text/event-stream\r\n'
+            'Cache-Control: no-cache\r\n'
+            'Connection: keep-alive\r\n'
+            'X-Accel-Buffering: no\r\n\r\n'
+            'retry: 2000\n\n'
+        ).encode('utf-8'))
+        
+        snapshot = downloader.get_status_snapshot()
+        client_connection.sendall(sse_event('status', snapshot.version, snapshot.data))
+        
+        while server_running:
+            current = downloader.wait_for_status(snapshot.version, timeout=EVENTS_HEARTBEAT)
+            if current.version == snapshot.version:
+                # Comment line keeps proxies from closing the stream and detects gone clients
+                client_connection.sendall(b': ping\n\n')
+                continue
+            
+            client_connection.sendall(sse_event('delta', current.version, status_delta(snapshot, current)))
+            snapshot = current
+    
+    except (OSError, socket.timeout):
+        # Client went away
+        pass
+    finally:
+        with connections_lock:
+            active_event_streams -= 1
+
+def get_files_dir():
+    """Upload directory from FILES_DIR in .env (default: ../uploads)"""
+    files = os.path.join(scriptParent, 'uploads')
+    if os.path.exists(os.path.join(scriptPath, '.env')):
+        with open(os.path.join(scriptPath, '.env'), 'r') as f:
+            for line in f:
+                if 'FILES_DIR=' in line:
+                    # Remove comments and extract path
+                    path = line.split('=', 1)[1].split('#')[0].strip().strip('"')
+                    # Replace $pwd with scriptParent
+                    path = path.replace('$pwd', scriptParent)
+                    if os.path.isabs(path):
+                        files = path
                     break
-        
-        if not filename or not file_content:
-            error_data = {"error": "No file uploaded"}
-            error_response = f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
+    return files
+
+def sfdl_filename(filename):
+    """Safe file name for an uploaded SFDL (no directories, .sfdl extension)"""
+    filename = os.path.basename(filename.replace('\\', '/')).strip()
+    if not filename.endswith('.sfdl'):
+        filename += '.sfdl'
+    return filename
+
+def receive_multipart_files(request, body_chunks, files, max_files=1):
+    """Stream the file parts of a multipart request into temporary files in the upload directory
+    
+    Returns a list of (filename, temp_path) for every non-empty file part, up to max_files.
+    """
+    boundary = parse_boundary(request['headers'].get('content-type', ''))
+    if not boundary:
+        raise ValueError("No boundary found in multipart request")
+    
+    os.makedirs(files, exist_ok=True)
+    received = []
+    handles = []
+    
+    def on_file(field_name, filename):
+        if not filename or len(received) >= max_files:
+            return None
+        temp_path = os.path.join(files, f".upload-{threading.get_ident()}-{len(received)}.part")
+        received.append((sfdl_filename(filename), temp_path))
+        handle = open(temp_path, 'wb')
+        handles.append(handle)
+        return handle
+    
+    parser = MultipartParser(boundary, on_file)
+    try:
+        for chunk in body_chunks:
+            parser.feed(chunk)
+        parser.close()
+    except Exception:
+        # The part being written when the body broke off is still open
+        for handle in handles:
+            handle.close()
+        for _, temp_path in received:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        raise
+    
+    stored = []
+    for filename, temp_path in received:
+        if os.path.getsize(temp_path) > 0:
+            stored.append((filename, temp_path))
+        else:
+            os.remove(temp_path)
+    return stored
 
-{json.dumps(error_data)}
-"""
-            return error_response.encode('utf-8')
+def upload_sfdl(request, body_chunks):
+    """Upload SFDL file to files directory (multipart body is streamed to disk)"""
+    try:
+        started = time.monotonic()
+        files = get_files_dir()
         
-        # Ensure .sfdl extension
-        if not filename.endswith('.sfdl'):
-            filename += '.sfdl'
+        try:
+            uploaded = receive_multipart_files(request, body_chunks, files)
+        except ValueError as e:
+            error_data = {"error": str(e)}
+            return json_response('400 Bad Request', error_data)
         
-        # Load files path from config
-        files = os.path.join(scriptParent, 'uploads')
-        if os.path.exists(os.path.join(scriptPath, '.env')):
-            with open(os.path.join(scriptPath, '.env'), 'r') as f:
-                for line in f:
-                    if 'FILES_DIR=' in line:
-                        # Remove comments and extract path
-                        path = line.split('=', 1)[1].split('#')[0].strip().strip('"')
-                        # Replace $pwd with scriptParent
-                        path = path.replace('$pwd', scriptParent)
-                        if os.path.isabs(path):
-                            files = path
-                        break
-        
-        # Create directory if it doesn't exist
-        os.makedirs(files, exist_ok=True)
+        if not uploaded:
+            error_data = {"error": "No file uploaded"}
+            return json_response('400 Bad Request', error_data)
         
-        # Save file
+        filename, temp_path = uploaded[0]
+        
+        # Move into place only once the whole file arrived
         file_path = os.path.join(files, filename)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(file_content)
+        os.replace(temp_path, file_path)
         
-        print(f"✓ SFDL Datei hochgeladen: {filename} -> {file_path}")
-        logger.info(f"SFDL file uploaded: {filename} to {file_path}")
+        # Parsing and TMDB detection run in the background, /files shows "pending" meanwhile
+        detection_queue.submit(file_path, os.path.join(files, '.metadata.json'))
         
-        # Detect media type using TMDB
-        media_type = 'unknown'
-        try:
-            # Parse SFDL to get decrypted name
-            from src.downloader import Downloader
-            config_path = os.path.join(scriptPath, '.env')
-            status_file = os.path.join(scriptPath, 'static', 'status.json')
-            downloader = Downloader(config_path, status_file)
-            
-            # Parse SFDL (handles decryption)
-            sfdl_info = downloader.parse_sfdl(file_path)
-            if sfdl_info and sfdl_info.get('name'):
-                sfdl_name = sfdl_info['name']
-            else:
-                # Fallback to filename
-                sfdl_name = filename.replace('.sfdl', '').replace('.', ' ').replace('_', ' ')
-            
-            # Detect media type
-            media_info = downloader.detect_media_type(sfdl_name)
-            if isinstance(media_info, dict):
-                media_type = media_info.get('type', 'unknown')
-            else:
-                # Backwards compatibility
-                media_type = media_info
-                media_info = {'type': media_type}
-            
-            # Save metadata
-            metadata_file = os.path.join(files, '.metadata.json')
-            metadata = {}
-            if os.path.exists(metadata_file):
-                with open(metadata_file, 'r') as mf:
-                    metadata = json.load(mf)
-            
-            metadata[filename] = media_info
-            with open(metadata_file, 'w') as mf:
-                json.dump(metadata, mf, indent=2)
-            
-            print(f"  Media Type detected: {media_type}")
-        except Exception as e:
-            logger.error(f"Error detecting media type: {e}")
+        elapsed_ms = int((time.monotonic() - started) * 1000)
+        print(f"✓ SFDL Datei hochgeladen: {filename} -> {file_path} ({elapsed_ms} ms)")
+        logger.info(f"SFDL file uploaded: {filename} to {file_path} in {elapsed_ms} ms")
         
         # Use json module for proper escaping
         response_data = {
             "success": True,
             "filename": filename,
             "path": file_path,
-            "media_type": media_type,
-            "media_info": media_info
+            "media_type": "pending",
+            "media_info": {"type": "pending"}
         }
         
-        output = f"""HTTP/1.1 200 OK
-Content-Type: application/json\r\n
-
-{json.dumps(response_data)}
-"""
-        return output.encode('utf-8')
+        return json_response('200 OK', response_data)
     
     except Exception as e:
         logger.error(f"Error uploading SFDL: {e}")
         error_data = {"error": f"Failed to upload file: {str(e)}"}
-        error_response = f"""HTTP/1.1 500 Internal Server Error
-Content-Type: application/json\r\n
+        return json_response('500 Internal Server Error', error_data)
 
-{json.dumps(error_data)}
-"""
-        return error_response.encode('utf-8')
+def upload_sfdl_batch(request, body_chunks):
+    """Store many uploaded SFDL files at once, detection runs in the background"""
+    try:
+        files = get_files_dir()
+        
+        try:
+            uploaded = receive_multipart_files(request, body_chunks, files, max_files=MAX_BATCH_FILES)
+        except ValueError as e:
+            error_data = {"error": str(e)}
+            return json_response('400 Bad Request', error_data)
+        
+        if not uploaded:
+            error_data = {"error": "No file uploaded"}
+            return json_response('400 Bad Request', error_data)
+        
+        # Store everything first, then queue parsing and TMDB detection
+        stored = []
+        for filename, temp_path in uploaded:
+            file_path = os.path.join(files, filename)
+            os.replace(temp_path, file_path)
+            stored.append({"filename": filename, "path": file_path, "media_type": "pending"})
+        
+        metadata_file = os.path.join(files, '.metadata.json')
+        for entry in stored:
+            detection_queue.submit(entry['path'], metadata_file)
+        
+        print(f"✓ {len(stored)} SFDL Datei(en) hochgeladen, Erkennung läuft im Hintergrund")
+        logger.info(f"Batch upload: {len(stored)} SFDL files to {files}")
+        
+        response_data = {
+            "success": True,
+            "files": stored,
+            "count": len(stored)
+        }
+        return json_response('200 OK', response_data)
+    
+    except Exception as e:
+        logger.error(f"Error in batch upload: {e}")
+        error_data = {"error": f"Failed to upload files: {str(e)}"}
+        return json_response('500 Internal Server Error', error_data)
 
 def download_sfdl_url(req):
     """Download SFDL file from URL and save it"""
@@ -357,11 +447,7 @@ def download_sfdl_url(req):
         body_start = req.find('\r\n\r\n')
         if body_start == -1:
             error_data = {"error": "No request body found"}
-            return f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-""".encode('utf-8')
+            return json_response('400 Bad Request', error_data)
         
         body = req[body_start+4:].strip()
         try:
@@ -369,19 +455,11 @@ Content-Type: application/json\r\n
             url = data.get('url', '').strip()
         except json.JSONDecodeError:
             error_data = {"error": "Invalid JSON in request body"}
-            return f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-""".encode('utf-8')
+            return json_response('400 Bad Request', error_data)
         
         if not url:
             error_data = {"error": "No URL provided"}
-            return f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-""".encode('utf-8')
+            return json_response('400 Bad Request', error_data)
         
         # Extract filename from URL
         # Format: https://download.sfdl.net/enc/489151;Name;hash.32283
@@ -402,25 +480,10 @@ Content-Type: application/json\r\n
                 file_content = response.read().decode('utf-8')
         except Exception as e:
             error_data = {"error": f"Failed to download from URL: {str(e)}"}
-            return f"""HTTP/1.1 500 Internal Server Error
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-""".encode('utf-8')
+            return json_response('500 Internal Server Error', error_data)
         
         # Load files path from config
-        files = os.path.join(scriptParent, 'uploads')
-        if os.path.exists(os.path.join(scriptPath, '.env')):
-            with open(os.path.join(scriptPath, '.env'), 'r') as f:
-                for line in f:
-                    if 'FILES_DIR=' in line:
-                        path = line.split('=', 1)[1].split('#')[0].strip().strip('"')
-                        path = path.replace('$pwd', scriptParent)
-                        if os.path.isabs(path):
-                            files = path
-                        break
-        
-        # Create directory if it doesn't exist
+        files = get_files_dir()
         os.makedirs(files, exist_ok=True)
         
         # Save file
@@ -431,69 +494,23 @@ Content-Type: application/json\r\n
         print(f"✓ SFDL von URL heruntergeladen: {filename} -> {file_path}")
         logger.info(f"SFDL downloaded from URL: {url} to {file_path}")
         
-        # Detect media type using TMDB
-        media_type = 'unknown'
-        try:
-            from src.downloader import Downloader
-            config_path = os.path.join(scriptPath, '.env')
-            status_file = os.path.join(scriptPath, 'static', 'status.json')
-            downloader = Downloader(config_path, status_file)
-            
-            # Parse SFDL (handles decryption)
-            sfdl_info = downloader.parse_sfdl(file_path)
-            if sfdl_info and sfdl_info.get('name'):
-                sfdl_name = sfdl_info['name']
-            else:
-                # Fallback to filename
-                sfdl_name = filename.replace('.sfdl', '').replace('.', ' ').replace('_', ' ')
-            
-            media_info = downloader.detect_media_type(sfdl_name)
-            if isinstance(media_info, dict):
-                media_type = media_info.get('type', 'unknown')
-            else:
-                # Backwards compatibility
-                media_type = media_info
-                media_info = {'type': media_type}
-            
-            # Save metadata
-            metadata_file = os.path.join(files, '.metadata.json')
-            metadata = {}
-            if os.path.exists(metadata_file):
-                with open(metadata_file, 'r') as mf:
-                    metadata = json.load(mf)
-            
-            metadata[filename] = media_info
-            with open(metadata_file, 'w') as mf:
-                json.dump(metadata, mf, indent=2)
-            
-            print(f"  Media Type detected: {media_type}")
-        except Exception as e:
-            logger.error(f"Error detecting media type: {e}")
+        # Parsing and TMDB detection run in the background, /files shows "pending" meanwhile
+        detection_queue.submit(file_path, os.path.join(files, '.metadata.json'))
         
         response_data = {
             "success": True,
             "filename": filename,
             "path": file_path,
-            "media_type": media_type,
-            "media_info": media_info
+            "media_type": "pending",
+            "media_info": {"type": "pending"}
         }
         
-        output = f"""HTTP/1.1 200 OK
-Content-Type: application/json\r\n
-
-{json.dumps(response_data)}
-"""
-        return output.encode('utf-8')
+        return json_response('200 OK', response_data)
     
     except Exception as e:
         logger.error(f"Error downloading SFDL from URL: {e}")
         error_data = {"error": f"Failed to download from URL: {str(e)}"}
-        error_response = f"""HTTP/1.1 500 Internal Server Error
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-"""
-        return error_response.encode('utf-8')
+        return json_response('500 Internal Server Error', error_data)
 
 def update_media_type(req):
     """Update media type for a SFDL file"""
@@ -502,11 +519,7 @@ def update_media_type(req):
         body_start = req.find('\r\n\r\n')
         if body_start == -1:
             error_data = {"error": "No request body found"}
-            return f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-""".encode('utf-8')
+            return json_response('400 Bad Request', error_data)
         
         body = req[body_start+4:].strip()
         try:
@@ -515,42 +528,16 @@ Content-Type: application/json\r\n
             media_type = data.get('media_type', '').strip()
         except json.JSONDecodeError:
             error_data = {"error": "Invalid JSON in request body"}
-            return f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-""".encode('utf-8')
+            return json_response('400 Bad Request', error_data)
         
         if not filename or media_type not in ['movie', 'tv']:
             error_data = {"error": "Invalid filename or media_type"}
-            return f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-""".encode('utf-8')
+            return json_response('400 Bad Request', error_data)
         
-        # Load files path from config
-        files = os.path.join(scriptParent, 'uploads')
-        if os.path.exists(os.path.join(scriptPath, '.env')):
-            with open(os.path.join(scriptPath, '.env'), 'r') as f:
-                for line in f:
-                    if 'FILES_DIR=' in line:
-                        path = line.split('=', 1)[1].split('#')[0].strip().strip('"')
-                        path = path.replace('$pwd', scriptParent)
-                        if os.path.isabs(path):
-                            files = path
-                        break
+        files = get_files_dir()
         
         # Update metadata
-        metadata_file = os.path.join(files, '.metadata.json')
-        metadata = {}
-        if os.path.exists(metadata_file):
-            with open(metadata_file, 'r') as mf:
-                metadata = json.load(mf)
-        
-        metadata[filename] = {'media_type': media_type}
-        with open(metadata_file, 'w') as mf:
-            json.dump(metadata, mf, indent=2)
+        MetadataStore.for_directory(files).set(filename, {'media_type': media_type})
         
         print(f"✓ Media type updated: {filename} -> {media_type}")
         logger.info(f"Media type updated: {filename} to {media_type}")
@@ -561,44 +548,20 @@ Content-Type: application/json\r\n
             "media_type": media_type
         }
         
-        output = f"""HTTP/1.1 200 OK
-Content-Type: application/json\r\n
-
-{json.dumps(response_data)}
-"""
-        return output.encode('utf-8')
+        return json_response('200 OK', response_data)
     
     except Exception as e:
         logger.error(f"Error updating media type: {e}")
         error_data = {"error": f"Failed to update media type: {str(e)}"}
-        error_response = f"""HTTP/1.1 500 Internal Server Error
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-"""
-        return error_response.encode('utf-8')
+        return json_response('500 Internal Server Error', error_data)
 
 def list_sfdl_files():
     """List all SFDL files in uploads directory"""
     try:
-        # Load files path from config
-        files_dir = os.path.join(scriptParent, 'uploads')
-        if os.path.exists(os.path.join(scriptPath, '.env')):
-            with open(os.path.join(scriptPath, '.env'), 'r') as f:
-                for line in f:
-                    if 'FILES_DIR=' in line:
-                        path = line.split('=', 1)[1].split('#')[0].strip().strip('"')
-                        path = path.replace('$pwd', scriptParent)
-                        if os.path.isabs(path):
-                            files_dir = path
-                        break
+        files_dir = get_files_dir()
         
         # Load metadata
-        metadata_file = os.path.join(files_dir, '.metadata.json')
-        metadata = {}
-        if os.path.exists(metadata_file):
-            with open(metadata_file, 'r') as mf:
-                metadata = json.load(mf)
+        metadata = MetadataStore.for_directory(files_dir).load()
         
         files = []
         if os.path.exists(files_dir):
@@ -638,25 +601,16 @@ def list_sfdl_files():
             'success': True,
             'files': files,
             'count': len(files),
+            'pending': sum(1 for f in files if f['media_type'] == 'pending'),
             'directory': files_dir
         }
         
-        output = f"""HTTP/1.1 200 OK
-Content-Type: application/json\r\n
-
-{json.dumps(response_data)}
-"""
-        return output.encode('utf-8')
+        return json_response('200 OK', response_data)
     
     except Exception as e:
         logger.error(f"Error listing SFDL files: {e}")
         error_data = {"error": f"Failed to list files: {str(e)}"}
-        error_response = f"""HTTP/1.1 500 Internal Server Error
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-"""
-        return error_response.encode('utf-8')
+        return json_response('500 Internal Server Error', error_data)
 
 def delete_sfdl_file(req):
     """Delete a SFDL file from uploads directory"""
@@ -665,11 +619,7 @@ def delete_sfdl_file(req):
         body_start = req.find('\r\n\r\n')
         if body_start == -1:
             error_data = {"success": False, "error": "No request body found"}
-            return f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-""".encode('utf-8')
+            return json_response('400 Bad Request', error_data)
         
         body = req[body_start+4:].strip()
         try:
@@ -677,92 +627,43 @@ Content-Type: application/json\r\n
             filename = data.get('filename', '')
         except json.JSONDecodeError:
             error_data = {"success": False, "error": "Invalid JSON"}
-            error_response = f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-"""
-            return error_response.encode('utf-8')
+            return json_response('400 Bad Request', error_data)
         
         if not filename:
             error_data = {"success": False, "error": "Filename required"}
-            error_response = f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-"""
-            return error_response.encode('utf-8')
+            return json_response('400 Bad Request', error_data)
         
         # Security: Only allow .sfdl files and prevent directory traversal
         if not filename.endswith('.sfdl') or '/' in filename or '\\' in filename or '..' in filename:
             error_data = {"success": False, "error": "Invalid filename"}
-            error_response = f"""HTTP/1.1 400 Bad Request
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-"""
-            return error_response.encode('utf-8')
+            return json_response('400 Bad Request', error_data)
         
-        # Load files path from config
-        files_dir = os.path.join(scriptParent, 'uploads')
-        if os.path.exists(os.path.join(scriptPath, '.env')):
-            with open(os.path.join(scriptPath, '.env'), 'r') as f:
-                for line in f:
-                    if 'FILES_DIR=' in line:
-                        path = line.split('=', 1)[1].split('#')[0].strip().strip('"')
-                        path = path.replace('$pwd', scriptParent)
-                        if os.path.isabs(path):
-                            files_dir = path
-                        break
+        files_dir = get_files_dir()
         
         filepath = os.path.join(files_dir, filename)
         
         # Check if file exists
         if not os.path.exists(filepath):
             error_data = {"success": False, "error": "File not found"}
-            error_response = f"""HTTP/1.1 404 Not Found
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-"""
-            return error_response.encode('utf-8')
+            return json_response('404 Not Found', error_data)
         
         # Delete the file
         os.remove(filepath)
         logger.info(f"Deleted SFDL file: {filename}")
         
         # Remove from metadata if exists
-        metadata_file = os.path.join(files_dir, '.metadata.json')
-        if os.path.exists(metadata_file):
-            try:
-                with open(metadata_file, 'r') as mf:
-                    metadata = json.load(mf)
-                
-                if filename in metadata:
-                    del metadata[filename]
-                    
-                with open(metadata_file, 'w') as mf:
-                    json.dump(metadata, mf, indent=2)
-            except Exception as e:
-                logger.warning(f"Could not update metadata: {e}")
+        try:
+            MetadataStore.for_directory(files_dir).remove(filename)
+        except Exception as e:
+            logger.warning(f"Could not update metadata: {e}")
         
         response_data = {"success": True, "message": f"File {filename} deleted successfully"}
-        output = f"""HTTP/1.1 200 OK
-Content-Type: application/json\r\n
-
-{json.dumps(response_data)}
-"""
-        return output.encode('utf-8')
+        return json_response('200 OK', response_data)
     
     except Exception as e:
         logger.error(f"Error deleting SFDL file: {e}")
         error_data = {"success": False, "error": f"Failed to delete file: {str(e)}"}
-        error_response = f"""HTTP/1.1 500 Internal Server Error
-Content-Type: application/json\r\n
-
-{json.dumps(error_data)}
-"""
-        return error_response.encode('utf-8')
+        return json_response('500 Internal Server Error', error_data)
 
 def start_loader(cmd):
     """Start with password verification"""
@@ -783,21 +684,13 @@ def start_loader(cmd):
                 password = password_match.group(1)
         
         if not password:
-            error_response = """HTTP/1.1 401 Unauthorized
-Content-Type: application/json\r\n
-
-{ "data" : [ { "error": "Password required" } ] }
-"""
-            return error_response.encode('utf-8')
+            error_response = json_response('401 Unauthorized', {"data": [{"error": "Password required"}]})
+            return error_response
         
         if not verify_password(password, 'start'):
-            error_response = """HTTP/1.1 403 Forbidden
-Content-Type: application/json\r\n
-
-{ "data" : [ { "error": "Invalid password" } ] }
-"""
+            error_response = json_response('403 Forbidden', {"data": [{"error": "Invalid password"}]})
             logger.warning("Failed login attempt with invalid password")
-            return error_response.encode('utf-8')
+            return error_response
         
         # Start downloader
         success = downloader.start_async()
@@ -805,28 +698,16 @@ Content-Type: application/json\r\n
         if success:
             logger.info("Downloader started successfully")
             
-            output = """HTTP/1.1 200 OK
-Content-Type: application/json\r\n
-
-{ "data" : [ { "version":"1.0", "start":"ok" } ] }
-"""
-            return output.encode('utf-8')
+            output = json_response('200 OK', {"data": [{"version": "1.0", "start": "ok"}]})
+            return output
         else:
-            error_response = """HTTP/1.1 409 Conflict
-Content-Type: application/json\r\n
-
-{ "data" : [ { "error": "Download already running" } ] }
-"""
-            return error_response.encode('utf-8')
+            error_response = json_response('409 Conflict', {"data": [{"error": "Download already running"}]})
+            return error_response
     
     except Exception as e:
         logger.error(f"Error starting loader: {e}")
-        error_response = """HTTP/1.1 500 Internal Server Error
-Content-Type: application/json\r\n
-
-{ "data" : [ { "error": "Failed to start loader" } ] }
-"""
-        return error_response.encode('utf-8')
+        error_response = json_response('500 Internal Server Error', {"data": [{"error": "Failed to start loader"}]})
+        return error_response
 
 def shutdown_server(cmd):
     """Shutdown the webserver with password verification"""
@@ -847,125 +728,327 @@ def shutdown_server(cmd):
                 password = password_match.group(1)
         
         if not password:
-            error_response = """HTTP/1.1 401 Unauthorized
-Content-Type: application/json\r\n
-
-{ "data" : [ { "error": "Password required" } ] }
-"""
-            return error_response.encode('utf-8')
+            error_response = json_response('401 Unauthorized', {"data": [{"error": "Password required"}]})
+            return error_response
         
         if not verify_password(password, 'kill'):
-            error_response = """HTTP/1.1 403 Forbidden
-Content-Type: application/json\r\n
-
-{ "data" : [ { "error": "Invalid password" } ] }
-"""
+            error_response = json_response('403 Forbidden', {"data": [{"error": "Invalid password"}]})
             logger.warning("Failed shutdown attempt with invalid password")
-            return error_response.encode('utf-8')
+            return error_response
         
         print('\n✓ Server wird heruntergefahren (Remote-Befehl)')
         logger.info("Server shutdown requested via API")
         
-        output = """HTTP/1.1 200 OK
-Content-Type: application/json\r\n
-
-{ "data" : [ { "shutdown":"ok" } ] }
-"""
+        output = json_response('200 OK', {"data": [{"shutdown": "ok"}]})
         # Set global flag to stop server
         global server_running
         server_running = False
         
-        return output.encode('utf-8')
+        return output
     
     except Exception as e:
         logger.error(f"Error shutting down server: {e}")
-        error_response = """HTTP/1.1 500 Internal Server Error
-Content-Type: application/json\r\n
-
-{ "data" : [ { "error": "Failed to shutdown server" } ] }
-"""
-        return error_response.encode('utf-8')
+        error_response = json_response('500 Internal Server Error', {"data": [{"error": "Failed to shutdown server"}]})
+        return error_response
 
 # Server running flag
 server_running = True
 
-listen_socket.listen(1)
-print(f'Server läuft auf http://{HOST if HOST else "localhost"}:{PORT}/')
+# Open client connections, used to stop offering keep-alive when all workers are busy
+active_connections = 0
+connections_lock = threading.Lock()
+
+# Every event stream pins a worker, keep at least half of them for normal requests
+active_event_streams = 0
+MAX_EVENT_STREAMS = max(1, WORKERS // 2)
+
+def read_request_head(client_connection, buffer):
+    """Read the request line and headers of the next request on a connection
+    
+    Returns (request, buffer) where buffer holds the bytes received after the
+    header block, or (None, b'') if the client closed the connection.
+    Raises ValueError for malformed requests.
+    """
+    while b'\r\n\r\n' not in buffer:
+        if len(buffer) > MAX_HEADER_SIZE:
+            raise ValueError("Request header too large")
+        chunk = client_connection.recv(8192)
+        if not chunk:
+            return None, b''
+        buffer += chunk
+    
+    head, _, buffer = buffer.partition(b'\r\n\r\n')
+    head_text = head.decode('utf-8', errors='ignore')
+    lines = head_text.split('\r\n')
+    
+    m = re.search(r'(GET|POST) (.*?) (HTTP/1.[01])', lines[0])
+    if not m:
+        raise ValueError("Invalid HTTP request line")
+    
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    
+    try:
+        content_length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise ValueError("Invalid Content-Length")
+    if content_length < 0:
+        raise ValueError("Invalid Content-Length")
+    
+    request = {
+        'method': m.group(1),
+        'path': m.group(2).strip(),
+        'version': m.group(3),
+        'headers': headers,
+        'head': head_text,
+        'content_length': content_length,
+        'body': b''
+    }
+    return request, buffer
+
+def read_body_chunks(client_connection, received, request):
+    """Yield the request body in chunks as it arrives, starting with bytes already received
+    
+    request['unread'] (set by the caller) counts the body bytes still waiting on the socket.
+    """
+    if received:
+        yield received
+    
+    while request['unread'] > 0:
+        chunk = client_connection.recv(min(65536, request['unread']))
+        if not chunk:
+            raise ValueError("Connection closed before request body was complete")
+        request['unread'] -= len(chunk)
+        yield chunk
+
+def split_body(request, buffer):
+    """Split buffered bytes into this request's body part and the start of the next request"""
+    content_length = request['content_length']
+    return buffer[:content_length], buffer[content_length:]
+
+def wants_keep_alive(request):
+    """HTTP/1.1 keeps the connection open unless asked not to, HTTP/1.0 only on request"""
+    connection = request['headers'].get('connection', '').lower()
+    if request['version'] == 'HTTP/1.0':
+        return 'keep-alive' in connection
+    return 'close' not in connection
+
+def add_connection_header(http_response, keep_alive):
+    """Insert the Connection header into a framed response"""
+    if keep_alive:
+        header = f'\r\nConnection: keep-alive\r\nKeep-Alive: timeout={KEEPALIVE_TIMEOUT}, max={KEEPALIVE_MAX_REQUESTS}'
+    else:
+        header = '\r\nConnection: close'
+    
+    head, sep, body = http_response.partition(b'\r\n\r\n')
+    return head + header.encode('utf-8') + sep + body
+
+def dispatch_request(request):
+    """Route a parsed request to its handler and return the response bytes"""
+    get_post = request['method']
+    cmd = request['path']
+    # Handlers expect the raw request text: head, blank line, body
+    req = request['head'] + '\r\n\r\n' + request['body'].decode('utf-8', errors='ignore')
+    
+    logger.info(f'Method: {get_post} | Path: {cmd}')
 
-while server_running:
+    if not cmd or cmd == "/" or cmd == "/index.html":
+        return load_file('index.html')
+    elif cmd == "/status" or cmd == "/status/" or cmd.startswith("/status.json"):
+        return status_response(request)
+    elif cmd == "/files" or cmd == "/files.json":
+        return list_sfdl_files()
+    elif cmd.startswith('/start'):
+        return start_loader(cmd)
+    elif cmd.startswith('/shutdown'):
+        # shutdown_server clears server_running, the accept loop exits on its next tick
+        return shutdown_server(cmd)
+    elif cmd == "/download_sfdl_url" and get_post == "POST":
+        # Download SFDL from URL
+        return download_sfdl_url(req)
+    elif cmd == "/update_media_type" and get_post == "POST":
+        # Update media type manually
+        return update_media_type(req)
+    elif cmd == "/delete_sfdl" and get_post == "POST":
+        # Delete SFDL file
+        return delete_sfdl_file(req)
+    elif get_post == "POST":
+        return post_file(cmd, req)
+    else:
+        return load_file(cmd)
+
+# POST routes that consume the request body as a stream instead of a buffered string
+STREAMING_ROUTES = {
+    '/upload': upload_sfdl,
+    '/upload_batch': upload_sfdl_batch
+}
+
+def handle_connection(client_connection, client_address):
+    """Serve requests on a client connection until it is closed or idles out"""
+    global active_connections
+    with connections_lock:
+        active_connections += 1
+    
     try:
-        client_connection, client_address = listen_socket.accept()
         logger.info(f"Connection from {client_address}")
+        client_connection.settimeout(CLIENT_TIMEOUT)
+        buffer = b''
+        served = 0
         
-        request = client_connection.recv(8192)
-        if not request:
-            client_connection.close()
-            continue
+        while server_running:
+            try:
+                request, buffer = read_request_head(client_connection, buffer)
+                if request is None:
+                    break
+                
+                logger.debug(f"req: {request['head']}")
+                received, buffer = split_body(request, buffer)
+                request['unread'] = request['content_length'] - len(received)
+                body_chunks = read_body_chunks(client_connection, received, request)
+                
+                if request['path'].startswith('/events'):
+                    # Long-lived stream, the connection is closed afterwards
+                    stream_events(client_connection)
+                    break
+                
+                streaming_handler = STREAMING_ROUTES.get(request['path']) if request['method'] == 'POST' else None
+                if streaming_handler:
+                    if request['content_length'] > MAX_UPLOAD_SIZE:
+                        raise ValueError("Upload too large")
+                    http_response = streaming_handler(request, body_chunks)
+                    # A handler that answered early (e.g. 400) left part of the body on
+                    # the socket, the connection is closed instead of reading the rest
+                    body_chunks.close()
+                else:
+                    if request['content_length'] > MAX_BODY_SIZE:
+                        raise ValueError("Request body too large")
+                    request['body'] = b''.join(body_chunks)
+                    http_response = dispatch_request(request)
+                
+            except socket.timeout:
+                # Idle keep-alive connection, give the worker back
+                break
+            except ValueError as e:
+                logger.warning(f"Invalid HTTP request: {e}")
+                client_connection.sendall(add_connection_header(
+                    build_response('400 Bad Request', b'', 'text/plain'), False))
+                break
             
-        req = request.decode('utf-8', errors='ignore').strip()
-        logger.debug(f'req: {req}')
-        
-        m = re.search(r'(GET|POST) (.*?) HTTP/1.[01]', req)
-        if not m:
-            logger.warning("Invalid HTTP request")
-            client_connection.close()
-            continue
+            served += 1
             
-        get_post = m.group(1).strip()
-        cmd = m.group(2).strip()
-        
-        logger.info(f'Method: {get_post} | Path: {cmd}')
-
-        if not cmd or cmd == "/" or cmd == "/index.html":
-            http_response = load_file('index.html')
-        elif cmd == "/status" or cmd == "/status/" or cmd == "/status.json":
-            http_response = load_file('status.json')
-        elif cmd == "/files" or cmd == "/files.json":
-            http_response = list_sfdl_files()
-        elif cmd.startswith('/start'):
-            http_response = start_loader(cmd)
-        elif cmd.startswith('/shutdown'):
-            http_response = shutdown_server(cmd)
-            client_connection.sendall(http_response)
-            client_connection.close()
-            # Only break if shutdown was successful (check response)
-            if b'"shutdown":"ok"' in http_response:
-                break  # Exit main loop to shutdown server
-            continue  # Don't send response again if password was wrong
-        elif cmd == "/upload" and get_post == "POST":
-            # Receive full request with body
-            body = client_connection.recv(65536)
-            full_req = req + '\r\n' + body.decode('utf-8', errors='ignore')
-            http_response = upload_sfdl(full_req)
-        elif cmd == "/download_sfdl_url" and get_post == "POST":
-            # Download SFDL from URL
-            http_response = download_sfdl_url(req)
-        elif cmd == "/update_media_type" and get_post == "POST":
-            # Update media type manually
-            http_response = update_media_type(req)
-        elif cmd == "/delete_sfdl" and get_post == "POST":
-            # Delete SFDL file
-            http_response = delete_sfdl_file(req)
-        elif get_post == "POST":
-            http_response = post_file(cmd, req)
-        else:
-            http_response = load_file(cmd)
-
-        client_connection.sendall(http_response)
+            # Only hold on to the worker while others are free for new clients
+            with connections_lock:
+                workers_free = active_connections < WORKERS
+            keep_alive = (server_running and workers_free and served < KEEPALIVE_MAX_REQUESTS
+                          and wants_keep_alive(request) and request['unread'] == 0)
+            
+            client_connection.sendall(add_connection_header(http_response, keep_alive))
+            if not keep_alive:
+                break
+            
+            client_connection.settimeout(KEEPALIVE_TIMEOUT)
         
-    except KeyboardInterrupt:
-        print('\n✓ Server wurde beendet')
-        break
     except Exception as e:
         logger.error(f"Error handling request: {e}")
     finally:
+        with connections_lock:
+            active_connections -= 1
         try:
             client_connection.close()
         except:
             pass
 
-print('✓ Server gestoppt')
-try:
-    listen_socket.close()
-except:
-    pass
+def main():
+    """Parse the command line, start the downloader and serve until shutdown"""
+    global HOST, PORT, WORKERS, BACKLOG, MAX_EVENT_STREAMS, downloader, detection_queue
+    
+    for arg in sys.argv:
+        arg_arr = arg.rsplit('=', 1)
+    
+        if len(arg_arr) == 2:
+            if arg_arr[0] == "ip":
+                HOST = arg_arr[1]
+            elif arg_arr[0] == "port":
+                try:
+                    PORT = int(arg_arr[1])
+                except ValueError:
+                    logger.error(f"Invalid port number: {arg_arr[1]}")
+                    PORT = 8282
+            elif arg_arr[0] == "workers":
+                try:
+                    WORKERS = max(1, int(arg_arr[1]))
+                except ValueError:
+                    logger.error(f"Invalid worker count: {arg_arr[1]}")
+            elif arg_arr[0] == "backlog":
+                try:
+                    BACKLOG = max(1, int(arg_arr[1]))
+                except ValueError:
+                    logger.error(f"Invalid backlog: {arg_arr[1]}")
+
+    try:
+        listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listen_socket.bind((HOST, PORT))
+        listen_socket.listen(BACKLOG)
+    except socket.error as e:
+        logger.error(f"Socket error: {e}")
+        sys.exit(1)
+
+    # Initialize SFDL Downloader
+    config_file = os.path.join(scriptPath, '.env')
+    status_file = os.path.join(scriptPath, 'static', 'status.json')
+    downloader = Downloader(config_file, status_file)
+
+    # Publish the initial status snapshot
+    downloader.update_status(status='idle', action='done', sfdl_name='')
+
+    # Background parsing and TMDB detection for uploaded SFDLs
+    detection_queue = MediaDetectionQueue(downloader, workers=downloader.config['detection_workers'])
+
+    if not HOST:
+        print(f'✓ Webserver auf Port {PORT} gestartet!')
+    else:
+        print(f'✓ Webserver mit IP {HOST} und Port {PORT} gestartet!')
+
+    MAX_EVENT_STREAMS = max(1, WORKERS // 2)
+
+    # SFDLs still pending from the previous run
+    detection_queue.resume_pending(get_files_dir())
+
+    # Slow requests (URL downloads, TMDB lookups) run in their own worker so status polls stay fast
+    request_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='http')
+    listen_socket.settimeout(ACCEPT_TIMEOUT)
+    print(f'Server läuft auf http://{HOST if HOST else "localhost"}:{PORT}/ ({WORKERS} Worker, Backlog {BACKLOG})')
+
+    while server_running:
+        try:
+            client_connection, client_address = listen_socket.accept()
+        except socket.timeout:
+            continue
+        except KeyboardInterrupt:
+            print('\n✓ Server wurde beendet')
+            break
+        except Exception as e:
+            logger.error(f"Error accepting connection: {e}")
+            continue
+    
+        try:
+            request_pool.submit(handle_connection, client_connection, client_address)
+        except RuntimeError as e:
+            # Pool already shut down
+            logger.error(f"Could not dispatch request: {e}")
+            client_connection.close()
+
+    print('✓ Server gestoppt')
+    request_pool.shutdown(wait=False)
+    detection_queue.shutdown()
+    try:
+        listen_socket.close()
+    except:
+        pass
+
+if __name__ == '__main__':
+    main()
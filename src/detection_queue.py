@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.metadata import MetadataStore
+from src.tmdb_client import TMDBDeadlineExceeded
+
+
+class MediaDetectionQueue:
+    """Bounded background pool that parses uploaded SFDLs and detects their media type
+
+    Uploads only store the file and enqueue it here. Each job decrypts the SFDL name,
+    runs the TMDB detection and writes the result into .metadata.json, so the file
+    list fills in as results arrive.
+    """
+
+    def __init__(self, downloader, workers=2):
+        self.downloader = downloader
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='detect')
+        self.lock = threading.Lock()
+        self.queued = set()
+
+    def submit(self, sfdl_path, metadata_file):
+        """Mark the SFDL as pending and schedule its detection"""
+        sfdl_path = os.path.abspath(sfdl_path)
+        filename = os.path.basename(sfdl_path)
+
+        with self.lock:
+            if sfdl_path in self.queued:
+                return False
+            self.queued.add(sfdl_path)
+
+        MetadataStore(metadata_file).set(filename, {'type': 'pending'})
+        self.executor.submit(self._run, sfdl_path, metadata_file)
+        return True
+
+    def resume_pending(self, files_dir):
+        """Requeue SFDLs left pending by a previous run"""
+        metadata_file = os.path.join(files_dir, '.metadata.json')
+        metadata = MetadataStore(metadata_file).load()
+        pending = [name for name, info in metadata.items()
+                   if isinstance(info, dict) and info.get('type') == 'pending']
+        for filename in pending:
+            sfdl_path = os.path.join(files_dir, filename)
+            if os.path.exists(sfdl_path):
+                self.submit(sfdl_path, metadata_file)
+        if pending:
+            print(f"  {len(pending)} SFDL(s) warten noch auf Erkennung")
+        return len(pending)
+
+    def pending_count(self):
+        """Number of SFDLs waiting for or running detection"""
+        with self.lock:
+            return len(self.queued)
+
+    def shutdown(self):
+        """Stop accepting new jobs"""
+        self.executor.shutdown(wait=False)
+
+    def _run(self, sfdl_path, metadata_file):
+        filename = os.path.basename(sfdl_path)
+        try:
+            media_info = self.detect(sfdl_path)
+            store = MetadataStore(metadata_file)
+
+            def apply(metadata):
+                # The file may have been deleted or classified by hand in the meantime
+                current = metadata.get(filename)
+                if not os.path.exists(sfdl_path) or current is None:
+                    metadata.pop(filename, None)
+                    return False
+                if current.get('type') != 'pending':
+                    return False
+                metadata[filename] = media_info
+                return True
+
+            if store.modify(apply):
+                print(f"  Media Type detected for {filename}: {media_info.get('type', 'unknown')}")
+        except TMDBDeadlineExceeded as e:
+            # Stays pending: detected again on the next start or when it is downloaded
+            print(f"  ⚠ Media type for {filename} not detected: {e}")
+        except Exception as e:
+            print(f"  ✗ Error detecting media type for {filename}: {e}")
+
+            def mark_unknown(metadata):
+                if metadata.get(filename, {}).get('type') == 'pending':
+                    metadata[filename] = {'type': 'unknown'}
+
+            MetadataStore(metadata_file).modify(mark_unknown)
+        finally:
+            with self.lock:
+                self.queued.discard(sfdl_path)
+
+    def detect(self, sfdl_path):
+        """Parse the SFDL and return its media info dict"""
+        filename = os.path.basename(sfdl_path)
+        sfdl_info = self.downloader.parse_sfdl(sfdl_path)
+        if sfdl_info and sfdl_info.get('name'):
+            sfdl_name = sfdl_info['name']
+        else:
+            # Fallback to filename
+            sfdl_name = filename.replace('.sfdl', '').replace('.', ' ').replace('_', ' ')
+
+        media_info = self.downloader.detect_media_type(sfdl_name)
+        if not isinstance(media_info, dict):
+            # Backwards compatibility
+            media_info = {'type': media_info}
+        return media_info
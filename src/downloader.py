@@ -1,34 +1,41 @@
 #!/usr/bin/env python3
 
-import xml.etree.ElementTree as ET
 import os
 import ftplib
-import hashlib
 import threading
 import time
+import random
 import json
-import base64
 import re
 import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
-from urllib.parse import urlparse
 
-try:
-    from Crypto.Cipher import AES
-    HAS_CRYPTO = True
-except ImportError:
-    try:
-        from Cryptodome.Cipher import AES
-        HAS_CRYPTO = True
-    except ImportError:
-        HAS_CRYPTO = False
-        print("Warning: pycryptodome not installed. Encrypted SFDLs won't work!")
-        print("Install with: pip install pycryptodome")
-        print("Or on Debian/Ubuntu: apt install python3-pycryptodome")
+from src.metadata import MetadataStore
+from src.tmdb_cache import TMDBCache
+from src.tmdb_client import TMDBClient, TMDBDeadlineExceeded
+from src.release_parser import parse_release
+from src.password_stats import PasswordStats
+from src.sfdl_crypto import HAS_CRYPTO, password_key, decrypt_many, decode_field, find_key, looks_decrypted
+from src.sfdl_parser import parse_sfdl_data
+from src.sfdl_cache import SFDLCache
+from src.ftp_pool import FTPPool
+from src.progress import ProgressCounter
+
+
+
+# Published status: version counts real changes, body is the pre-encoded JSON served over HTTP.
+# Snapshots are never modified after publishing, readers can use them without locking.
+StatusSnapshot = namedtuple('StatusSnapshot', ['version', 'data', 'body'])
+
+
+class LocalWriteError(Exception):
+    """Writing a download to disk failed (e.g. disk full), retrying the transfer cannot help"""
 
 
 class Downloader:
-    def __init__(self, config_path, status_file):
+    def __init__(self, config_path, status_file, tmdb_client=None):
         self.config_path = config_path
         self.status_file = status_file
         self.config = self.load_config()
@@ -38,12 +45,126 @@ class Downloader:
         self.total_files = 0
         self.downloaded_files = 0
         self.total_bytes = 0
-        self.downloaded_bytes = 0
+        # Bytes of the current download, added to by all FTP threads (see downloaded_bytes)
+        self.progress = ProgressCounter()
+        # Guards current_files and downloaded_files, which workers change while
+        # update_status reads them
+        self.files_lock = threading.Lock()
         self.current_files = []
+        # Files that still failed after all retries, per SFDL file name. Kept in their own
+        # file, status.json is only a display snapshot and may not be written at all.
+        self.failed_files_file = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'failed_files.json')
+        self.failed_files = self.load_failed_files()
         self.download_speed = 0
         self.start_time = None
         self.passwords = self.load_passwords()
+        # Decrypted parse_sfdl results per upload directory
+        self.sfdl_caches = {}
+        # Which passwords worked before (and for which uploader), tried first
+        self.password_stats = PasswordStats(os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'password_hits.json'))
+        self.tmdb_cache = self.open_tmdb_cache()
+        # Shared keep-alive client for all TMDB lookups (can be replaced, e.g. by a stub server)
+        self.tmdb_client = tmdb_client or TMDBClient(
+            self.config.get('tmdb_api_key', ''),
+            rate=self.config['tmdb_rate'],
+            retries=self.config['tmdb_retries']
+        )
+        # Bounded pool for concurrent TMDB searches (threads start on first use)
+        self.tmdb_executor = ThreadPoolExecutor(max_workers=max(1, self.config['tmdb_fanout']), thread_name_prefix='tmdb')
+        
+        # In-memory status, waiters are woken whenever a new version is published
+        self.status_condition = threading.Condition()
+        self.status_snapshot = None
+        # Serializes status.json writes, an older snapshot never replaces a newer one
+        self.status_write_lock = threading.Lock()
+        self.status_written_at = 0
+        self.status_written_version = 0
+        
+    @property
+    def downloaded_bytes(self):
+        return self.progress.value()
+    
+    @downloaded_bytes.setter
+    def downloaded_bytes(self, value):
+        # Only for resets and single-threaded updates, worker threads use progress.add()
+        self.progress.set(value)
+    
+    def set_current_files(self, files):
+        """Replace the list of files shown as in progress"""
+        with self.files_lock:
+            self.current_files = files
+    
+    def file_started(self, file_info):
+        with self.files_lock:
+            self.current_files.append(file_info)
+    
+    def file_finished(self, file_info, success):
+        with self.files_lock:
+            self.current_files.remove(file_info)
+            if success:
+                self.downloaded_files += 1
+    
+    def set_file_progress(self, file_info, value):
+        """Set the bytes a file has on disk, the download total follows the difference"""
+        counter = file_info.get('progress')
+        if counter is None:
+            counter = file_info['progress'] = ProgressCounter()
+        self.progress.add(value - counter.value())
+        counter.set(value)
+        return counter
+    
+    def load_failed_files(self):
+        """Failed files of earlier runs from failed_files.json, per SFDL file name"""
+        if not os.path.exists(self.failed_files_file):
+            return {}
+        try:
+            with open(self.failed_files_file, 'r') as f:
+                failed_files = json.load(f)
+            if not isinstance(failed_files, dict):
+                raise ValueError("expected an object")
+            return failed_files
+        except (OSError, ValueError) as e:
+            print(f"  ⚠ Could not read failed files: {e}")
+            return {}
+    
+    def save_failed_files(self):
+        """Write failed_files.json (only called from the download thread)"""
+        tmp_file = f"{self.failed_files_file}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(self.failed_files, f, indent=2)
+            os.replace(tmp_file, self.failed_files_file)
+        except OSError as e:
+            print(f"  ⚠ Could not save failed files: {e}")
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+    
+    def progress_snapshot(self):
+        """Consistent view of the download progress for update_status
         
+        Returns a dict with downloaded_bytes, total_bytes, total_files,
+        downloaded_files and files (list of (name, size, downloaded) tuples).
+        """
+        with self.files_lock:
+            current_files = list(self.current_files)
+            downloaded_files = self.downloaded_files
+        files = []
+        for file_info in current_files:
+            counter = file_info.get('progress')
+            downloaded = counter.value() if counter else file_info.get('downloaded', 0)
+            files.append((file_info.get('name', 'unknown'), file_info.get('size', 0), downloaded))
+        return {
+            'downloaded_bytes': self.progress.value(),
+            'total_bytes': self.total_bytes,
+            'total_files': self.total_files,
+            'downloaded_files': downloaded_files,
+            'files': files
+        }
+    
     def load_passwords(self):
         """Load password list for encrypted SFDL files"""
         passwords = []
@@ -51,6 +172,7 @@ class Downloader:
         # Try to load from passwords.txt in project root
         script_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         password_file = os.path.join(script_path, 'passwords.txt')
+        self.passwords_mtime = os.path.getmtime(password_file) if os.path.exists(password_file) else None
         
         if os.path.exists(password_file):
             try:
@@ -62,8 +184,34 @@ class Downloader:
             except Exception as e:
                 print(f"Error loading passwords: {e}")
         
+        # AES keys are derived once per password, not per decrypted field
+        self.password_keys = {password: password_key(password) for password in passwords}
+        # Cached SFDLs are only valid for the password list they were decrypted with
+        self.passwords_fingerprint = SFDLCache.content_key('\n'.join(passwords).encode('utf-8'))
         return passwords
     
+    def refresh_passwords(self):
+        """Reload passwords.txt if it changed since it was loaded"""
+        password_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'passwords.txt')
+        mtime = os.path.getmtime(password_file) if os.path.exists(password_file) else None
+        if mtime != self.passwords_mtime:
+            self.passwords = self.load_passwords()
+            print(f"passwords.txt changed, loaded {len(self.passwords)} passwords")
+    
+    def sfdl_cache(self, sfdl_path):
+        """SFDL cache of the upload directory an SFDL belongs to (None if disabled)"""
+        if self.config.get('sfdl_cache_size', 0) <= 0:
+            return None
+        files_dir = os.path.dirname(os.path.abspath(sfdl_path))
+        if os.path.basename(files_dir) == 'done':
+            files_dir = os.path.dirname(files_dir)
+        
+        cache = self.sfdl_caches.get(files_dir)
+        if cache is None or cache.fingerprint != self.passwords_fingerprint:
+            cache = self.sfdl_caches[files_dir] = SFDLCache.for_directory(
+                files_dir, self.passwords_fingerprint, self.config['sfdl_cache_size'])
+        return cache
+    
     def extract_archives(self, directory, sfdl_name=''):
         """Extract RAR and TAR archives in the given directory"""
         if not self.config.get('extract_archives', True):
@@ -266,112 +414,81 @@ class Downloader:
             import traceback
             traceback.print_exc()
     
+    def open_tmdb_cache(self):
+        """Open the TMDB response cache next to the .env (None if disabled)"""
+        if self.config.get('tmdb_cache_size', 0) <= 0:
+            return None
+        try:
+            cache_file = os.path.join(os.path.dirname(self.config_path), 'tmdb_cache.db')
+            cache = TMDBCache(
+                cache_file,
+                ttl=self.config['tmdb_cache_days'] * 24 * 3600,
+                max_entries=self.config['tmdb_cache_size']
+            )
+            cache.purge_expired()
+            return cache
+        except Exception as e:
+            print(f"  ⚠ TMDB cache disabled: {e}")
+            return None
+    
+    def tmdb_request(self, endpoint, **params):
+        """GET a TMDB API endpoint, answered from the response cache when possible"""
+        cache_key = TMDBCache.make_key(endpoint, params)
+        if self.tmdb_cache:
+            cached = self.tmdb_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        data = self.tmdb_client.get(endpoint, params)
+        
+        if self.tmdb_cache:
+            self.tmdb_cache.set(cache_key, data)
+        return data
+    
+    def prefetch_tmdb(self, requests):
+        """Start TMDB requests concurrently, returns {cache key: future}"""
+        futures = {}
+        for endpoint, params in requests:
+            key = TMDBCache.make_key(endpoint, params)
+            if key not in futures:
+                futures[key] = self.tmdb_executor.submit(self.tmdb_request, endpoint, **params)
+        return futures
+    
     def detect_media_type(self, name):
-        """Detect if content is a movie, TV series, or documentary using TMDB API"""
+        """Detect if content is a movie, TV series, or documentary using TMDB API
+
+        Raises TMDBDeadlineExceeded if parallel searches ran out of time.
+        """
+        prefetched = {}
         try:
-            import re
-            
-            # Check if it's a documentary (but continue with TMDB search)
-            name_upper = name.upper()
-            is_doku = False
-            doku_patterns = [
-                r'\bDOKU\b',
-                r'\bDOCU\b',
-                r'\bDOCUMENTARY\b',
-                r'\bDOKUMENTATION\b',
-            ]
-            
-            for pattern in doku_patterns:
-                if re.search(pattern, name_upper):
-                    print(f"  ✓ Documentary tag detected (matched: {pattern})")
-                    is_doku = True
-                    break
+            release = parse_release(name)
+            
+            # Documentary tag (TMDB search still runs)
+            is_doku = release['is_doku']
+            if is_doku:
+                print(f"  ✓ Documentary tag detected")
             
             # Pre-check: Detect non-video content (Software, Games, eBooks, etc.)
-            name_upper = name.upper()
-            
-            # Software patterns
-            software_patterns = [
-                r'\b(WISO|ADOBE|MICROSOFT|OFFICE|WINDOWS|MACOS|LINUX|UBUNTU|FEDORA)\b',
-                r'\b(PHOTOSHOP|ILLUSTRATOR|PREMIERE|AFTER.?EFFECTS|INDESIGN)\b',
-                r'\b(SPARBUCH|STEUER|TAX|ACCOUNTING|BUSINESS)\b',
-                r'\b(ANTIVIRUS|KASPERSKY|NORTON|MCAFEE|AVAST|AVG)\b',
-                r'\b(VMWARE|VIRTUALBOX|DOCKER|KUBERNETES)\b',
-                r'\b(AUTOCAD|SOLIDWORKS|CATIA|REVIT|SKETCHUP)\b',
-                r'\b(V\d+\.\d+|BUILD\.\d+|VERSION\.\d+)\b',  # Version numbers
-            ]
-            
-            # Game patterns
-            game_patterns = [
-                r'\b(REPACK|CODEX|SKIDROW|PLAZA|CPY|GOLDBERG|STEAM.?RIP)\b',
-                r'\b(GOG|STEAM|EPIC|UPLAY|ORIGIN)\b',
-                r'\b(GAME|GAMEPLAY|UPDATE|DLC|EXPANSION)\b',
-                r'\b(CRACKED|CRACK|KEYGEN|PATCH)\b',
-            ]
-            
-            # Other non-video patterns
-            other_patterns = [
-                r'\b(AUDIOBOOK|HOERBUCH|EBOOK|EPUB|MOBI|PDF|AZW3)\b',
-                r'\b(ALBUM|DISCOGRAPHY|FLAC|320KBPS|MP3|M4A|AAC)\b',
-                r'\b(UDEMY|TUTORIAL|COURSE|TRAINING|LYNDA)\b',
-                r'\b(XXX|PORN|ADULT|18\+)\b',
-            ]
-            
-            # Check all patterns
-            all_non_video_patterns = software_patterns + game_patterns + other_patterns
-            for pattern in all_non_video_patterns:
-                if re.search(pattern, name_upper):
-                    print(f"  ✗ Detected as non-video content (matched: {pattern})")
-                    return 'other'
+            if release['non_video']:
+                print(f"  ✗ Detected as non-video content (matched: {release['non_video_match']})")
+                return 'other'
             
             api_key = self.config.get('tmdb_api_key', '')
             if not api_key:
                 return 'unknown'
             
-            # Check if year is present in original name
-            year_match = re.search(r'\b(19\d{2}|20\d{2})\b', name)
-            has_year = year_match is not None
-            year = year_match.group(1) if year_match else None
-            
-            # Check if it's a TV series (has season/episode markers)
-            is_tv_series = bool(re.search(r'\bS\d{1,2}(E\d{1,2})?\b', name, flags=re.IGNORECASE))
-            
-            # Clean the name for search (remove common patterns)
-            clean_name = name
+            year = release['year']
+            has_year = year is not None
+            is_tv_series = release['is_tv']
             
-            # Replace dots/underscores with spaces first
-            clean_name = clean_name.replace('.', ' ').replace('_', ' ')
-            
-            # Remove year
-            clean_name = re.sub(r'\b(19|20)\d{2}\b', '', clean_name)
-            
-            # Remove season and episode information (S01, S02, S01E01, etc.)
-            clean_name = re.sub(r'\bS\d{1,2}(E\d{1,2})?\b', '', clean_name, flags=re.IGNORECASE)
-            
-            # Remove language tags
-            clean_name = re.sub(r'\b(German|English|GERMAN|ENGLISH|Deutsch|Multi|MULTi|DL|ML)\b', '', clean_name, flags=re.IGNORECASE)
-            
-            # Remove quality and codec indicators (including streaming platforms, audio/video tags)
-            clean_name = re.sub(r'\b(1080p|720p|2160p|4K|UHD|BluRay|BDRip|BDRiP|WEB-DL|WEBRip|WEB|HDTV|DVDRip|x264|x265|h264|h265|HEVC|AVC|AAC|DTS|AC3|Atmos|ATVP|NF|AMZN|DSNP|HMAX|HULU|PCOK|PMTP|STAN|iP|DSCP|CR|DD5\.1|DD|TrueHD|DTS-HD|FLAC|Opus|HDR|HDR10|HDR10\+|DV|SDR|REMUX|HYBRID|Retail|SUBBED|DUBBED|DiRFiX|COMPLETE|READ\.NFO|FS|WS)\b', '', clean_name, flags=re.IGNORECASE)
-            
-            # Remove release groups (pattern: -GROUPNAME at end)
-            clean_name = re.sub(r'-[A-Za-z0-9]+\s*$', '', clean_name)
-            
-            # Remove common scene tags
-            clean_name = re.sub(r'\b(REPACK|PROPER|iNTERNAL|LIMITED|UNRATED|DC|EXTENDED|REMASTERED)\b', '', clean_name, flags=re.IGNORECASE)
-            
-            # Clean up extra spaces
-            clean_name = ' '.join(clean_name.split()).strip()
+            # Search term without year, season, language/quality tags and release group
+            clean_name = release['title']
             
             if year:
                 print(f"  Searching TMDB for: '{clean_name}' (Year: {year})")
             else:
                 print(f"  Searching TMDB for: '{clean_name}'")
             
-            import urllib.request
-            import urllib.parse
-            import json
-            
             # Helper function to calculate name similarity score
             def calculate_similarity(search_term, result_name):
                 """Calculate how similar the search term is to the result name"""
@@ -402,80 +519,175 @@ class Downloader:
                 
                 return 0
             
+            # Search terms to try: full name first, then with words removed from the end
+            def query_variations(base_name):
+                words = base_name.split()
+                variations = [base_name]
+                for i in range(len(words) - 1, 0, -1):
+                    shorter_name = ' '.join(words[:i])
+                    if len(shorter_name) >= 3:  # Minimum 3 characters
+                        variations.append(shorter_name)
+                return variations
+            
             # Helper function to try progressively shorter search terms
             def try_search_variations(search_func, base_name, **kwargs):
                 """Try searching with progressively shorter terms if initial search fails"""
-                words = base_name.split()
-                
-                # Try full name first
-                results = search_func(base_name, **kwargs)
-                if results:
-                    # Find best matching result based on similarity
-                    best_match = None
-                    best_score = 0
-                    
-                    for result in results[:5]:  # Check top 5 results
-                        name = result.get('name') or result.get('title', '')
-                        similarity = calculate_similarity(base_name, name)
+                for query in query_variations(base_name):
+                    if query != base_name:
+                        print(f"  Trying shorter search: '{query}'")
+                    results = search_func(query, **kwargs)
+                    if results:
+                        # Find best matching result based on similarity
+                        best_match = None
+                        best_score = 0
                         
-                        # Combine similarity with popularity (if available)
-                        popularity = result.get('popularity', 0)
-                        combined_score = similarity + (popularity * 0.1)  # Slight popularity boost
+                        for result in results[:5]:  # Check top 5 results
+                            name = result.get('name') or result.get('title', '')
+                            similarity = calculate_similarity(query, name)
+                            
+                            # Combine similarity with popularity (if available)
+                            popularity = result.get('popularity', 0)
+                            combined_score = similarity + (popularity * 0.1)  # Slight popularity boost
+                            
+                            if combined_score > best_score:
+                                best_score = combined_score
+                                best_match = result
                         
-                        if combined_score > best_score:
-                            best_score = combined_score
-                            best_match = result
-                    
-                    # Only accept if similarity is reasonable (>30)
-                    if best_match and calculate_similarity(base_name, best_match.get('name') or best_match.get('title', '')) > 30:
-                        return best_match
-                
-                # If no results and name has multiple words, try progressively shorter versions
-                if len(words) > 1:
-                    # Try removing words from the end
-                    for i in range(len(words) - 1, 0, -1):
-                        shorter_name = ' '.join(words[:i])
-                        if len(shorter_name) >= 3:  # Minimum 3 characters
-                            print(f"  Trying shorter search: '{shorter_name}'")
-                            results = search_func(shorter_name, **kwargs)
-                            if results:
-                                # Again, find best match
-                                best_match = None
-                                best_score = 0
-                                
-                                for result in results[:5]:
-                                    name = result.get('name') or result.get('title', '')
-                                    similarity = calculate_similarity(shorter_name, name)
-                                    popularity = result.get('popularity', 0)
-                                    combined_score = similarity + (popularity * 0.1)
-                                    
-                                    if combined_score > best_score:
-                                        best_score = combined_score
-                                        best_match = result
-                                
-                                if best_match and calculate_similarity(shorter_name, best_match.get('name') or best_match.get('title', '')) > 30:
-                                    return best_match
+                        # Only accept if similarity is reasonable (>30)
+                        if best_match and calculate_similarity(query, best_match.get('name') or best_match.get('title', '')) > 30:
+                            return best_match
                 
                 return None
             
+            # Set in parallel mode, every TMDB request of this detection has to answer by then
+            deadline_at = None
+            
+            def tmdb_search(endpoint, **params):
+                """TMDB request, answered from the prefetched ones and bounded by the deadline in parallel mode"""
+                if deadline_at is None:
+                    return self.tmdb_request(endpoint, **params)
+                key = TMDBCache.make_key(endpoint, params)
+                future = prefetched.get(key)
+                if future is None:
+                    future = prefetched[key] = self.tmdb_executor.submit(self.tmdb_request, endpoint, **params)
+                try:
+                    return future.result(timeout=max(0, deadline_at - time.monotonic()))
+                except FutureTimeoutError:
+                    raise TMDBDeadlineExceeded(f"no TMDB answer within {self.config.get('tmdb_deadline', 15)}s")
+            
+            def tv_media_info(tv_result):
+                """Media info for a TV search result, with seasons and episodes from the details"""
+                tv_id = tv_result.get('id')
+                tv_year = tv_result.get('first_air_date', '')[:4] if tv_result.get('first_air_date') else ''
+                print(f"    ✓ Found TV Series: {tv_result.get('name', 'Unknown')} ({tv_year})")
+                
+                # Get detailed TV info for number of seasons and episodes
+                try:
+                    detail_data = tmdb_search(f'tv/{tv_id}', language='de')
+                    
+                    seasons = detail_data.get('number_of_seasons', 0)
+                    episodes = detail_data.get('number_of_episodes', 0)
+                    series_name = detail_data.get('name', tv_result.get('name', 'Unknown'))
+                    rating = detail_data.get('vote_average', 0)
+                    poster_path = detail_data.get('poster_path')
+                    print(f"      Staffeln: {seasons}, Episoden: {episodes}, Rating: {rating}")
+                    
+                    return {
+                        'type': 'tv',
+                        'seasons': seasons,
+                        'episodes': episodes,
+                        'name': series_name,
+                        'year': tv_year,
+                        'rating': rating,
+                        'tmdb_id': tv_id,
+                        'poster_path': poster_path
+                    }
+                except TMDBDeadlineExceeded:
+                    raise
+                except Exception as e:
+                    print(f"      Details error: {e}")
+                    rating = tv_result.get('vote_average', 0)
+                    poster_path = tv_result.get('poster_path')
+                    return {'type': 'tv', 'name': tv_result.get('name', 'Unknown'), 'year': tv_year, 'rating': rating, 'tmdb_id': tv_id, 'poster_path': poster_path}
+            
+            def movie_media_info(movie_result):
+                release_date = movie_result.get('release_date', '')
+                movie_year = release_date[:4] if release_date else ''
+                movie_name = movie_result.get('title', 'Unknown')
+                movie_id = movie_result.get('id')
+                rating = movie_result.get('vote_average', 0)
+                poster_path = movie_result.get('poster_path')
+                movie_type = 'doku' if is_doku else 'movie'
+                print(f"    ✓ Found Movie: {movie_name} ({movie_year}), Rating: {rating}")
+                
+                return {
+                    'type': movie_type,
+                    'year': movie_year,
+                    'name': movie_name,
+                    'rating': rating,
+                    'tmdb_id': movie_id,
+                    'poster_path': poster_path
+                }
+            
+            def no_match():
+                print("  ⚠ No TMDB match found")
+                # If no TMDB match but doku tag found, return doku type
+                if is_doku:
+                    return {'type': 'doku', 'name': name}
+                return 'unknown'
+            
+            # Parallel mode: every branch and search term below at once (bounded pool, one
+            # deadline), the best-scoring result of all of them wins. Results of the branch the
+            # release name points to (TV for season markers, movie for a year) come first.
+            if self.config.get('tmdb_parallel', False):
+                searches = []
+                for query in query_variations(clean_name):
+                    if is_tv_series:
+                        searches.append((1, 'search/tv', {'query': query, 'language': 'de', 'first_air_date_year': year}))
+                    elif has_year:
+                        searches.append((1, 'search/movie', {'query': query, 'language': 'de', 'year': year}))
+                    searches.append((0, 'search/tv', {'query': query, 'language': 'de'}))
+                    if not has_year or not is_tv_series:
+                        searches.append((0, 'search/movie', {'query': query, 'language': 'de', 'year': year}))
+                prefetched.update(self.prefetch_tmdb([(endpoint, params) for _, endpoint, params in searches]))
+                deadline_at = time.monotonic() + self.config.get('tmdb_deadline', 15)
+                
+                best = None
+                for preferred, endpoint, params in searches:
+                    try:
+                        data = tmdb_search(endpoint, **params)
+                    except TMDBDeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        print(f"    Search error ({endpoint} '{params['query']}'): {e}")
+                        continue
+                    for result in (data.get('results') or [])[:5]:  # Check top 5 results
+                        similarity = calculate_similarity(params['query'], result.get('name') or result.get('title', ''))
+                        # Only accept if similarity is reasonable (>30), slight popularity boost
+                        if similarity <= 30:
+                            continue
+                        score = (preferred, similarity + result.get('popularity', 0) * 0.1)
+                        if best is None or score > best[0]:
+                            best = (score, endpoint, result)
+                
+                if best is None:
+                    return no_match()
+                _, endpoint, result = best
+                if endpoint == 'search/tv':
+                    return tv_media_info(result)
+                return movie_media_info(result)
+            
             # Prioritize TV series search if season/episode markers are present
             if is_tv_series:
                 # Define TV search function
                 def search_tv(query, year_param=None):
-                    search_url = f"https://api.themoviedb.org/3/search/tv?query={urllib.parse.quote(query)}&language=de"
-                    if year_param:
-                        search_url += f"&first_air_date_year={year_param}"
-                    
                     try:
-                        request = urllib.request.Request(search_url)
-                        request.add_header('Authorization', f'Bearer {api_key}')
-                        request.add_header('accept', 'application/json')
-                        
-                        response = urllib.request.urlopen(request, timeout=10)
-                        data = json.loads(response.read().decode('utf-8'))
+                        data = tmdb_search('search/tv', query=query, language='de', first_air_date_year=year_param)
                         
                         if data.get('results') and len(data['results']) > 0:
                             return data['results']  # Return all results, not just first
+                    except TMDBDeadlineExceeded:
+                        raise
                     except Exception as e:
                         print(f"    TV search error: {e}")
                     return None
@@ -489,13 +701,8 @@ class Downloader:
                         print(f"    ✓ Found TV Series: {tv_result.get('name', 'Unknown')} ({tv_year})")
                         
                         # Get detailed TV info for number of seasons and episodes
-                        details_url = f"https://api.themoviedb.org/3/tv/{tv_id}?language=de"
                         try:
-                            detail_request = urllib.request.Request(details_url)
-                            detail_request.add_header('Authorization', f'Bearer {api_key}')
-                            detail_request.add_header('accept', 'application/json')
-                            detail_response = urllib.request.urlopen(detail_request, timeout=10)
-                            detail_data = json.loads(detail_response.read().decode('utf-8'))
+                            detail_data = self.tmdb_request(f'tv/{tv_id}', language='de')
                             
                             seasons = detail_data.get('number_of_seasons', 0)
                             episodes = detail_data.get('number_of_episodes', 0)
@@ -521,20 +728,13 @@ class Downloader:
             elif has_year:
                 # Define movie search function
                 def search_movie(query, year_param=None):
-                    movie_url = f"https://api.themoviedb.org/3/search/movie?query={urllib.parse.quote(query)}&language=de"
-                    if year_param:
-                        movie_url += f"&year={year_param}"
-                    
                     try:
-                        request = urllib.request.Request(movie_url)
-                        request.add_header('Authorization', f'Bearer {api_key}')
-                        request.add_header('accept', 'application/json')
-                        
-                        response = urllib.request.urlopen(request, timeout=10)
-                        data = json.loads(response.read().decode('utf-8'))
+                        data = tmdb_search('search/movie', query=query, language='de', year=year_param)
                         
                         if data.get('results') and len(data['results']) > 0:
                             return data['results']  # Return all results
+                    except TMDBDeadlineExceeded:
+                        raise
                     except Exception as e:
                         print(f"    Movie search error: {e}")
                     return None
@@ -559,18 +759,13 @@ class Downloader:
             
             # Try TV series search as fallback (without year filter if initial search failed)
             def search_tv_fallback(query, year_param=None):
-                search_url = f"https://api.themoviedb.org/3/search/tv?query={urllib.parse.quote(query)}&language=de"
-                
                 try:
-                    request = urllib.request.Request(search_url)
-                    request.add_header('Authorization', f'Bearer {api_key}')
-                    request.add_header('accept', 'application/json')
-                    
-                    response = urllib.request.urlopen(request, timeout=10)
-                    data = json.loads(response.read().decode('utf-8'))
+                    data = tmdb_search('search/tv', query=query, language='de')
                     
                     if data.get('results') and len(data['results']) > 0:
                         return data['results']  # Return all results
+                except TMDBDeadlineExceeded:
+                    raise
                 except Exception as e:
                     print(f"    TV search error: {e}")
                 return None
@@ -578,59 +773,18 @@ class Downloader:
             tv_result = try_search_variations(search_tv_fallback, clean_name)
             
             if tv_result:
-                    tv_id = tv_result.get('id')
-                    tv_year = tv_result.get('first_air_date', '')[:4] if tv_result.get('first_air_date') else ''
-                    print(f"    ✓ Found TV Series: {tv_result.get('name', 'Unknown')} ({tv_year})")
-                    
-                    # Get detailed TV info for number of seasons and episodes
-                    details_url = f"https://api.themoviedb.org/3/tv/{tv_id}?language=de"
-                    try:
-                        detail_request = urllib.request.Request(details_url)
-                        detail_request.add_header('Authorization', f'Bearer {api_key}')
-                        detail_request.add_header('accept', 'application/json')
-                        detail_response = urllib.request.urlopen(detail_request, timeout=10)
-                        detail_data = json.loads(detail_response.read().decode('utf-8'))
-                        
-                        seasons = detail_data.get('number_of_seasons', 0)
-                        episodes = detail_data.get('number_of_episodes', 0)
-                        series_name = detail_data.get('name', tv_result.get('name', 'Unknown'))
-                        rating = detail_data.get('vote_average', 0)
-                        poster_path = detail_data.get('poster_path')
-                        print(f"      Staffeln: {seasons}, Episoden: {episodes}, Rating: {rating}")
-                        
-                        return {
-                            'type': 'tv',
-                            'seasons': seasons,
-                            'episodes': episodes,
-                            'name': series_name,
-                            'year': tv_year,
-                            'rating': rating,
-                            'tmdb_id': tv_id,
-                            'poster_path': poster_path
-                        }
-                    except Exception as e:
-                        print(f"      Details error: {e}")
-                        rating = tv_result.get('vote_average', 0)
-                        poster_path = tv_result.get('poster_path')
-                        return {'type': 'tv', 'name': tv_result.get('name', 'Unknown'), 'year': tv_year, 'rating': rating, 'tmdb_id': tv_id, 'poster_path': poster_path}
+                return tv_media_info(tv_result)
             
             # Try movie search as fallback (only if year was not in filename or not a TV series)
             if not has_year or not is_tv_series:
                 def search_movie_fallback(query, year_param=None):
-                    search_url = f"https://api.themoviedb.org/3/search/movie?query={urllib.parse.quote(query)}&language=de"
-                    if year_param:
-                        search_url += f"&year={year_param}"
-                    
                     try:
-                        request = urllib.request.Request(search_url)
-                        request.add_header('Authorization', f'Bearer {api_key}')
-                        request.add_header('accept', 'application/json')
-                        
-                        response = urllib.request.urlopen(request, timeout=10)
-                        data = json.loads(response.read().decode('utf-8'))
+                        data = tmdb_search('search/movie', query=query, language='de', year=year_param)
                         
                         if data.get('results') and len(data['results']) > 0:
                             return data['results']  # Return all results
+                    except TMDBDeadlineExceeded:
+                        raise
                     except Exception as e:
                         print(f"    Movie search error: {e}")
                     return None
@@ -638,33 +792,58 @@ class Downloader:
                 movie_result = try_search_variations(search_movie_fallback, clean_name, year_param=year)
                 
                 if movie_result:
-                    release_date = movie_result.get('release_date', '')
-                    movie_year = release_date[:4] if release_date else ''
-                    movie_name = movie_result.get('title', 'Unknown')
-                    movie_id = movie_result.get('id')
-                    rating = movie_result.get('vote_average', 0)
-                    poster_path = movie_result.get('poster_path')
-                    movie_type = 'doku' if is_doku else 'movie'
-                    print(f"    ✓ Found Movie: {movie_name} ({movie_year}), Rating: {rating}")
-                    
-                    return {
-                        'type': movie_type,
-                        'year': movie_year,
-                        'name': movie_name,
-                        'rating': rating,
-                        'tmdb_id': movie_id,
-                        'poster_path': poster_path
-                    }
+                    return movie_media_info(movie_result)
             
-            print("  ⚠ No TMDB match found")
-            # If no TMDB match but doku tag found, return doku type
-            if is_doku:
-                return {'type': 'doku', 'name': name}
-            return 'unknown'
+            return no_match()
             
+        except TMDBDeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error detecting media type: {e}")
             return 'unknown'
+        finally:
+            # Searches still queued when the deadline ran out are not sent anymore
+            for future in prefetched.values():
+                future.cancel()
+    
+    def resolve_media_info(self, sfdl_path, name):
+        """Media info for a downloaded SFDL, returns (media_info, detected)
+
+        Uses the .metadata.json entry written at upload time or by /update_media_type.
+        TMDB is only asked again if there is no usable entry (missing, still pending
+        or unknown); detected tells the caller whether the entry should be saved.
+        """
+        sfdl_filename = os.path.basename(sfdl_path)
+        try:
+            entry = MetadataStore.for_directory(self.config['files']).get(sfdl_filename)
+        except Exception as e:
+            print(f"  ⚠ Could not read metadata: {e}")
+            entry = None
+        
+        if isinstance(entry, dict):
+            # Manual override from the web interface: {'media_type': 'movie'|'tv'}
+            if entry.get('media_type') and not entry.get('type'):
+                media_info = {'type': entry['media_type']}
+                if media_info['type'] == 'tv':
+                    # Series folder from the release name
+                    media_info['name'] = parse_release(name)['title'] or 'Unknown Series'
+                print(f"\n  Media type (manuell gesetzt): {media_info['type']}")
+                return media_info, False
+            
+            if entry.get('type') not in (None, 'pending', 'unknown'):
+                print(f"\n  Media type (gespeichert): {entry['type']}")
+                return entry, False
+        
+        print(f"\n  Detecting media type...")
+        try:
+            media_info = self.detect_media_type(name)
+        except TMDBDeadlineExceeded as e:
+            # Not saved, the next download or detection asks TMDB again
+            print(f"  ⚠ {e}")
+            return {'type': 'unknown'}, False
+        if not isinstance(media_info, dict):
+            media_info = {'type': media_info}
+        return media_info, True
     
     def _command_exists(self, command):
         """Check if a command exists in PATH"""
@@ -676,74 +855,53 @@ class Downloader:
     
     def aes128cbc_decrypt(self, password, encrypted_base64):
         """Decrypt AES-128-CBC encrypted data (like bash aes128cbc function)"""
-        if not HAS_CRYPTO:
-            return None
-            
-        try:
-            # MD5 hash of password as key
-            key = hashlib.md5(password.encode()).digest()
-            
-            # Decode base64
-            encrypted_data = base64.b64decode(encrypted_base64)
-            
-            # First 16 bytes are IV
-            iv = encrypted_data[:16]
-            
-            # Decrypt
-            cipher = AES.new(key, AES.MODE_CBC, iv)
-            decrypted = cipher.decrypt(encrypted_data)
-            
-            # Remove first 16 bytes and padding (like tail -c +17)
-            decrypted = decrypted[16:]
-            
-            # Remove PKCS7 padding
-            padding_length = decrypted[-1]
-            if isinstance(padding_length, int) and padding_length < 16:
-                decrypted = decrypted[:-padding_length]
-            
-            # Decode to string
-            result = decrypted.decode('utf-8', errors='ignore')
-            
-            # Remove null bytes and control characters
-            result = result.replace('\x00', '')
-            result = ''.join(char for char in result if char.isprintable() or char in '\n\r\t')
-            
-            # Strip whitespace and zero-width characters
-            result = result.strip()
-            result = re.sub(r'[\u200b-\u200f\ufeff]', '', result)
-            
-            return result
-            
-        except Exception as e:
-            return None
+        return self.decrypt_many(password, [encrypted_base64])[0]
     
-    def bruteforce_decrypt(self, encrypted_value):
-        """Try multiple passwords to decrypt value and return the working password"""
+    def decrypt_many(self, password, values):
+        """Decrypt many SFDL fields with one password in a single pass (None where it fails)"""
+        key = self.password_keys.get(password) or password_key(password)
+        return decrypt_many(key, values)
+    
+    def bruteforce_decrypt(self, encrypted_value, uploader=None):
+        """Try multiple passwords to decrypt value and return the working password
+
+        Candidates are tried in PasswordStats order: the uploader's last password
+        first, then frequently and recently used ones, then the rest of passwords.txt.
+        """
         import sys
         print(f"    bruteforce_decrypt: Testing {len(self.passwords)} passwords")
         sys.stdout.flush()
         
-        for password in self.passwords:
-            # Skip empty password
-            if not password:
-                continue
-                
+        data = decode_field(encrypted_value)
+        if not HAS_CRYPTO or data is None:
+            print(f"    ✗ None of the passwords worked")
+            return None
+        
+        candidates = [password for password in self.password_stats.ordered(self.passwords, uploader) if password]
+        keys = [self.password_keys.get(password) or password_key(password) for password in candidates]
+        
+        # Wrong passwords are rejected on the first block (in parallel for huge lists),
+        # only plausible candidates get the full decrypt and check below
+        start = 0
+        while True:
+            index = find_key(data, keys, start,
+                             workers=self.config['password_workers'],
+                             parallel_min=self.config['password_parallel_min'])
+            if index is None:
+                break
+            start = index + 1
+            password = candidates[index]
+            
             result = self.aes128cbc_decrypt(password, encrypted_value)
             if result:
                 print(f"    Testing '{password}' -> '{result[:50]}...'")
                 sys.stdout.flush()
                 # Check if result looks valid (contains printable characters)
                 try:
-                    # Valid if it contains dots (like IPs/domains) or slashes (paths) or @ (usernames)
-                    # or is alphanumeric with common separators
-                    if len(result) > 0 and (
-                        '.' in result or 
-                        '/' in result or 
-                        '@' in result or
-                        (result.replace('_', '').replace('-', '').replace('.', '').isalnum() and len(result) > 5)
-                    ):
-                        print(f"    ✓ Password '{password}' works!")
+                    if looks_decrypted(result):
+                        print(f"    ✓ Password '{password}' works! (candidate {index + 1})")
                         sys.stdout.flush()
+                        self.password_stats.record_hit(password, uploader)
                         return password  # Return the PASSWORD, not the result
                 except Exception as e:
                     pass
@@ -761,7 +919,22 @@ class Downloader:
             'max_threads': 6,
             'extract_archives': True,
             'remove_archives': True,
-            'tmdb_api_key': ''
+            'tmdb_api_key': '',
+            'status_write_interval': 5,
+            'detection_workers': 2,
+            'tmdb_cache_days': 7,
+            'tmdb_cache_size': 5000,
+            'tmdb_parallel': False,
+            'tmdb_fanout': 8,
+            'tmdb_deadline': 15,
+            'tmdb_rate': 40,
+            'tmdb_retries': 4,
+            'password_workers': os.cpu_count() or 1,
+            'password_parallel_min': 20000,
+            'sfdl_cache_size': 200,
+            'segment_min_mb': 256,
+            'download_retries': 5,
+            'retry_backoff': 2
         }
         
         try:
@@ -816,6 +989,36 @@ class Downloader:
                     config['remove_archives'] = value.lower() == 'true'
                 elif key == 'TMDB_API_KEY':
                     config['tmdb_api_key'] = value
+                elif key == 'STATUS_WRITE_INTERVAL':
+                    config['status_write_interval'] = float(value)
+                elif key == 'DETECTION_WORKERS':
+                    config['detection_workers'] = int(value)
+                elif key == 'TMDB_CACHE_DAYS':
+                    config['tmdb_cache_days'] = float(value)
+                elif key == 'TMDB_CACHE_SIZE':
+                    config['tmdb_cache_size'] = int(value)
+                elif key == 'TMDB_PARALLEL':
+                    config['tmdb_parallel'] = value.lower() == 'true'
+                elif key == 'TMDB_FANOUT':
+                    config['tmdb_fanout'] = int(value)
+                elif key == 'TMDB_DEADLINE':
+                    config['tmdb_deadline'] = float(value)
+                elif key == 'TMDB_RATE':
+                    config['tmdb_rate'] = float(value)
+                elif key == 'TMDB_RETRIES':
+                    config['tmdb_retries'] = int(value)
+                elif key == 'PASSWORD_WORKERS':
+                    config['password_workers'] = max(1, int(value))
+                elif key == 'PASSWORD_PARALLEL_MIN':
+                    config['password_parallel_min'] = int(value)
+                elif key == 'SFDL_CACHE_SIZE':
+                    config['sfdl_cache_size'] = int(value)
+                elif key == 'SEGMENT_MIN_MB':
+                    config['segment_min_mb'] = int(value)
+                elif key == 'DOWNLOAD_RETRIES':
+                    config['download_retries'] = max(0, int(value))
+                elif key == 'RETRY_BACKOFF':
+                    config['retry_backoff'] = float(value)
         except Exception as e:
             print(f"Error loading config: {e}")
         
@@ -832,468 +1035,108 @@ class Downloader:
     
     def parse_sfdl(self, sfdl_path):
         """Parse SFDL file and extract download information"""
-        try:
-            # Try XML parsing first
-            try:
-                tree = ET.parse(sfdl_path)
-                root = tree.getroot()
-                return self._parse_sfdl_xml(root, sfdl_path)
-            except ET.ParseError as e:
-                # Fall back to regex-based parsing if XML parsing fails
-                print(f"XML parsing failed ({e}), using regex fallback")
-                return self._parse_sfdl_regex(sfdl_path)
-                
-        except Exception as e:
-            print(f"Error parsing SFDL: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
-    
-    def _parse_sfdl_xml(self, root, sfdl_path):
-        """Parse SFDL using XML parser"""
-        info = {
-            'name': '',
-            'uploader': '',
-            'host': '',
-            'port': 21,
-            'username': 'anonymous',
-            'password': 'anonymous@anonymous.nix',
-            'encrypted': False,
-            'auth_required': False,
-            'max_threads': 3,
-            'files': [],
-            'bulk_mode': False,
-            'bulk_paths': []
-        }
-        
-        # Extract metadata
-        for elem in root.iter():
-            if elem.tag == 'Description' and elem.text:
-                info['name'] = elem.text.strip()
-            elif elem.tag == 'Uploader' and elem.text:
-                info['uploader'] = elem.text.strip()
-            elif elem.tag == 'Host' and elem.text:
-                info['host'] = elem.text.strip()
-            elif elem.tag == 'Port' and elem.text:
-                info['port'] = int(elem.text.strip())
-            elif elem.tag == 'Username' and elem.text:
-                info['username'] = elem.text.strip()
-            elif elem.tag == 'Password' and elem.text:
-                info['password'] = elem.text.strip()
-            elif elem.tag == 'Encrypted' and elem.text:
-                info['encrypted'] = elem.text.strip().lower() == 'true'
-            elif elem.tag == 'AuthRequired' and elem.text:
-                info['auth_required'] = elem.text.strip().lower() == 'true'
-            elif elem.tag == 'MaxDownloadThreads' and elem.text:
-                info['max_threads'] = int(elem.text.strip())
-        
         import sys
-        print(">>> Checking for BulkFolderMode/BulkFolderPath in XML...")
-        sys.stdout.flush()
-        
-        # Check for BulkFolderMode first
-        packages = root.find('.//Packages')
-        if packages is not None:
-            for package in packages.findall('.//SFDLPackage'):
-                bulk_mode_elem = package.find('BulkFolderMode')
-                if bulk_mode_elem is not None and bulk_mode_elem.text:
-                    info['bulk_mode'] = bulk_mode_elem.text.strip().lower() == 'true'
-                    print(f">>> Found BulkFolderMode: {info['bulk_mode']}")
-                    sys.stdout.flush()
-                
-                # If bulk mode, extract BulkFolderPath
-                if info['bulk_mode']:
-                    bulk_list = package.find('BulkFolderList')
-                    if bulk_list is not None:
-                        for bulk_folder in bulk_list.findall('BulkFolder'):
-                            bulk_path_elem = bulk_folder.find('BulkFolderPath')
-                            if bulk_path_elem is not None and bulk_path_elem.text:
-                                bulk_path = bulk_path_elem.text.strip()
-                                info['bulk_paths'].append(bulk_path)
-                                print(f">>> Found BulkFolderPath (encrypted): {bulk_path[:50]}...")
-                                sys.stdout.flush()
-        
-        # Only extract individual files if not in bulk mode
-        if not info['bulk_mode'] and packages is not None:
-            for package in packages.findall('Package'):
-                for file_elem in package.findall('File'):
-                    file_info = {
-                        'name': '',
-                        'size': 0,
-                        'path': ''
-                    }
-                    
-                    for child in file_elem:
-                        if child.tag == 'FileName' and child.text:
-                            file_info['name'] = child.text.strip()
-                        elif child.tag == 'FileSize' and child.text:
-                            file_info['size'] = int(child.text.strip())
-                        elif child.tag == 'FileFullPath' and child.text:
-                            file_info['path'] = child.text.strip()
-                    
-                    if file_info['name']:
-                        info['files'].append(file_info)
-        
-        # Use filename if no description
-        if not info['name']:
-            info['name'] = os.path.splitext(os.path.basename(sfdl_path))[0]
-        
-        # Decrypt if encrypted (same as regex parser)
-        if info['encrypted']:
-            print(">>> SFDL is encrypted (XML mode), attempting to decrypt...")
-            sys.stdout.flush()
-            
-            encrypted_host = info['host']
-            print(f">>> Testing with encrypted host: {encrypted_host[:30]}...")
-            sys.stdout.flush()
+        try:
+            with open(sfdl_path, 'rb') as f:
+                data = f.read()
             
-            working_password = self.bruteforce_decrypt(encrypted_host)
+            self.refresh_passwords()
+            cache = self.sfdl_cache(sfdl_path)
+            cache_key = SFDLCache.content_key(data)
+            info = cache.get(cache_key) if cache else None
             
-            if not working_password:
-                print(f">>> ✗ Could not find password!")
-                sys.stdout.flush()
+            if info is not None:
+                print(f"SFDL Info: {os.path.basename(sfdl_path)} from cache (host={info['host']}, port={info['port']})")
             else:
-                print(f">>> ✓ Found password: {working_password}")
-                sys.stdout.flush()
+                info = parse_sfdl_data(data)
                 
-                # Decrypt metadata
-                print(f">>> Decrypting metadata...")
+                name_preview = info['name'][:50] + '...' if len(info['name']) > 50 else info['name']
+                print(f"SFDL Info: name={name_preview}, host={info['host']}, port={info['port']}")
+                print(f"Auth: user={info['username']}, auth_required={info['auth_required']}, encrypted={info['encrypted']}")
                 sys.stdout.flush()
                 
-                if info['host']:
-                    decrypted = self.aes128cbc_decrypt(working_password, info['host'])
-                    if decrypted:
-                        info['host'] = decrypted
-                        print(f">>> Decrypted host: {info['host']}")
-                    sys.stdout.flush()
-                    
-                if info['username'] and info['username'] != 'anonymous':
-                    decrypted = self.aes128cbc_decrypt(working_password, info['username'])
-                    if decrypted:
-                        info['username'] = decrypted
-                        print(f">>> Decrypted username: {info['username']}")
-                    sys.stdout.flush()
-                    
-                if info['password'] and info['password'] != 'anonymous@anonymous.nix':
-                    decrypted = self.aes128cbc_decrypt(working_password, info['password'])
-                    if decrypted:
-                        info['password'] = decrypted
-                        print(f">>> Decrypted password: ***")
-                    sys.stdout.flush()
-                    
-                if info['name']:
-                    decrypted_name = self.aes128cbc_decrypt(working_password, info['name'])
-                    if decrypted_name:
-                        info['name'] = decrypted_name
-                        print(f">>> Decrypted name: {info['name']}")
-                    sys.stdout.flush()
-                
-                # Decrypt bulk paths
-                if info['bulk_paths']:
-                    print(f">>> Decrypting {len(info['bulk_paths'])} bulk path(s)...")
-                    sys.stdout.flush()
-                    decrypted_paths = []
-                    for bulk_path_encrypted in info['bulk_paths']:
-                        bulk_path = self.aes128cbc_decrypt(working_password, bulk_path_encrypted)
-                        if bulk_path:
-                            decrypted_paths.append(bulk_path)
-                            print(f">>> Decrypted path: {bulk_path}")
-                        else:
-                            print(f">>> ✗ Failed to decrypt path")
-                        sys.stdout.flush()
-                    info['bulk_paths'] = decrypted_paths
-        
-        return info
-    
-    def _parse_sfdl_regex(self, sfdl_path):
-        """Parse SFDL using regex (fallback method like bash script)"""
-        
-        info = {
-            'name': '',
-            'uploader': '',
-            'host': '',
-            'port': 21,
-            'username': 'anonymous',
-            'password': 'anonymous@anonymous.nix',
-            'encrypted': False,
-            'auth_required': False,
-            'max_threads': 3,
-            'files': [],
-            'bulk_mode': False,
-            'bulk_paths': [],
-            'bulk_mode': False,
-            'bulk_paths': []
-        }
-        
-        try:
-            with open(sfdl_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Extract metadata using regex (like bash script with grep/cut)
-            def extract_tag(tag_name):
-                # Try multiple patterns to be more flexible
-                patterns = [
-                    f'<{tag_name}[^>]*>([^<]+)</{tag_name}>',  # Standard XML
-                    f'<{tag_name}>([^<]+)</{tag_name}>',       # Simple tags
-                    f'<{tag_name}[^>]*>\\s*([^<\\s][^<]*?)\\s*</{tag_name}>'  # With whitespace
-                ]
-                for pattern in patterns:
-                    match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
-                    if match:
-                        return match.group(1).strip()
-                return ''
+                # SFDLs without a working password are not cached, they are
+                # tried again (e.g. after passwords.txt was extended)
+                decrypted = self._decrypt_sfdl(info) if info['encrypted'] else True
+                if cache and decrypted:
+                    cache.set(cache_key, info)
             
-            info['name'] = extract_tag('Description') or os.path.splitext(os.path.basename(sfdl_path))[0]
-            # Remove zero-width space and other invisible characters
-            info['name'] = re.sub(r'[\u200b-\u200f\ufeff]', '', info['name'])
+            # Use filename if no description
+            if not info['name']:
+                info['name'] = os.path.splitext(os.path.basename(sfdl_path))[0]
             
-            info['uploader'] = extract_tag('Uploader')
-            info['host'] = extract_tag('Host')
-            
-            port_str = extract_tag('Port')
-            if port_str and port_str.isdigit():
-                info['port'] = int(port_str)
-            
-            username = extract_tag('Username')
-            password = extract_tag('Password')
-            
-            auth_required = extract_tag('AuthRequired')
-            info['auth_required'] = auth_required.lower() == 'true' if auth_required else False
-            
-            if not info['auth_required']:
-                info['username'] = 'anonymous'
-                info['password'] = 'anonymous@anonymous.nix'
+            if info['bulk_mode']:
+                print(f"Found {len(info['bulk_paths'])} BulkFolderPath(s) - using lftp to download directory")
+                for bulk_path in info['bulk_paths']:
+                    print(f"  BulkFolderPath: {bulk_path}")
             else:
-                info['username'] = username or 'anonymous'
-                info['password'] = password or 'anonymous@anonymous.nix'
-            
-            encrypted = extract_tag('Encrypted')
-            info['encrypted'] = encrypted.lower() == 'true' if encrypted else False
-            
-            max_threads = extract_tag('MaxDownloadThreads')
-            if max_threads and max_threads.isdigit():
-                info['max_threads'] = int(max_threads)
-            
-            name_preview = info['name'][:50] + '...' if len(info['name']) > 50 else info['name']
-            print(f"SFDL Info: name={name_preview}, host={info['host']}, port={info['port']}")
-            print(f"Auth: user={info['username']}, auth_required={info['auth_required']}, encrypted={info['encrypted']}")
-            
-            import sys
+                print(f"Successfully parsed {len(info['files'])} files from SFDL")
+                for i, f in enumerate(info['files'][:3]):
+                    print(f"  File {i+1}: {f['name']} ({f['size']} bytes) at {f['path']}")
             sys.stdout.flush()
             
-            # Store original encrypted values
-            encrypted_host = info['host'] if info['encrypted'] else None
-            
-            # Decrypt if encrypted
-            working_password = None
-            if info['encrypted']:
-                print("SFDL is encrypted, attempting to decrypt...")
-                
-                # Find password once by testing encrypted host
-                if encrypted_host:
-                    print(f"  Testing encrypted host: {encrypted_host[:30]}...")
-                    working_password = self.bruteforce_decrypt(encrypted_host)
-                    if not working_password:
-                        print("  ✗ Could not find valid password!")
-                        return info
-                    
-                    # Now decrypt all fields with the found password
-                    print(f"  ✓ Found password: {working_password}")
-                    
-                    # Decrypt host
-                    if info['host']:
-                        decrypted = self.aes128cbc_decrypt(working_password, info['host'])
-                        if decrypted:
-                            info['host'] = decrypted
-                            print(f"  Decrypted host: {info['host']}")
-                        else:
-                            print(f"  ✗ Failed to decrypt host")
-                    
-                    # Decrypt username
-                    if info['username'] and info['username'] != 'anonymous':
-                        decrypted = self.aes128cbc_decrypt(working_password, info['username'])
-                        if decrypted:
-                            info['username'] = decrypted
-                            print(f"  Decrypted username: {info['username']}")
-                        else:
-                            print(f"  ✗ Failed to decrypt username")
-                    
-                    # Decrypt password
-                    if info['password'] and info['password'] != 'anonymous@anonymous.nix':
-                        decrypted = self.aes128cbc_decrypt(working_password, info['password'])
-                        if decrypted:
-                            info['password'] = decrypted
-                            print(f"  Decrypted password: {'*' * len(info['password'])}")
-                        else:
-                            print(f"  ✗ Failed to decrypt password")
-                    
-                    # Decrypt name/description
-                    if info['name']:
-                        decrypted = self.aes128cbc_decrypt(working_password, info['name'])
-                        if decrypted:
-                            info['name'] = decrypted
-                            print(f"  Decrypted name: {info['name']}")
-                        else:
-                            print(f"  ✗ Failed to decrypt name")
-            
-            # Extract files - try multiple approaches
-            if info['encrypted'] and working_password:
-                print(f"Extracting files (encrypted with {working_password})...")
-            
-            print(f"\n  Content length: {len(content)} bytes")
-            if '<BulkFolderPath' in content:
-                print(f"  Found BulkFolderPath tag in content")
-            if '<Package' in content:
-                print(f"  Found Package tag in content")
-            if '<File' in content:
-                print(f"  Found File tag in content")
-            if '<BulkFolderMode>true</BulkFolderMode>' in content:
-                print(f"  Found BulkFolderMode=true")
-            
-            # Check for BulkFolderPath first (like bashloader.sh does)
-            # Pattern needs to handle nested structure
-            bulk_pattern = r'<BulkFolderPath[^>]*>([^<]+)</BulkFolderPath>'
-            bulk_matches = re.findall(bulk_pattern, content, re.IGNORECASE)
-            
-            print(f"  Regex found {len(bulk_matches)} BulkFolderPath matches")
-            
-            if bulk_matches:
-                print(f"Found {len(bulk_matches)} BulkFolderPath(s) - using lftp to download directory")
-                info['bulk_mode'] = True
-                info['bulk_paths'] = []
-                
-                for idx, bulk_path_encrypted in enumerate(bulk_matches):
-                    print(f"  Processing BulkFolderPath {idx+1}: {bulk_path_encrypted[:50]}...")
-                    if info['encrypted'] and working_password:
-                        bulk_path = self.aes128cbc_decrypt(working_password, bulk_path_encrypted)
-                        if bulk_path:
-                            info['bulk_paths'].append(bulk_path)
-                            print(f"  ✓ Decrypted BulkFolderPath: {bulk_path}")
-                        else:
-                            print(f"  ✗ Failed to decrypt BulkFolderPath")
-                    else:
-                        info['bulk_paths'].append(bulk_path_encrypted)
-                        print(f"  BulkFolderPath: {bulk_path_encrypted}")
-                
-                print(f"  Total decrypted paths: {len(info['bulk_paths'])}")
-                # For bulk mode, we'll download with lftp and discover files during download
-                return info
-            
-            # Method 1: Look for Package blocks first
-            package_pattern = r'<Package[^>]*>(.*?)</Package>'
-            package_matches = re.findall(package_pattern, content, re.DOTALL | re.IGNORECASE)
-            
-            if package_matches:
-                print(f"Found {len(package_matches)} package(s)")
-                for package_block in package_matches:
-                    # Find files within package
-                    file_pattern = r'<File[^>]*>(.*?)</File>'
-                    file_matches = re.findall(file_pattern, package_block, re.DOTALL | re.IGNORECASE)
-                    print(f"Found {len(file_matches)} file(s) in package")
-                    
-                    for file_block in file_matches:
-                        file_info = self._extract_file_info(file_block)
-                        if file_info and file_info['name']:
-                            # Decrypt each file field individually if encrypted
-                            if info['encrypted'] and working_password:
-                                if file_info['name']:
-                                    decrypted = self.aes128cbc_decrypt(working_password, file_info['name'])
-                                    if decrypted:
-                                        file_info['name'] = decrypted
-                                
-                                if file_info['path']:
-                                    decrypted = self.aes128cbc_decrypt(working_password, file_info['path'])
-                                    if decrypted:
-                                        file_info['path'] = decrypted
-                            
-                            info['files'].append(file_info)
-            else:
-                # Method 2: Look for File blocks directly (no packages)
-                print("No packages found, looking for direct File tags")
-                file_pattern = r'<File[^>]*>(.*?)</File>'
-                file_matches = re.findall(file_pattern, content, re.DOTALL | re.IGNORECASE)
-                print(f"Found {len(file_matches)} file(s) directly")
-                
-                for file_block in file_matches:
-                    file_info = self._extract_file_info(file_block)
-                    if file_info and file_info['name']:
-                        # Decrypt each file field individually if encrypted
-                        if info['encrypted'] and working_password:
-                            if file_info['name']:
-                                decrypted = self.aes128cbc_decrypt(working_password, file_info['name'])
-                                if decrypted:
-                                    file_info['name'] = decrypted
-                            
-                            if file_info['path']:
-                                decrypted = self.aes128cbc_decrypt(working_password, file_info['path'])
-                                if decrypted:
-                                    file_info['path'] = decrypted
-                        
-                        info['files'].append(file_info)
-            
-            print(f"Successfully parsed {len(info['files'])} files from SFDL using regex method")
-            
-            for i, f in enumerate(info['files'][:3]):
-                print(f"  File {i+1}: {f['name']} ({f['size']} bytes) at {f['path']}")
-            
             return info
-            
+                
         except Exception as e:
-            print(f"Error in regex parsing: {e}")
+            print(f"Error parsing SFDL: {e}")
             import traceback
             traceback.print_exc()
             return None
     
-    def _extract_file_info(self, file_block):
-        """Extract file information from a File XML block"""
+    def _decrypt_sfdl(self, info):
+        """Find the password of an encrypted SFDL and decrypt all fields in place"""
+        print("SFDL is encrypted, attempting to decrypt...")
+        if not info['host']:
+            print("  ✗ No host to test passwords with!")
+            return False
         
-        file_info = {
-            'name': '',
-            'size': 0,
-            'path': ''
-        }
+        print(f"  Testing encrypted host: {info['host'][:30]}...")
+        working_password = self.bruteforce_decrypt(info['host'], info['uploader'])
+        if not working_password:
+            print("  ✗ Could not find valid password!")
+            return False
+        print(f"  ✓ Found password: {working_password}")
         
-        # Extract filename - try multiple patterns
-        name_patterns = [
-            r'<FileName[^>]*>([^<]+)</FileName>',
-            r'<FileName>([^<]+)</FileName>',
-        ]
-        for pattern in name_patterns:
-            name_match = re.search(pattern, file_block, re.IGNORECASE)
-            if name_match:
-                file_info['name'] = name_match.group(1).strip()
-                break
+        # Every encrypted value of the SFDL goes through one decrypt_many call
+        fields = ['host', 'name']
+        if info['username'] != 'anonymous':
+            fields.append('username')
+        if info['password'] != 'anonymous@anonymous.nix':
+            fields.append('password')
         
-        # Extract file size
-        size_patterns = [
-            r'<FileSize[^>]*>([^<]+)</FileSize>',
-            r'<FileSize>([^<]+)</FileSize>',
-        ]
-        for pattern in size_patterns:
-            size_match = re.search(pattern, file_block, re.IGNORECASE)
-            if size_match:
-                try:
-                    file_info['size'] = int(size_match.group(1).strip())
-                except (ValueError, AttributeError):
-                    file_info['size'] = 0
-                break
+        values = [info[field] for field in fields]
+        values += [f['name'] for f in info['files']]
+        values += [f['path'] for f in info['files']]
+        values += info['bulk_paths']
+        decrypted = self.decrypt_many(working_password, values)
         
-        # Extract file path
-        path_patterns = [
-            r'<FileFullPath[^>]*>([^<]+)</FileFullPath>',
-            r'<FileFullPath>([^<]+)</FileFullPath>',
-        ]
-        for pattern in path_patterns:
-            path_match = re.search(pattern, file_block, re.IGNORECASE)
-            if path_match:
-                file_info['path'] = path_match.group(1).strip()
-                break
+        for field, value in zip(fields, decrypted):
+            if value:
+                info[field] = value
+            elif info[field]:
+                print(f"  ✗ Failed to decrypt {field}")
+        
+        count = len(fields)
+        names = decrypted[count:count + len(info['files'])]
+        paths = decrypted[count + len(info['files']):count + 2 * len(info['files'])]
+        for file_info, name, path in zip(info['files'], names, paths):
+            if name:
+                file_info['name'] = name
+            if path:
+                file_info['path'] = path
         
-        return file_info
+        bulk_paths = decrypted[count + 2 * len(info['files']):]
+        if bulk_paths.count(None):
+            print(f"  ✗ Failed to decrypt {bulk_paths.count(None)} BulkFolderPath(s)")
+        info['bulk_paths'] = [path for path in bulk_paths if path]
+        
+        print(f"  Decrypted host: {info['host']}, name: {info['name']}")
+        return True
     
     def update_status(self, status='running', action='', sfdl_name='', media_type='unknown', media_info=None):
-        """Update status.json file"""
+        """Publish a new status snapshot (and persist it to status.json if enabled)"""
         try:
+            progress = self.progress_snapshot()
             status_data = {
                 'data': [{
                     'version': '2.0',
@@ -1303,10 +1146,14 @@ class Downloader:
                     'sfdl': sfdl_name,
                     'action': action,
                     'media_type': media_type,
-                    'loading_mt_files': len(self.current_files),
-                    'loading_total_files': self.total_files,
+                    'loading_mt_files': len(progress['files']),
+                    'loading_total_files': progress['total_files'],
                     'loading': '',
-                    'loading_file_array': ''
+                    'loading_file_array': '',
+                    # Incomplete after all retries, these SFDLs stay in the queue
+                    'failed_files': [dict(failure, sfdl=sfdl_filename)
+                                     for sfdl_filename, failures in list(self.failed_files.items())
+                                     for failure in failures]
                 }]
             }
             
@@ -1323,8 +1170,10 @@ class Downloader:
             
             if self.is_downloading and self.start_time:
                 elapsed = time.time() - self.start_time
-                progress = (self.downloaded_bytes / self.total_bytes * 100) if self.total_bytes > 0 else 0
-                speed = (self.downloaded_bytes / 1024 / elapsed) if elapsed > 0 else 0  # KB/s
+                downloaded_bytes = progress['downloaded_bytes']
+                total_bytes = progress['total_bytes']
+                percent = (downloaded_bytes / total_bytes * 100) if total_bytes > 0 else 0
+                speed = (downloaded_bytes / 1024 / elapsed) if elapsed > 0 else 0  # KB/s
                 
                 # Format: status|downloaded_kb|total_kb|percent|speed_mb|time
                 hours = int(elapsed // 3600)
@@ -1332,62 +1181,371 @@ class Downloader:
                 seconds = int(elapsed % 60)
                 time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
                 
-                status_data['data'][0]['loading'] = f"{status}|{self.downloaded_bytes//1024}|{self.total_bytes//1024}|{progress:.1f}|{speed/1024:.2f}|{time_str}"
+                status_data['data'][0]['loading'] = f"{status}|{downloaded_bytes//1024}|{total_bytes//1024}|{percent:.1f}|{speed/1024:.2f}|{time_str}"
                 
                 # Format file array
                 file_array_parts = []
-                for file_info in self.current_files:
-                    fname = file_info.get('name', 'unknown')
-                    fsize = file_info.get('size', 0)
-                    fdownloaded = file_info.get('downloaded', 0)
+                for fname, fsize, fdownloaded in progress['files']:
                     file_array_parts.append(f"{fname}|{fsize}|{fdownloaded}")
                 
                 status_data['data'][0]['loading_file_array'] = ';'.join(file_array_parts)
             
-            # Write to status file
-            os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
-            with open(self.status_file, 'w') as f:
-                json.dump(status_data, f, indent=2)
+            snapshot = self._publish_status(status_data)
+            if snapshot:
+                self._persist_status(snapshot, force=(status != 'running'))
                 
         except Exception as e:
             print(f"Error updating status: {e}")
     
-    def download_file_ftp(self, host, port, username, password, remote_path, local_path, file_info):
-        """Download a single file via FTP"""
+    def _publish_status(self, status_data):
+        """Swap in a new snapshot if anything besides the timestamps changed
+        
+        Returns the new snapshot, or None if the status is unchanged.
+        """
+        entry = status_data['data'][0]
+        with self.status_condition:
+            previous = self.status_snapshot
+            if previous is not None:
+                previous_entry = previous.data['data'][0]
+                if all(entry.get(k) == previous_entry.get(k)
+                       for k in set(entry) | set(previous_entry) if k not in ('date', 'datetime')):
+                    return None
+            
+            version = previous.version + 1 if previous else 1
+            body = json.dumps(status_data).encode('utf-8')
+            self.status_snapshot = StatusSnapshot(version, status_data, body)
+            self.status_condition.notify_all()
+            return self.status_snapshot
+    
+    def _persist_status(self, snapshot, force=False):
+        """Write status.json atomically, at most once per status_write_interval
+        
+        Final states (force=True) are always written so the file never stays on 'running'.
+        """
+        interval = self.config.get('status_write_interval', 0)
+        if interval <= 0 or not self.status_file:
+            return
+        
+        with self.status_write_lock:
+            if snapshot.version <= self.status_written_version:
+                return
+            now = time.time()
+            if not force and now - self.status_written_at < interval:
+                return
+            self.status_written_at = now
+            
+            try:
+                os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
+                tmp_file = f"{self.status_file}.{threading.get_ident()}.tmp"
+                with open(tmp_file, 'w') as f:
+                    json.dump(snapshot.data, f, indent=2)
+                os.replace(tmp_file, self.status_file)
+                self.status_written_version = snapshot.version
+            except Exception as e:
+                print(f"Error writing status file: {e}")
+    
+    def wait_for_status(self, version, timeout=None):
+        """Block until a snapshot newer than version is published (or timeout), then return the current one"""
+        with self.status_condition:
+            self.status_condition.wait_for(
+                lambda: self.status_snapshot is not None and self.status_snapshot.version != version,
+                timeout=timeout
+            )
+            return self.status_snapshot
+    
+    def get_status_snapshot(self):
+        """Return the current status snapshot without touching the filesystem"""
+        snapshot = self.status_snapshot
+        if snapshot is None:
+            self.update_status(status='idle', action='done', sfdl_name='')
+            snapshot = self.status_snapshot
+        return snapshot
+    
+    def download_file_ftp(self, pool, remote_path, local_path, file_info):
+        """Download a single file via FTP on a pooled connection
+
+        A partial local file (from a dropped connection or an earlier run) is
+        resumed with REST instead of being downloaded again. The result is checked
+        against FileSize from the SFDL.
+        """
         try:
             # Create directory if needed
             os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            expected_size = file_info.get('size', 0)
             
-            # Connect to FTP
-            ftp = ftplib.FTP()
-            ftp.connect(host, port, timeout=30)
-            ftp.login(username, password)
-            ftp.set_pasv(True)
+            # Large files are split across several connections
+            segments = self.segment_count(expected_size, pool.size)
+            if segments > 1 or os.path.exists(local_path + '.parts'):
+                return self.download_file_segmented(pool, remote_path, local_path, file_info, max(segments, 1))
             
-            # Change to directory
-            if remote_path:
-                try:
-                    ftp.cwd(remote_path)
-                except:
-                    pass
-            
-            # Download file with progress tracking
-            file_info['downloaded'] = 0
-            
-            def handle_binary(data):
-                f.write(data)
-                file_info['downloaded'] += len(data)
-                self.downloaded_bytes += len(data)
-            
-            with open(local_path, 'wb') as f:
-                ftp.retrbinary(f"RETR {file_info['name']}", handle_binary)
+            resume = True
             
-            ftp.quit()
+            for attempt in range(3):
+                offset = os.path.getsize(local_path) if resume and os.path.exists(local_path) else 0
+                if expected_size and offset > expected_size:
+                    print(f"  Local file larger than expected, downloading {file_info['name']} again")
+                    offset = 0
+                
+                # Bytes already on disk count as downloaded
+                file_progress = self.set_file_progress(file_info, offset)
+                
+                if expected_size and offset == expected_size:
+                    print(f"  Already complete: {file_info['name']}")
+                    return True
+                
+                reused = False
+                try:
+                    with pool.connection(fresh=attempt > 0) as (ftp, reused):
+                        # Change to directory
+                        pool.cwd(ftp, remote_path)
+                        
+                        # Download file with progress tracking (this thread's counter cells)
+                        file_cell = file_progress.cell()
+                        total_cell = self.progress.cell()
+                        
+                        def handle_binary(data):
+                            try:
+                                f.write(data)
+                            except OSError as e:
+                                raise LocalWriteError(e) from e
+                            file_cell[0] += len(data)
+                            total_cell[0] += len(data)
+                        
+                        if offset:
+                            print(f"  Resuming {file_info['name']} at {offset} bytes")
+                        try:
+                            f = open(local_path, 'ab' if offset else 'wb')
+                        except OSError as e:
+                            raise LocalWriteError(e) from e
+                        with f:
+                            ftp.retrbinary(f"RETR {file_info['name']}", handle_binary, rest=offset or None)
+                    break
+                except ftplib.error_perm as e:
+                    # Server without REST support, start over from byte 0
+                    if not offset or not resume:
+                        raise
+                    print(f"  Resume not supported ({e}), downloading {file_info['name']} from start")
+                    resume = False
+                except FTPPool.CONNECTION_ERRORS as e:
+                    # The server dropped a connection while it was idle in the pool,
+                    # try once more on a new login (continuing where the transfer stopped)
+                    if not reused or attempt:
+                        raise
+                    print(f"  Connection lost ({e}), reconnecting for {file_info['name']}")
+            
+            actual_size = os.path.getsize(local_path)
+            if expected_size and actual_size != expected_size:
+                print(f"  ✗ Size mismatch for {file_info['name']}: {actual_size} of {expected_size} bytes")
+                file_info['error'] = f"size {actual_size} of {expected_size} bytes"
+                if actual_size > expected_size:
+                    os.remove(local_path)
+                return False
             return True
             
+        except LocalWriteError:
+            raise
         except Exception as e:
             print(f"Error downloading {file_info['name']}: {e}")
+            file_info['error'] = str(e)
+            return False
+    
+    def download_file_with_retry(self, pool, remote_path, local_path, file_info):
+        """download_file_ftp with retries, exponential backoff and jitter
+
+        Every attempt resumes from what the previous one left on disk. Returns
+        False once DOWNLOAD_RETRIES retries failed or the download was stopped.
+        Local write errors (disk full, no permission) fail at once.
+        """
+        retries = self.config['download_retries']
+        for attempt in range(retries + 1):
+            file_info['attempts'] = attempt + 1
+            file_info.pop('error', None)
+            try:
+                if self.download_file_ftp(pool, remote_path, local_path, file_info):
+                    return True
+            except LocalWriteError as e:
+                print(f"  ✗ Could not write {local_path}: {e}")
+                file_info['error'] = f"write error: {e}"
+                return False
+            if attempt >= retries or not self.is_downloading:
+                break
+            
+            delay = min(self.config['retry_backoff'] * (2 ** attempt), 300) * random.uniform(0.8, 1.2)
+            print(f"  Retry {attempt + 1}/{retries} for {file_info['name']} in {delay:.1f}s")
+            deadline = time.monotonic() + delay
+            while self.is_downloading and time.monotonic() < deadline:
+                time.sleep(min(0.5, deadline - time.monotonic()))
+        
+        file_info.setdefault('error', 'stopped')
+        return False
+    
+    def file_complete(self, local_path, file_info):
+        """Whether a downloaded file is finished (right size, no open segments)"""
+        if not os.path.exists(local_path) or os.path.exists(local_path + '.parts'):
             return False
+        return not file_info['size'] or os.path.getsize(local_path) == file_info['size']
+    
+    def segment_count(self, size, connections):
+        """Number of ranges a file of this size is downloaded in (1 = not segmented)"""
+        min_size = self.config['segment_min_mb'] * 1024 * 1024
+        if min_size <= 0 or not hasattr(os, 'pwrite'):
+            return 1
+        return max(1, min(connections, size // min_size))
+    
+    def download_file_segmented(self, pool, remote_path, local_path, file_info, segments):
+        """Download one large file in parallel ranges (like lftp pget)
+
+        The file is preallocated and split into segments ranges. Each range is
+        fetched with REST on its own pooled connection and written in place with
+        os.pwrite. Progress of every range is kept in local_path + '.parts', so an
+        interrupted download continues each range where it stopped.
+        """
+        size = file_info['size']
+        parts_file = local_path + '.parts'
+        lock = threading.Lock()
+        
+        ranges = None
+        if os.path.exists(parts_file):
+            try:
+                with open(parts_file, 'r') as f:
+                    saved = json.load(f)
+                if saved.get('size') == size:
+                    ranges = saved['ranges']
+            except (OSError, ValueError, KeyError) as e:
+                print(f"  ⚠ Could not read {parts_file}: {e}")
+        if ranges is None:
+            # Without .parts the local file is complete or a plain sequential partial download
+            existing = os.path.getsize(local_path) if os.path.exists(local_path) else 0
+            if existing == size:
+                print(f"  Already complete: {file_info['name']}")
+                self.set_file_progress(file_info, size)
+                return True
+            if existing > size:
+                existing = 0
+            step = -(-size // segments)
+            ranges = [[min(max(start, existing), start + step, size), min(start + step, size)]
+                      for start in range(0, size, step)]
+        
+        def save_ranges():
+            tmp_file = f"{parts_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({'size': size, 'ranges': ranges}, f)
+            os.replace(tmp_file, parts_file)
+        
+        # .parts is written before the file is preallocated, a full-size file
+        # without it is always a finished download
+        try:
+            save_ranges()
+            fd = os.open(local_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            raise LocalWriteError(e) from e
+        # Local write errors of any range, they stop all ranges
+        write_errors = []
+        
+        def checkpoint():
+            with lock:
+                try:
+                    save_ranges()
+                except OSError as e:
+                    write_errors.append(e)
+        
+        try:
+            try:
+                if os.fstat(fd).st_size != size:
+                    os.ftruncate(fd, size)
+                    if hasattr(os, 'posix_fallocate'):
+                        os.posix_fallocate(fd, 0, size)
+            except OSError as e:
+                raise LocalWriteError(e) from e
+            
+            file_progress = self.set_file_progress(file_info, size - sum(end - position for position, end in ranges))
+            
+            remaining = [item for item in ranges if item[0] < item[1]]
+            print(f"  Segmented download of {file_info['name']}: {len(remaining)} of {len(ranges)} range(s) open")
+            
+            def fetch(item):
+                """Fetch one range, item is [position, end] and is updated in place"""
+                saved_at = item[0]
+                for attempt in range(2):
+                    if item[0] >= item[1]:
+                        return True
+                    if write_errors:
+                        return False
+                    try:
+                        ftp, _ = pool.acquire(fresh=attempt > 0)
+                    except ftplib.all_errors as e:
+                        print(f"  ✗ No connection for range {item[0]}-{item[1]} of {file_info['name']}: {e}")
+                        return False
+                    broken = False
+                    try:
+                        pool.cwd(ftp, remote_path)
+                        ftp.voidcmd('TYPE I')
+                        conn = ftp.transfercmd(f"RETR {file_info['name']}", rest=item[0] or None)
+                        file_cell = file_progress.cell()
+                        total_cell = self.progress.cell()
+                        try:
+                            while item[0] < item[1] and not write_errors:
+                                data = conn.recv(min(65536, item[1] - item[0]))
+                                if not data:
+                                    break
+                                try:
+                                    os.pwrite(fd, data, item[0])
+                                except OSError as e:
+                                    write_errors.append(e)
+                                    break
+                                # Only this thread writes item, save_ranges() just reads it
+                                item[0] += len(data)
+                                file_cell[0] += len(data)
+                                total_cell[0] += len(data)
+                                if item[0] - saved_at >= 16 * 1024 * 1024:
+                                    saved_at = item[0]
+                                    checkpoint()
+                        finally:
+                            conn.close()
+                        
+                        if write_errors:
+                            # Transfer aborted mid-file, the control connection is not reused
+                            broken = True
+                            return False
+                        
+                        # Ranges that end before EOF close the data connection early,
+                        # servers answer that with 426 but keep the control connection
+                        try:
+                            ftp.voidresp()
+                        except (ftplib.error_temp, ftplib.error_perm):
+                            if item[1] == size:
+                                raise
+                        
+                        if item[0] < item[1]:
+                            raise EOFError(f"range ended at {item[0]} of {item[1]}")
+                        return True
+                    except ftplib.all_errors as e:
+                        broken = True
+                        if attempt:
+                            print(f"  ✗ Range {item[0]}-{item[1]} of {file_info['name']} failed: {e}")
+                            return False
+                        # Continue the range on a new login
+                        print(f"  Connection lost ({e}), reconnecting for range {item[0]}-{item[1]}")
+                    finally:
+                        pool.release(ftp, broken=broken)
+                        checkpoint()
+                return False
+            
+            # At most one range per pooled connection at a time
+            with ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix='segment') as executor:
+                results = list(executor.map(fetch, remaining))
+        finally:
+            os.close(fd)
+        
+        if write_errors:
+            raise LocalWriteError(write_errors[0])
+        if not all(results) or any(position < end for position, end in ranges):
+            print(f"  ✗ Segmented download of {file_info['name']} incomplete, will resume next time")
+            file_info['error'] = 'segments incomplete'
+            return False
+        
+        os.remove(parts_file)
+        return True
     
     def download_bulk_lftp(self, sfdl_info, sfdl_path):
         """Download entire directory using lftp (for BulkFolderPath mode)"""
@@ -1607,7 +1765,7 @@ class Downloader:
                                 self.total_files = len(file_list)
                             
                             # Build current files list with expected sizes
-                            self.current_files = []
+                            current_files = []
                             for file_info in file_list:
                                 filename = file_info['name']
                                 current_size = file_info['size']
@@ -1648,11 +1806,12 @@ class Downloader:
                                 previous_file_sizes[filename] = current_size
                                 
                                 # Add to current files
-                                self.current_files.append({
+                                current_files.append({
                                     'name': filename,
                                     'size': expected_size,
                                     'downloaded': downloaded
                                 })
+                            self.set_current_files(current_files)
                             
                             # Update status with current size
                             self.update_status(
@@ -1714,7 +1873,7 @@ class Downloader:
                     # Update with actual final size (100%)
                     self.total_bytes = actual_total_size
                     self.downloaded_bytes = actual_total_size
-                    self.current_files = final_file_list
+                    self.set_current_files(final_file_list)
                     
                     # Send final status update
                     self.update_status(
@@ -1727,14 +1886,9 @@ class Downloader:
                 
                 sys.stdout.flush()
             
-            # Detect media type using TMDB
-            print(f"\n  Detecting media type...")
-            media_info = self.detect_media_type(sfdl_info['name'])
-            if isinstance(media_info, dict):
-                media_type = media_info.get('type', 'unknown')
-            else:
-                media_type = media_info
-                media_info = {'type': media_type}
+            # Media type from upload time (or manual override), TMDB only if missing
+            media_info, detected = self.resolve_media_info(sfdl_path, sfdl_info['name'])
+            media_type = media_info.get('type', 'unknown')
             
             self.update_status(
                 status='running',
@@ -1896,23 +2050,15 @@ class Downloader:
                 # Unknown type: keep in downloads folder
                 final_dir = self.config['downloads']
             
-            # Save metadata to .metadata.json
-            try:
-                metadata_file = os.path.join(self.config['files'], '.metadata.json')
-                metadata = {}
-                if os.path.exists(metadata_file):
-                    with open(metadata_file, 'r') as mf:
-                        metadata = json.load(mf)
-                
-                sfdl_filename = os.path.basename(sfdl_path)
-                metadata[sfdl_filename] = media_info
-                
-                with open(metadata_file, 'w') as mf:
-                    json.dump(metadata, mf, indent=2)
-                
-                print(f"  ✓ Metadata saved: {media_type}")
-            except Exception as e:
-                print(f"  ⚠ Failed to save metadata: {e}")
+            # Save metadata to .metadata.json (only if it was detected just now)
+            if detected:
+                try:
+                    sfdl_filename = os.path.basename(sfdl_path)
+                    MetadataStore.for_directory(self.config['files']).set(sfdl_filename, media_info)
+                    
+                    print(f"  ✓ Metadata saved: {media_type}")
+                except Exception as e:
+                    print(f"  ⚠ Failed to save metadata: {e}")
             
             # Move SFDL to done folder
             done_dir = os.path.join(self.config['files'], 'done')
@@ -1986,10 +2132,17 @@ class Downloader:
             download_dir = os.path.join(self.config['downloads'], sfdl_info['name'])
             os.makedirs(download_dir, exist_ok=True)
             
-            # Download files with threading
+            # Download files with threading, each worker reuses a logged-in connection
             max_threads = min(sfdl_info['max_threads'], self.config['max_threads'])
             threads = []
             file_queue = list(sfdl_info['files'])
+            ftp_pool = FTPPool(
+                sfdl_info['host'],
+                sfdl_info['port'],
+                sfdl_info['username'],
+                sfdl_info['password'],
+                size=max_threads
+            )
             
             def worker():
                 while file_queue and self.is_downloading:
@@ -1999,7 +2152,7 @@ class Downloader:
                         break
                     
                     # Add to current files
-                    self.current_files.append(file_info)
+                    self.file_started(file_info)
                     
                     # Update status
                     self.update_status(
@@ -2008,23 +2161,17 @@ class Downloader:
                         sfdl_name=sfdl_info['name']
                     )
                     
-                    # Download file
+                    # Download file (retried with backoff, resumes on every attempt)
                     local_path = os.path.join(download_dir, file_info['name'])
-                    success = self.download_file_ftp(
-                        sfdl_info['host'],
-                        sfdl_info['port'],
-                        sfdl_info['username'],
-                        sfdl_info['password'],
+                    success = self.download_file_with_retry(
+                        ftp_pool,
                         file_info['path'],
                         local_path,
                         file_info
                     )
                     
-                    if success:
-                        self.downloaded_files += 1
-                    
                     # Remove from current files
-                    self.current_files.remove(file_info)
+                    self.file_finished(file_info, success)
             
             # Start worker threads
             for i in range(max_threads):
@@ -2041,14 +2188,37 @@ class Downloader:
                 )
                 time.sleep(0.5)
             
-            # Detect media type using TMDB
-            print(f"\n  Detecting media type...")
-            media_info = self.detect_media_type(sfdl_info['name'])
-            if isinstance(media_info, dict):
-                media_type = media_info.get('type', 'unknown')
-            else:
-                media_type = media_info
-                media_info = {'type': media_type}
+            ftp_pool.close()
+            print(f"  FTP: {ftp_pool.logins} login(s) for {self.total_files} file(s)")
+            
+            # Post-processing only with every part complete, otherwise archives fail
+            # to extract. The SFDL stays in the queue and the next run resumes.
+            sfdl_filename = os.path.basename(sfdl_path)
+            incomplete = [f for f in sfdl_info['files']
+                          if not self.file_complete(os.path.join(download_dir, f['name']), f)]
+            if incomplete:
+                self.failed_files[sfdl_filename] = [
+                    {'name': f['name'], 'error': f.get('error', 'not downloaded'), 'attempts': f.get('attempts', 0)}
+                    for f in incomplete
+                ]
+                self.save_failed_files()
+                print(f"\n  ✗ {len(incomplete)} of {len(sfdl_info['files'])} file(s) incomplete, SFDL stays in the queue:")
+                for failure in self.failed_files[sfdl_filename]:
+                    print(f"    {failure['name']}: {failure['error']} ({failure['attempts']} attempt(s))")
+                sys.stdout.flush()
+                self.is_downloading = False
+                self.update_status(
+                    status='error',
+                    action=f'{len(incomplete)} Datei(en) fehlgeschlagen - wird beim nächsten Durchlauf fortgesetzt',
+                    sfdl_name=sfdl_info['name']
+                )
+                return False
+            if self.failed_files.pop(sfdl_filename, None) is not None:
+                self.save_failed_files()
+            
+            # Media type from upload time (or manual override), TMDB only if missing
+            media_info, detected = self.resolve_media_info(sfdl_path, sfdl_info['name'])
+            media_type = media_info.get('type', 'unknown')
             
             # Cleanup unwanted files first
             print(f"\n  Cleaning up unwanted files...")
@@ -2201,23 +2371,14 @@ class Downloader:
                 # Unknown type: keep in downloads folder
                 final_dir = self.config['downloads']
             
-            # Save metadata to .metadata.json
-            try:
-                metadata_file = os.path.join(self.config['files'], '.metadata.json')
-                metadata = {}
-                if os.path.exists(metadata_file):
-                    with open(metadata_file, 'r') as mf:
-                        metadata = json.load(mf)
-                
-                sfdl_filename = os.path.basename(sfdl_path)
-                metadata[sfdl_filename] = media_info
-                
-                with open(metadata_file, 'w') as mf:
-                    json.dump(metadata, mf, indent=2)
-                
-                print(f"  ✓ Metadata saved: {media_type}")
-            except Exception as e:
-                print(f"  ⚠ Failed to save metadata: {e}")
+            # Save metadata to .metadata.json (only if it was detected just now)
+            if detected:
+                try:
+                    MetadataStore.for_directory(self.config['files']).set(sfdl_filename, media_info)
+                    
+                    print(f"  ✓ Metadata saved: {media_type}")
+                except Exception as e:
+                    print(f"  ⚠ Failed to save metadata: {e}")
             
             # Mark as done
             self.is_downloading = False
@@ -2236,6 +2397,9 @@ class Downloader:
             self.is_downloading = False
             self.update_status(status='error', action=f'Error: {str(e)}')
             return False
+        finally:
+            # Also after a parse failure or a failed bulk download
+            self.is_downloading = False
     
     def process_sfdl_files(self):
         """Process all SFDL files in the queue"""
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+import time
+import ftplib
+import threading
+import contextlib
+
+
+class FTPPool:
+    """Logged-in FTP control connections shared by the download workers of one SFDL
+
+    Every file used to open its own connection (connect, login, PASV, CWD, RETR,
+    quit). The pool keeps up to size connections logged in and hands them from
+    file to file, so a release with 80 parts logs in once per worker instead of
+    80 times. Connections that sat idle longer than health_interval are checked
+    with NOOP before they are handed out; dead ones are replaced by a new login.
+    """
+
+    # Errors that mean the control connection is gone (server timeout, kick, reset).
+    # 421 is "service not available, closing control connection".
+    CONNECTION_ERRORS = (EOFError, OSError, ftplib.error_temp, ftplib.error_reply)
+
+    def __init__(self, host, port, username, password, size, timeout=30, health_interval=10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.health_interval = health_interval
+
+        self.lock = threading.Lock()
+        self.slots = threading.Semaphore(self.size)
+        self.idle = []
+        self.logins = 0
+        self.reconnects = 0
+
+    def _connect(self):
+        ftp = ftplib.FTP()
+        ftp.connect(self.host, self.port, timeout=self.timeout)
+        ftp.login(self.username, self.password)
+        ftp.set_pasv(True)
+        try:
+            ftp.home_dir = ftp.pwd()
+        except ftplib.all_errors:
+            ftp.home_dir = None
+        ftp.current_dir = ftp.home_dir
+        ftp.last_used = time.monotonic()
+        with self.lock:
+            self.logins += 1
+        return ftp
+
+    def _healthy(self, ftp):
+        if time.monotonic() - ftp.last_used < self.health_interval:
+            return True
+        try:
+            ftp.voidcmd('NOOP')
+            return True
+        except ftplib.all_errors:
+            return False
+
+    def acquire(self, fresh=False):
+        """A logged-in connection, returns (ftp, reused); blocks while all are in use
+
+        fresh=True skips the idle connections and logs in anew.
+        """
+        self.slots.acquire()
+        try:
+            while True:
+                with self.lock:
+                    ftp = self.idle.pop() if self.idle and not fresh else None
+                if ftp is None:
+                    return self._connect(), False
+                if self._healthy(ftp):
+                    return ftp, True
+                self._close(ftp)
+                with self.lock:
+                    self.reconnects += 1
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, ftp, broken=False):
+        """Return a connection to the pool (broken ones are closed)"""
+        try:
+            if broken:
+                self._close(ftp)
+            else:
+                ftp.last_used = time.monotonic()
+                with self.lock:
+                    self.idle.append(ftp)
+        finally:
+            self.slots.release()
+
+    @contextlib.contextmanager
+    def connection(self, fresh=False):
+        """with pool.connection() as (ftp, reused): ... - errors close the connection"""
+        ftp, reused = self.acquire(fresh)
+        try:
+            yield ftp, reused
+        except ftplib.error_perm:
+            # e.g. 550 file not found, the connection itself is fine
+            self.release(ftp)
+            raise
+        except BaseException:
+            self.release(ftp, broken=True)
+            raise
+        self.release(ftp)
+
+    def cwd(self, ftp, path):
+        """Change directory, skipped if the connection is already there
+
+        Like before, a directory that cannot be entered is ignored and the file is
+        requested from the login directory.
+        """
+        target = path or ftp.home_dir
+        if target and not target.startswith('/') and ftp.home_dir:
+            target = ftp.home_dir.rstrip('/') + '/' + target
+        if not target or target == ftp.current_dir:
+            return
+        try:
+            ftp.cwd(target)
+            ftp.current_dir = target
+        except ftplib.error_perm:
+            if ftp.home_dir and ftp.current_dir != ftp.home_dir:
+                ftp.cwd(ftp.home_dir)
+                ftp.current_dir = ftp.home_dir
+
+    def _close(self, ftp):
+        try:
+            ftp.quit()
+        except ftplib.all_errors:
+            ftp.close()
+
+    def close(self):
+        """Log out all idle connections"""
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for ftp in idle:
+            self._close(ftp)
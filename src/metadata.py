@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import threading
+
+# One lock per metadata file, shared by every MetadataStore instance in the process
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+class MetadataStore:
+    """Thread-safe read-modify-write access to an upload directory's .metadata.json
+
+    Web handlers, background detection workers and the downloader all update the
+    same file. Every change happens under a per-file lock and is written to a
+    temporary file first, then renamed into place.
+    """
+
+    def __init__(self, metadata_file):
+        self.metadata_file = os.path.abspath(metadata_file)
+        with _locks_guard:
+            self.lock = _locks.setdefault(self.metadata_file, threading.RLock())
+
+    @classmethod
+    def for_directory(cls, files_dir):
+        """Store for the .metadata.json inside an upload directory"""
+        return cls(os.path.join(files_dir, '.metadata.json'))
+
+    def load(self):
+        """Return the whole metadata dict ({} if missing or unreadable)"""
+        with self.lock:
+            if not os.path.exists(self.metadata_file):
+                return {}
+            try:
+                with open(self.metadata_file, 'r') as mf:
+                    return json.load(mf)
+            except (OSError, ValueError) as e:
+                print(f"  ⚠ Could not read metadata: {e}")
+                return {}
+
+    def get(self, filename, default=None):
+        """Metadata entry for one SFDL file"""
+        return self.load().get(filename, default)
+
+    def modify(self, func):
+        """Apply func(metadata) under the lock and save the result; returns func's return value
+
+        Only a missing file counts as empty. A file that cannot be parsed is moved
+        aside first, a file that cannot be read raises OSError and is left alone.
+        """
+        with self.lock:
+            metadata = self._load_for_update()
+            result = func(metadata)
+            self.save(metadata)
+            return result
+
+    def _load_for_update(self):
+        if not os.path.exists(self.metadata_file):
+            return {}
+        with open(self.metadata_file, 'r') as mf:
+            content = mf.read()
+        try:
+            metadata = json.loads(content)
+            if isinstance(metadata, dict):
+                return metadata
+            error = f"expected an object, got {type(metadata).__name__}"
+        except ValueError as e:
+            error = e
+        # Keep the broken file for manual recovery instead of overwriting it
+        base = broken_file = f"{self.metadata_file}.broken-{time.strftime('%Y%m%d-%H%M%S')}"
+        suffix = 1
+        while os.path.exists(broken_file):
+            broken_file = f"{base}-{suffix}"
+            suffix += 1
+        os.replace(self.metadata_file, broken_file)
+        print(f"  ⚠ Could not parse metadata ({error}), moved to {os.path.basename(broken_file)}")
+        return {}
+
+    def set(self, filename, info):
+        """Replace the entry for one SFDL file"""
+        def apply(metadata):
+            metadata[filename] = info
+        self.modify(apply)
+
+    def remove(self, filename):
+        """Drop the entry for one SFDL file"""
+        def apply(metadata):
+            metadata.pop(filename, None)
+        self.modify(apply)
+
+    def save(self, metadata):
+        """Atomically replace the metadata file"""
+        with self.lock:
+            os.makedirs(os.path.dirname(self.metadata_file), exist_ok=True)
+            tmp_file = f"{self.metadata_file}.{threading.get_ident()}.tmp"
+            with open(tmp_file, 'w') as mf:
+                json.dump(metadata, mf, indent=2)
+            os.replace(tmp_file, self.metadata_file)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+import re
+
+
+class MultipartParser:
+    """Incremental multipart/form-data parser working on raw bytes
+
+    Body chunks are passed to feed() as they arrive from the socket. File parts are
+    streamed into the file object returned by the on_file callback, so the body is
+    never held in memory (or decoded) as a whole. Plain form fields are collected
+    in self.fields.
+    """
+
+    def __init__(self, boundary, on_file, max_field_size=64 * 1024):
+        if isinstance(boundary, str):
+            boundary = boundary.encode('latin-1')
+
+        # Every boundary after the first is preceded by CRLF. Starting the buffer with
+        # CRLF lets the first one match the same delimiter.
+        self.delimiter = b'\r\n--' + boundary
+        self.buffer = bytearray(b'\r\n')
+        self.state = 'preamble'
+        self.on_file = on_file
+        self.max_field_size = max_field_size
+        self.fields = {}
+        self.files = []
+
+        self._target = None
+        self._part = None
+
+    def feed(self, data):
+        """Consume the next chunk of the request body"""
+        self.buffer += data
+
+        while True:
+            if self.state == 'preamble':
+                index = self.buffer.find(self.delimiter)
+                if index == -1:
+                    # Keep enough bytes to match a delimiter split across chunks
+                    del self.buffer[:max(0, len(self.buffer) - len(self.delimiter) + 1)]
+                    return
+                del self.buffer[:index + len(self.delimiter)]
+                self.state = 'boundary'
+
+            elif self.state == 'boundary':
+                if len(self.buffer) < 2:
+                    return
+                marker = bytes(self.buffer[:2])
+                del self.buffer[:2]
+                if marker == b'--':
+                    self.state = 'done'
+                elif marker == b'\r\n':
+                    self.state = 'headers'
+                else:
+                    raise ValueError("Malformed multipart boundary")
+
+            elif self.state == 'headers':
+                index = self.buffer.find(b'\r\n\r\n')
+                if index == -1:
+                    if len(self.buffer) > 16 * 1024:
+                        raise ValueError("Multipart part headers too large")
+                    return
+                headers = bytes(self.buffer[:index]).decode('utf-8', errors='ignore')
+                del self.buffer[:index + 4]
+                self._start_part(headers)
+                self.state = 'body'
+
+            elif self.state == 'body':
+                index = self.buffer.find(self.delimiter)
+                if index == -1:
+                    # Everything except a possible partial delimiter at the end is content
+                    safe = len(self.buffer) - len(self.delimiter) + 1
+                    if safe > 0:
+                        self._write(self.buffer[:safe])
+                        del self.buffer[:safe]
+                    return
+                self._write(self.buffer[:index])
+                del self.buffer[:index + len(self.delimiter)]
+                self._finish_part()
+                self.state = 'boundary'
+
+            else:
+                # Epilogue after the closing boundary is ignored
+                self.buffer.clear()
+                return
+
+    def close(self):
+        """Check that the closing boundary was seen"""
+        if self.state != 'done':
+            if self._target is not None:
+                self._target.close()
+            raise ValueError("Incomplete multipart body")
+
+    def _start_part(self, headers):
+        disposition = ''
+        content_type = ''
+        for line in headers.split('\r\n'):
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'content-disposition':
+                disposition = value
+            elif name.strip().lower() == 'content-type':
+                content_type = value.strip()
+
+        name_match = re.search(r'\bname="([^"]*)"', disposition)
+        filename_match = re.search(r'\bfilename="([^"]*)"', disposition)
+
+        self._part = {
+            'name': name_match.group(1) if name_match else '',
+            'filename': filename_match.group(1) if filename_match else None,
+            'content_type': content_type,
+            'size': 0
+        }
+
+        if self._part['filename'] is not None:
+            self._target = self.on_file(self._part['name'], self._part['filename'])
+        else:
+            self._target = bytearray()
+
+    def _write(self, data):
+        if not data:
+            return
+        self._part['size'] += len(data)
+
+        if isinstance(self._target, bytearray):
+            if len(self._target) + len(data) > self.max_field_size:
+                raise ValueError("Multipart form field too large")
+            self._target += data
+        elif self._target is not None:
+            self._target.write(data)
+
+    def _finish_part(self):
+        if isinstance(self._target, bytearray):
+            self.fields[self._part['name']] = bytes(self._target).decode('utf-8', errors='ignore')
+        else:
+            if self._target is not None:
+                self._target.close()
+            self._part['stored'] = self._target is not None
+            self.files.append(self._part)
+
+        self._target = None
+        self._part = None
+
+
+def parse_boundary(content_type):
+    """Extract the boundary parameter from a multipart Content-Type header"""
+    match = re.search(r'boundary=(?:"([^"]+)"|([^;\s]+))', content_type or '')
+    if not match:
+        return None
+    return match.group(1) or match.group(2)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+class PasswordStats:
+    """Persistent hit table for SFDL passwords
+
+    Remembers how often and how recently each password from passwords.txt
+    decrypted an SFDL, and which password each uploader uses. bruteforce_decrypt
+    tries the candidates in that order, so common uploaders are decrypted with
+    the first or second try instead of walking the whole list.
+
+    Passwords are stored as SHA-256 hashes only, the plain text stays in
+    passwords.txt.
+    """
+
+    # Hits lose half their weight after this many seconds without a new hit
+    HALF_LIFE = 30 * 24 * 3600
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {'passwords': {}, 'uploaders': {}}
+        self.keys = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    loaded = json.load(f)
+                self.data['passwords'] = loaded.get('passwords', {})
+                self.data['uploaders'] = loaded.get('uploaders', {})
+            except (OSError, ValueError) as e:
+                print(f"  ⚠ Could not read password stats: {e}")
+
+    def key(self, password):
+        key = self.keys.get(password)
+        if key is None:
+            key = self.keys[password] = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return key
+
+    def ordered(self, passwords, uploader=None):
+        """Candidates ordered by uploader match, then recency-weighted hits, then file order"""
+        now = time.time()
+        with self.lock:
+            stats = self.data['passwords']
+            uploader_key = self.data['uploaders'].get(uploader) if uploader else None
+
+            def score(item):
+                index, password = item
+                key = self.key(password)
+                entry = stats.get(key)
+                weight = 0
+                if entry:
+                    weight = entry['hits'] * 0.5 ** ((now - entry['last']) / self.HALF_LIFE)
+                return (key != uploader_key, -weight, index)
+
+            return [password for _, password in sorted(enumerate(passwords), key=score)]
+
+    def record_hit(self, password, uploader=None):
+        """Count a successful decryption and remember the uploader's password"""
+        key = self.key(password)
+        with self.lock:
+            entry = self.data['passwords'].setdefault(key, {'hits': 0, 'last': 0})
+            entry['hits'] += 1
+            entry['last'] = time.time()
+            if uploader:
+                self.data['uploaders'][uploader] = key
+            self._save()
+
+    def _save(self):
+        tmp_file = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_file, self.path)
+        except OSError as e:
+            print(f"  ⚠ Could not save password stats: {e}")
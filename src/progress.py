@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import threading
+
+
+class ProgressCounter:
+    """Byte counter for many writer threads without a lock on the hot path
+
+    Every thread adds to its own cell (a one-element list no other thread
+    writes), value() sums the cells. A plain `total += n` from several download
+    threads can lose updates; here no update is ever lost and the FTP callbacks
+    never wait for each other. Cells of threads that have ended are added to
+    base and dropped, so short-lived segment threads do not pile up.
+    """
+
+    def __init__(self, value=0):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.cells = []
+        self.base = value
+
+    def cell(self):
+        """The calling thread's cell; hot loops can do cell[0] += n directly"""
+        cell = getattr(self.local, 'cell', None)
+        if cell is None:
+            cell = self.local.cell = [0]
+            with self.lock:
+                self._fold_finished()
+                self.cells.append((threading.current_thread(), cell))
+        return cell
+
+    def _fold_finished(self):
+        """Move the cells of ended threads into base (caller holds the lock)"""
+        alive = []
+        for thread, cell in self.cells:
+            if thread.is_alive():
+                alive.append((thread, cell))
+            else:
+                self.base += cell[0]
+        self.cells = alive
+
+    def add(self, amount):
+        self.cell()[0] += amount
+
+    def value(self):
+        with self.lock:
+            self._fold_finished()
+            return self.base + sum(cell[0] for _, cell in self.cells)
+
+    def set(self, value):
+        """Reset the total (only while no other thread is adding)"""
+        with self.lock:
+            self._fold_finished()
+            self.base = value - sum(cell[0] for _, cell in self.cells)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Re-detect the media type of all stored SFDL files
+
+Walks UPLOAD_DIR and UPLOAD_DIR/done, parses every SFDL in a process pool,
+runs TMDB detection for each distinct release name (shared cache, rate limited)
+and writes the results to .metadata.json in one atomic update. A result of
+'unknown' never replaces an existing classification.
+
+Usage: python -m src.reclassify [dir=PATH] [missing=true] [workers=N] [threads=N] [rate=R]
+
+    dir=PATH      Upload directory (default: UPLOAD_DIR from .env)
+    missing=true  Only SFDLs without a usable media type (missing, pending, unknown)
+    workers=N     Processes for parsing/decrypting the SFDLs (default: CPU count)
+    threads=N     Concurrent detections (default: DETECTION_WORKERS)
+    rate=R        Max. detections started per second (default: 4, 0 = unlimited)
+"""
+
+import os
+import sys
+import time
+import threading
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.downloader import Downloader
+from src.metadata import MetadataStore
+from src.password_stats import PasswordStats
+from src.sfdl_cache import SFDLCache
+from src.sfdl_crypto import HAS_CRYPTO, password_key, decrypt_many, decode_field, find_key, looks_decrypted
+from src.sfdl_parser import parse_sfdl_data
+from src.tmdb_client import TMDBDeadlineExceeded, TokenBucket
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(SCRIPT_DIR, '.env')
+STATUS_FILE = os.path.join(SCRIPT_DIR, 'static', 'status.json')
+
+
+# Parser process state: the password list and a read-only copy of the hit table.
+# Workers never write .sfdl_cache.json or password_hits.json, the main process
+# records the passwords they found.
+_passwords = []
+_password_keys = {}
+_password_stats = None
+
+
+def _init_parser(passwords, stats_path):
+    global _passwords, _password_keys, _password_stats
+    _passwords = passwords
+    _password_keys = {password: password_key(password) for password in passwords}
+    _password_stats = PasswordStats(stats_path)
+
+
+def _find_password(info):
+    """Password that decrypts the SFDL host (same checks as bruteforce_decrypt), or None"""
+    data = decode_field(info['host'])
+    if not HAS_CRYPTO or data is None:
+        return None
+    candidates = [password for password in _password_stats.ordered(_passwords, info['uploader']) if password]
+    keys = [_password_keys[password] for password in candidates]
+    start = 0
+    while True:
+        # One process per SFDL already, no nested search pool
+        index = find_key(data, keys, start, workers=1)
+        if index is None:
+            return None
+        start = index + 1
+        result = decrypt_many(keys[index], [info['host']])[0]
+        if result and looks_decrypted(result):
+            return candidates[index]
+
+
+def _parse_name(sfdl_path):
+    """Release name of one SFDL (decrypted), returns (filename, name, uploader, password)
+
+    The name falls back to the file name, password is the one that decrypted it.
+    """
+    filename = os.path.basename(sfdl_path)
+    name = None
+    uploader = None
+    password = None
+    try:
+        with open(sfdl_path, 'rb') as f:
+            info = parse_sfdl_data(f.read())
+        uploader = info['uploader']
+        name = info['name']
+        if info['encrypted'] and info['host']:
+            password = _find_password(info)
+            name = decrypt_many(_password_keys[password], [name])[0] if password and name else None
+    except Exception:
+        pass
+    if not name:
+        name = filename.replace('.sfdl', '').replace('.', ' ').replace('_', ' ')
+    return filename, name, uploader, password
+
+
+def find_sfdl_files(files_dir):
+    """All SFDLs in the upload directory and its done/ folder"""
+    sfdl_files = []
+    for directory in (files_dir, os.path.join(files_dir, 'done')):
+        if os.path.isdir(directory):
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith('.sfdl'):
+                    sfdl_files.append(os.path.join(directory, filename))
+    return sfdl_files
+
+
+def is_manual(entry):
+    """Media type set by hand through /update_media_type"""
+    return isinstance(entry, dict) and bool(entry.get('media_type')) and not entry.get('type')
+
+
+def needs_detection(entry):
+    if not isinstance(entry, dict):
+        return True
+    return entry.get('type') in (None, 'pending', 'unknown') and not is_manual(entry)
+
+
+def reclassify(downloader, files_dir, only_missing=False, workers=None, threads=None, rate=4):
+    """Re-detect SFDLs in files_dir and files_dir/done, returns the number of changed entries"""
+    store = MetadataStore.for_directory(files_dir)
+    metadata = store.load()
+
+    sfdl_files = []
+    for sfdl_path in find_sfdl_files(files_dir):
+        entry = metadata.get(os.path.basename(sfdl_path))
+        if is_manual(entry):
+            continue
+        if only_missing and not needs_detection(entry):
+            continue
+        sfdl_files.append(sfdl_path)
+
+    print(f"Verzeichnis: {files_dir}")
+    print(f"{len(sfdl_files)} SFDL Datei(en) zu prüfen")
+    if not sfdl_files:
+        return 0
+
+    # 1. Names from the SFDL cache, the rest is parsed/decrypted in parallel processes
+    started = time.monotonic()
+    downloader.refresh_passwords()
+    names = {}
+    to_parse = []
+    for sfdl_path in sfdl_files:
+        cache = downloader.sfdl_cache(sfdl_path)
+        info = None
+        if cache:
+            try:
+                with open(sfdl_path, 'rb') as f:
+                    info = cache.get(SFDLCache.content_key(f.read()))
+            except OSError:
+                pass
+        if info and info.get('name'):
+            names[os.path.basename(sfdl_path)] = info['name']
+        else:
+            to_parse.append(sfdl_path)
+
+    if to_parse:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_parser,
+                                 initargs=(downloader.passwords, downloader.password_stats.path)) as pool:
+            for filename, name, uploader, password in pool.map(_parse_name, to_parse, chunksize=8):
+                names[filename] = name
+                if password:
+                    downloader.password_stats.record_hit(password, uploader)
+    parse_time = time.monotonic() - started
+    print(f"✓ {len(names)} SFDLs geparst in {parse_time:.1f}s ({len(names) / max(parse_time, 0.001):.1f}/s)")
+
+    # 2. Detect each distinct release name once
+    unique_names = sorted(set(names.values()))
+    limiter = TokenBucket(rate, capacity=1)
+    results = {}
+    done = [0]
+    lock = threading.Lock()
+    out = sys.stdout
+
+    def detect(name):
+        limiter.acquire()
+        try:
+            media_info = downloader.detect_media_type(name)
+        except TMDBDeadlineExceeded:
+            # No answer in time, the SFDLs keep their current entry
+            media_info = None
+        if media_info is not None and not isinstance(media_info, dict):
+            media_info = {'type': media_info}
+        with lock:
+            if media_info is not None:
+                results[name] = media_info
+            done[0] += 1
+            if done[0] % 25 == 0 or done[0] == len(unique_names):
+                print(f"  {done[0]}/{len(unique_names)} erkannt", file=out)
+
+    started = time.monotonic()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        with ThreadPoolExecutor(max_workers=max(1, threads or downloader.config['detection_workers'])) as pool:
+            list(pool.map(detect, unique_names))
+    detect_time = time.monotonic() - started
+    print(f"✓ {len(unique_names)} Namen erkannt in {detect_time:.1f}s ({len(unique_names) / max(detect_time, 0.001):.1f}/s)")
+    if downloader.tmdb_cache:
+        print(f"  TMDB Cache: {downloader.tmdb_cache.hits} Treffer, {downloader.tmdb_cache.misses} Anfragen")
+
+    # 3. One atomic metadata update
+    def apply(current):
+        changed = 0
+        for filename, name in names.items():
+            # Keep types that were set by hand while we were running
+            if is_manual(current.get(filename)) or name not in results:
+                continue
+            # A failed lookup does not replace a type detected before
+            if results[name].get('type') == 'unknown' and not needs_detection(current.get(filename)):
+                continue
+            if current.get(filename) != results[name]:
+                changed += 1
+            current[filename] = results[name]
+        return changed
+
+    changed = store.modify(apply)
+
+    counts = {}
+    for filename, name in names.items():
+        media_type = results[name].get('type', 'unknown') if name in results else 'timeout'
+        counts[media_type] = counts.get(media_type, 0) + 1
+    summary = ', '.join(f"{media_type}: {count}" for media_type, count in sorted(counts.items()))
+    print(f"✓ .metadata.json aktualisiert ({changed} geändert) - {summary}")
+    return changed
+
+
+def main():
+    files_dir = None
+    only_missing = False
+    workers = None
+    threads = None
+    rate = 4
+
+    for arg in sys.argv[1:]:
+        key, _, value = arg.partition('=')
+        try:
+            if key == 'dir':
+                files_dir = os.path.abspath(value)
+            elif key == 'missing':
+                only_missing = value.lower() == 'true'
+            elif key == 'workers':
+                workers = max(1, int(value))
+            elif key == 'threads':
+                threads = max(1, int(value))
+            elif key == 'rate':
+                rate = float(value)
+            else:
+                print(__doc__)
+                sys.exit(1)
+        except ValueError:
+            print(f"Fehler: Ungültiger Wert für {key}: {value}")
+            sys.exit(1)
+
+    downloader = Downloader(CONFIG_PATH, STATUS_FILE)
+    if not files_dir:
+        files_dir = downloader.config['files'] or os.path.join(os.path.dirname(SCRIPT_DIR), 'uploads')
+
+    started = time.monotonic()
+    reclassify(downloader, files_dir, only_missing=only_missing, workers=workers, threads=threads, rate=rate)
+    print(f"Fertig in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
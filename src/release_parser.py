@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import re
+
+# All patterns are compiled once at import. Each group of tag lists is combined
+# into a single alternation, so a name is scanned once per group instead of once
+# per pattern.
+
+DOKU_RE = re.compile(r'\b(DOKU|DOCU|DOCUMENTARY|DOKUMENTATION)\b')
+
+# Software, games and other non-video content (matched against the upper-cased name)
+NON_VIDEO_PATTERNS = [
+    # Software
+    r'WISO|ADOBE|MICROSOFT|OFFICE|WINDOWS|MACOS|LINUX|UBUNTU|FEDORA',
+    r'PHOTOSHOP|ILLUSTRATOR|PREMIERE|AFTER.?EFFECTS|INDESIGN',
+    r'SPARBUCH|STEUER|TAX|ACCOUNTING|BUSINESS',
+    r'ANTIVIRUS|KASPERSKY|NORTON|MCAFEE|AVAST|AVG',
+    r'VMWARE|VIRTUALBOX|DOCKER|KUBERNETES',
+    r'AUTOCAD|SOLIDWORKS|CATIA|REVIT|SKETCHUP',
+    r'V\d+\.\d+|BUILD\.\d+|VERSION\.\d+',  # Version numbers
+    # Games
+    r'REPACK|CODEX|SKIDROW|PLAZA|CPY|GOLDBERG|STEAM.?RIP',
+    r'GOG|STEAM|EPIC|UPLAY|ORIGIN',
+    r'GAME|GAMEPLAY|UPDATE|DLC|EXPANSION',
+    r'CRACKED|CRACK|KEYGEN|PATCH',
+    # Audio, books, courses, adult
+    r'AUDIOBOOK|HOERBUCH|EBOOK|EPUB|MOBI|PDF|AZW3',
+    r'ALBUM|DISCOGRAPHY|FLAC|320KBPS|MP3|M4A|AAC',
+    r'UDEMY|TUTORIAL|COURSE|TRAINING|LYNDA',
+    r'XXX|PORN|ADULT|18\+',
+]
+NON_VIDEO_RE = re.compile(r'\b(' + '|'.join(NON_VIDEO_PATTERNS) + r')\b')
+
+YEAR_RE = re.compile(r'\b(19\d{2}|20\d{2})\b')
+SEASON_RE = re.compile(r'\bS(\d{1,2})(?:E(\d{1,2}))?\b', re.IGNORECASE)
+
+QUALITY_TAGS = (r'1080p|720p|2160p|4K|UHD|BluRay|BDRip|WEB-DL|WEBRip|WEB|HDTV|DVDRip|'
+                r'x264|x265|h264|h265|HEVC|AVC|AAC|DTS-HD|DTS|AC3|Atmos|ATVP|NF|AMZN|DSNP|HMAX|'
+                r'HULU|PCOK|PMTP|STAN|iP|DSCP|CR|DD5\.1|DD|TrueHD|FLAC|Opus|HDR10\+|HDR10|HDR|'
+                r'DV|SDR|REMUX|HYBRID|Retail|SUBBED|DUBBED|DiRFiX|COMPLETE|READ\.NFO|FS|WS')
+LANGUAGE_TAGS = r'German|English|Deutsch|Multi|DL|ML'
+SCENE_TAGS = r'REPACK|PROPER|iNTERNAL|LIMITED|UNRATED|DC|EXTENDED|REMASTERED'
+
+# Quality tags first so that WEB-DL is removed as one tag, not as WEB + DL
+TAG_RE = re.compile(r'\b(' + QUALITY_TAGS + '|' + LANGUAGE_TAGS + r')\b', re.IGNORECASE)
+SCENE_RE = re.compile(r'\b(' + SCENE_TAGS + r')\b', re.IGNORECASE)
+GROUP_RE = re.compile(r'-([A-Za-z0-9]+)\s*$')
+
+
+def parse_release(name):
+    """Split a scene release name into its parts
+
+    Returns a dict with title (cleaned search term), year, season, episode,
+    is_tv, is_doku, tags, group, non_video and non_video_match (the tag that
+    marked it as software/game/other content).
+    """
+    name_upper = name.upper()
+
+    non_video = NON_VIDEO_RE.search(name_upper)
+    year_match = YEAR_RE.search(name)
+    season_match = SEASON_RE.search(name)
+
+    result = {
+        'title': '',
+        'year': year_match.group(1) if year_match else None,
+        'season': int(season_match.group(1)) if season_match else None,
+        'episode': int(season_match.group(2)) if season_match and season_match.group(2) else None,
+        'is_tv': season_match is not None,
+        'is_doku': DOKU_RE.search(name_upper) is not None,
+        'tags': [],
+        'group': None,
+        'non_video': non_video is not None,
+        'non_video_match': non_video.group(1) if non_video else None
+    }
+
+    clean_name = name.replace('.', ' ').replace('_', ' ')
+
+    # Year and season/episode markers
+    clean_name = YEAR_RE.sub('', clean_name)
+    clean_name = SEASON_RE.sub('', clean_name)
+
+    # Language, quality and codec tags (collected as they are removed)
+    def take_tag(match):
+        result['tags'].append(match.group(1))
+        return ''
+    clean_name = TAG_RE.sub(take_tag, clean_name)
+
+    # Release group (-GROUPNAME at the end)
+    group_match = GROUP_RE.search(clean_name)
+    if group_match:
+        result['group'] = group_match.group(1)
+        clean_name = clean_name[:group_match.start()]
+
+    clean_name = SCENE_RE.sub(take_tag, clean_name)
+
+    # Drop separators left over from removed tags and collapse spaces
+    result['title'] = ' '.join(word for word in clean_name.split() if word.strip('-+'))
+    return result
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import os
+import copy
+import json
+import time
+import hashlib
+import threading
+
+# One lock per cache file, shared by every SFDLCache instance in the process
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+class SFDLCache:
+    """Decrypted parse_sfdl results, keyed by the SHA-256 of the SFDL content
+
+    An SFDL is parsed at upload, by the detection queue, when it is downloaded and
+    again whenever the queue is retried. With the cache only the first parse runs
+    the password search. The file lives next to .metadata.json (.sfdl_cache.json,
+    mode 0600 since it holds decrypted FTP credentials).
+
+    All entries are dropped when the password list changes (fingerprint mismatch),
+    so SFDLs are decrypted again with the new list.
+    """
+
+    def __init__(self, cache_file, fingerprint, max_entries=200):
+        self.cache_file = os.path.abspath(cache_file)
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        with _locks_guard:
+            self.lock = _locks.setdefault(self.cache_file, threading.RLock())
+        self.entries = None
+        self.loaded_mtime = None
+
+    @classmethod
+    def for_directory(cls, files_dir, fingerprint, max_entries=200):
+        """Cache for the .sfdl_cache.json inside an upload directory"""
+        return cls(os.path.join(files_dir, '.sfdl_cache.json'), fingerprint, max_entries)
+
+    @staticmethod
+    def content_key(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def _load(self):
+        """Entries of the cache file, re-read only when another process changed it"""
+        try:
+            mtime = os.stat(self.cache_file).st_mtime_ns
+        except OSError:
+            mtime = None
+        if self.entries is not None and mtime == self.loaded_mtime:
+            return self.entries
+
+        self.entries = {}
+        self.loaded_mtime = mtime
+        if mtime is not None:
+            try:
+                with open(self.cache_file, 'r') as f:
+                    loaded = json.load(f)
+                if loaded.get('passwords') == self.fingerprint:
+                    self.entries = loaded.get('entries', {})
+            except (OSError, ValueError) as e:
+                print(f"  ⚠ Could not read SFDL cache: {e}")
+        return self.entries
+
+    def get(self, key):
+        """Copy of the cached info dict, or None"""
+        with self.lock:
+            entry = self._load().get(key)
+            if entry is None:
+                return None
+            entry['used'] = time.time()
+            return copy.deepcopy(entry['info'])
+
+    def set(self, key, info):
+        with self.lock:
+            entries = self._load()
+            entries[key] = {'info': copy.deepcopy(info), 'used': time.time()}
+            if len(entries) > self.max_entries:
+                for old_key in sorted(entries, key=lambda k: entries[k]['used'])[:len(entries) - self.max_entries]:
+                    del entries[old_key]
+            self._save()
+
+    def _save(self):
+        tmp_file = f"{self.cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'passwords': self.fingerprint, 'entries': self.entries}, f)
+            os.replace(tmp_file, self.cache_file)
+            self.loaded_mtime = os.stat(self.cache_file).st_mtime_ns
+        except OSError as e:
+            print(f"  ⚠ Could not save SFDL cache: {e}")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import base64
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    from Crypto.Cipher import AES
+    HAS_CRYPTO = True
+except ImportError:
+    try:
+        from Cryptodome.Cipher import AES
+        HAS_CRYPTO = True
+    except ImportError:
+        HAS_CRYPTO = False
+        print("Warning: pycryptodome not installed. Encrypted SFDLs won't work!")
+        print("Install with: pip install pycryptodome")
+        print("Or on Debian/Ubuntu: apt install python3-pycryptodome")
+
+# SFDL fields are base64(IV + AES-128-CBC(ciphertext)) with MD5(password) as key.
+# CBC decryption is ECB decryption of each block XORed with the previous
+# ciphertext block, so all fields of an SFDL can be decrypted in one ECB call.
+# Cipher objects are built per call and not kept: the password list can hold
+# 100k entries and is reloaded whenever passwords.txt changes, only the MD5
+# keys are precomputed (Downloader.password_keys).
+
+
+def password_key(password):
+    """AES key for an SFDL password"""
+    return hashlib.md5(password.encode()).digest()
+
+
+def ecb_cipher(key):
+    """ECB cipher for a key"""
+    return AES.new(key, AES.MODE_ECB)
+
+
+def decode_field(value):
+    """Raw bytes of a base64 SFDL field, None unless it is IV plus whole blocks"""
+    try:
+        data = base64.b64decode(value)
+    except Exception:
+        return None
+    if len(data) < 32 or len(data) % 16:
+        return None
+    return data
+
+
+def first_block_plausible(key, data):
+    """Fast password check for host values: decrypt only the first block after the IV
+
+    Hosts are plain ASCII. A wrong key gives 16 random bytes, which are all
+    printable ASCII with a chance of about 1 in 10 million (single-block values
+    also need valid padding). Only keys that pass need the full decrypt.
+    """
+    block = ecb_cipher(key).decrypt(data[16:32])
+    plain = (int.from_bytes(block, 'big') ^ int.from_bytes(data[:16], 'big')).to_bytes(16, 'big')
+
+    if len(data) == 32:
+        # Last block: PKCS7 padding, or zero padding from older tools
+        pad = plain[-1]
+        if 1 <= pad <= 16 and plain[-pad:] == bytes([pad]) * pad:
+            plain = plain[:-pad]
+        else:
+            plain = plain.rstrip(b'\x00')
+        if not plain:
+            return False
+
+    return all(0x20 <= byte < 0x7f for byte in plain)
+
+
+def clean_plaintext(decrypted):
+    """Strip padding and invisible characters from a decrypted field"""
+    # Remove PKCS7 padding
+    padding_length = decrypted[-1]
+    if isinstance(padding_length, int) and padding_length < 16:
+        decrypted = decrypted[:-padding_length]
+
+    # Decode to string
+    result = decrypted.decode('utf-8', errors='ignore')
+
+    # Remove null bytes and control characters
+    result = result.replace('\x00', '')
+    result = ''.join(char for char in result if char.isprintable() or char in '\n\r\t')
+
+    # Strip whitespace and zero-width characters
+    result = result.strip()
+    result = re.sub(r'[\u200b-\u200f\ufeff]', '', result)
+
+    return result
+
+
+def looks_decrypted(result):
+    """A decrypted host looks like a real value: dots (IPs, domains), slashes (paths),
+    @ (usernames) or a longer alphanumeric word with common separators"""
+    return len(result) > 0 and (
+        '.' in result or
+        '/' in result or
+        '@' in result or
+        (result.replace('_', '').replace('-', '').replace('.', '').isalnum() and len(result) > 5)
+    )
+
+
+def decrypt_many(key, values):
+    """Decrypt base64 SFDL fields with one key, returns a list (None for broken values)"""
+    results = [None] * len(values)
+    if not HAS_CRYPTO:
+        return results
+
+    slots = []
+    ciphertext = []
+    previous = []
+    for index, value in enumerate(values):
+        data = decode_field(value)
+        if data is None:
+            continue
+        slots.append((index, len(data) - 16))
+        ciphertext.append(data[16:])
+        previous.append(data[:-16])
+
+    if not slots:
+        return results
+
+    raw = ecb_cipher(key).decrypt(b''.join(ciphertext))
+    chain = b''.join(previous)
+    plain = (int.from_bytes(raw, 'big') ^ int.from_bytes(chain, 'big')).to_bytes(len(raw), 'big')
+
+    offset = 0
+    for index, length in slots:
+        try:
+            results[index] = clean_plaintext(plain[offset:offset + length])
+        except Exception:
+            pass
+        offset += length
+    return results
+
+
+# Candidates checked in-process before the pool is used: the password-hit table puts
+# the likely passwords first, they should win without any process overhead
+SEARCH_HEAD = 256
+
+# Set in each pool process by _init_search_worker: lowest plausible index found so far (-1: none)
+_found = None
+
+# Search pool shared by all find_key calls, started on first use and kept for the
+# process lifetime. One search runs on it at a time because they share _pool_found.
+_pool = None
+_pool_workers = 0
+_pool_found = None
+_pool_lock = threading.Lock()
+
+
+def _init_search_worker(found):
+    global _found
+    _found = found
+
+
+def scan_keys(data, keys, offset=0, found=None):
+    """Index (offset + i) of the first key passing first_block_plausible, or None
+
+    found is the shared lowest hit of a parallel search: the scan gives up once a
+    plausible key before this range is known, ranges before a hit always finish.
+    """
+    for i, key in enumerate(keys):
+        if found is not None and i % 512 == 0 and 0 <= found.value < offset:
+            return None
+        if first_block_plausible(key, data):
+            return offset + i
+    return None
+
+
+def _scan_chunk(data, keys, offset):
+    index = scan_keys(data, keys, offset, _found)
+    if index is not None:
+        # Later ranges can stop, earlier ones keep looking for a lower index
+        with _found.get_lock():
+            if _found.value < 0 or index < _found.value:
+                _found.value = index
+    return index
+
+
+def search_pool(workers):
+    """Process pool and shared hit value for parallel searches, call with _pool_lock held
+
+    The workers come from forkserver (spawn where that is missing): forking the
+    threaded web server could copy locks held by other threads into the child.
+    """
+    global _pool, _pool_workers, _pool_found
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        context = multiprocessing.get_context(method)
+        _pool_found = context.Value('q', -1)
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                    initializer=_init_search_worker, initargs=(_pool_found,))
+        _pool_workers = workers
+    return _pool, _pool_found
+
+
+def shutdown_search_pool():
+    """Stop the search pool, the next parallel search starts a new one"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def find_key(data, keys, start=0, workers=None, parallel_min=20000):
+    """Index of the first plausible key in keys[start:], or None
+
+    Small lists (and the first SEARCH_HEAD candidates) are scanned in this process.
+    Larger remainders are split across a process pool. The result is the same as a
+    sequential scan, so a caller that rejects a false positive can continue with
+    start=index + 1 without skipping candidates.
+    """
+    global _pool
+    head_end = min(len(keys), start + SEARCH_HEAD)
+    index = scan_keys(data, keys[start:head_end], start)
+    if index is not None or head_end >= len(keys):
+        return index
+    start = head_end
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(keys) - start < parallel_min:
+        return scan_keys(data, keys[start:], start)
+
+    chunk = -(-(len(keys) - start) // (workers * 4))
+    with _pool_lock:
+        pool, found = search_pool(workers)
+        found.value = -1
+        try:
+            futures = [pool.submit(_scan_chunk, data, keys[i:i + chunk], i)
+                       for i in range(start, len(keys), chunk)]
+            hits = [index for index in (future.result() for future in futures) if index is not None]
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM killed), start a fresh pool next time
+            print(f"    ⚠ Password search pool failed, scanning sequentially: {e}")
+            _pool = None
+            return scan_keys(data, keys[start:], start)
+    return min(hits) if hits else None
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+import re
+import html
+
+# SFDL files are XML, but files from older tools are often not well-formed
+# (unescaped '&', unclosed tags, garbage after the root element). Instead of
+# trying a strict XML parser first and re-reading the file with regexes when it
+# fails, the file is tokenized once: every tag, CDATA section and comment is
+# found by a single finditer pass and the text between them is taken as value.
+#
+# Supported layout (tag names are matched case-insensitively):
+#
+#   <SFDLFile>
+#     <Description/> <Uploader/> <Encrypted/> <MaxDownloadThreads/>
+#     <ConnectionInfo> <Host/> <Port/> <Username/> <Password/> <AuthRequired/> </ConnectionInfo>
+#     <Packages><SFDLPackage>
+#       <BulkFolderMode/>
+#       <FileList><FileInfo> <FileName/> <FileFullPath/> <FileSize/> </FileInfo></FileList>
+#       <BulkFolderList><BulkFolder> <BulkFolderPath/> </BulkFolder></BulkFolderList>
+#     </SFDLPackage></Packages>
+#   </SFDLFile>
+#
+# Older files use <Package> and <File> instead of <SFDLPackage> and <FileInfo>.
+
+TOKEN_RE = re.compile(
+    rb'<!\[CDATA\[(.*?)\]\]>'                          # 1: CDATA text
+    rb'|<!--.*?-->'                                    # comment
+    rb'|<[?!][^>]*>'                                   # declaration, doctype
+    rb'|<(/?)([A-Za-z_][\w:.-]*)[^>]*?(/?)>',          # 2: close, 3: name, 4: self-closing
+    re.DOTALL
+)
+
+# First occurrence wins for these single-value fields
+FIELDS = {
+    'description': 'name',
+    'uploader': 'uploader',
+    'host': 'host',
+    'port': 'port',
+    'username': 'username',
+    'password': 'password',
+    'encrypted': 'encrypted',
+    'authrequired': 'auth_required',
+    'maxdownloadthreads': 'max_threads',
+}
+
+FILE_TAGS = ('file', 'fileinfo')
+FILE_FIELDS = {
+    'filename': 'name',
+    'filesize': 'size',
+    'filefullpath': 'path',
+}
+
+INVISIBLE_RE = re.compile(r'[\u200b-\u200f\ufeff]')
+
+
+def _text(chunks):
+    value = b''.join(chunks).decode('utf-8', errors='ignore').strip()
+    if '&' in value:
+        value = html.unescape(value)
+    return value
+
+
+def parse_sfdl_data(data):
+    """Parse the raw bytes of an SFDL file into the info dict used by the downloader
+
+    Values are returned as they are stored in the file: encrypted SFDLs still
+    have base64 values in name, host, username, password, files and bulk_paths.
+    name is empty if the file has no Description. Without AuthRequired=true the
+    login is anonymous / anonymous@anonymous.nix.
+    """
+    if data[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        data = data.decode('utf-16', errors='ignore').encode('utf-8')
+
+    info = {
+        'name': '',
+        'uploader': '',
+        'host': '',
+        'port': 21,
+        'username': 'anonymous',
+        'password': 'anonymous@anonymous.nix',
+        'encrypted': False,
+        'auth_required': False,
+        'max_threads': 3,
+        'files': [],
+        'bulk_mode': False,
+        'bulk_paths': []
+    }
+    seen = set()
+    bulk_flag = None
+    current_file = None
+
+    stack = []
+    chunks = []
+    leaf = None     # Open element without children so far, its text is in chunks
+    position = 0
+
+    def value(tag, text):
+        nonlocal bulk_flag
+        if not text:
+            return
+        if current_file is not None and tag in FILE_FIELDS:
+            if tag == 'filesize':
+                current_file['size'] = int(text) if text.isdigit() else 0
+            else:
+                current_file[FILE_FIELDS[tag]] = text
+        elif tag == 'bulkfolderpath':
+            info['bulk_paths'].append(text)
+        elif tag == 'bulkfoldermode':
+            bulk_flag = bulk_flag or text.lower() == 'true'
+        elif tag in FIELDS and tag not in seen:
+            seen.add(tag)
+            key = FIELDS[tag]
+            if key in ('port', 'max_threads'):
+                if text.isdigit():
+                    info[key] = int(text)
+            elif key in ('encrypted', 'auth_required'):
+                info[key] = text.lower() == 'true'
+            else:
+                info[key] = text
+
+    def close_file():
+        nonlocal current_file
+        if current_file is not None and current_file['name']:
+            info['files'].append(current_file)
+        current_file = None
+
+    def close(tag):
+        if tag in FILE_TAGS:
+            close_file()
+
+    for match in TOKEN_RE.finditer(data):
+        if leaf is not None and match.start() > position:
+            chunks.append(data[position:match.start()])
+        position = match.end()
+
+        cdata, slash, name, self_closing = match.groups()
+        if cdata is not None:
+            if leaf is not None:
+                chunks.append(cdata)
+            continue
+        if name is None:
+            continue
+
+        tag = name.decode('ascii').lower()
+
+        if not slash:
+            if leaf is not None:
+                text = _text(chunks)
+                if text:
+                    # <Host>value<Port>... - a value without closing tag ends here
+                    value(leaf, text)
+                    stack.pop()
+                    close(leaf)
+            if tag in FILE_TAGS:
+                close_file()
+                current_file = {'name': '', 'size': 0, 'path': ''}
+            chunks = []
+            if self_closing:
+                leaf = None
+                close(tag)
+            else:
+                stack.append(tag)
+                leaf = tag
+            continue
+
+        if tag == leaf:
+            value(tag, _text(chunks))
+        leaf = None
+        chunks = []
+
+        # Close the matching element and everything left open inside it,
+        # stray closing tags are ignored
+        if tag in stack:
+            while stack:
+                open_tag = stack.pop()
+                close(open_tag)
+                if open_tag == tag:
+                    break
+
+    if leaf is not None:
+        chunks.append(data[position:])
+        value(leaf, _text(chunks))
+    close_file()
+
+    info['name'] = INVISIBLE_RE.sub('', info['name'])
+
+    # Servers without authentication are always logged into anonymously,
+    # whatever the file has in Username/Password
+    if not info['auth_required']:
+        info['username'] = 'anonymous'
+        info['password'] = 'anonymous@anonymous.nix'
+
+    # Bulk SFDLs are downloaded as whole directories, their file list is not used.
+    # Files without BulkFolderMode but with BulkFolderPath entries are bulk SFDLs too.
+    if bulk_flag or (bulk_flag is None and info['bulk_paths']):
+        info['bulk_mode'] = True
+        info['files'] = []
+    else:
+        info['bulk_paths'] = []
+
+    return info
+
+
+def parse_sfdl_file(sfdl_path):
+    """Read and parse an SFDL file (see parse_sfdl_data)"""
+    with open(sfdl_path, 'rb') as f:
+        return parse_sfdl_data(f.read())
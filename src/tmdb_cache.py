@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+
+class TMDBCache:
+    """On-disk cache for TMDB API responses (SQLite)
+
+    Entries are keyed by endpoint and request parameters (query, year, language)
+    and expire after ttl seconds. When more than max_entries are stored, the least
+    recently used ones are evicted. Empty search results are cached as well, so the
+    shortened query variations of a release are only sent to TMDB once.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=5000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Shared by the web server threads and detection workers, guarded by self.lock
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY,'
+                ' body TEXT NOT NULL,'
+                ' created REAL NOT NULL,'
+                ' accessed REAL NOT NULL)'
+            )
+            self.db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            self.db.commit()
+
+    @staticmethod
+    def make_key(endpoint, params):
+        """Stable cache key from the endpoint and its query parameters"""
+        items = sorted((k, str(v)) for k, v in params.items() if v is not None and v != '')
+        return endpoint.strip('/') + '?' + '&'.join(f'{k}={v}' for k, v in items)
+
+    def get(self, key):
+        """Cached response dict, or None if missing or expired"""
+        now = time.time()
+        with self.lock:
+            row = self.db.execute('SELECT body, created FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self.db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    self.db.commit()
+                self.misses += 1
+                return None
+            self.db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+            self.db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, data):
+        """Store a response and evict the least recently used entries beyond max_entries"""
+        now = time.time()
+        body = json.dumps(data)
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO responses (key, body, created, accessed) VALUES (?, ?, ?, ?)',
+                (key, body, now, now)
+            )
+            self.db.execute(
+                'DELETE FROM responses WHERE key IN ('
+                ' SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            self.db.commit()
+
+    def purge_expired(self):
+        """Drop all expired entries, returns the number removed"""
+        with self.lock:
+            cursor = self.db.execute('DELETE FROM responses WHERE created < ?', (time.time() - self.ttl,))
+            self.db.commit()
+            return cursor.rowcount
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+import gzip
+import json
+import time
+import random
+import threading
+import http.client
+import urllib.parse
+
+
+class TMDBError(Exception):
+    """TMDB answered with a non-200 status"""
+
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class TMDBDeadlineExceeded(Exception):
+    """The prefetched TMDB searches did not answer within TMDB_DEADLINE
+
+    Not a "no match": callers keep the current classification and retry later.
+    """
+
+
+class TokenBucket:
+    """Thread-safe token bucket: at most rate calls per second, bursts up to capacity"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now > self.updated:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold back all callers, e.g. after the server asked us to slow down"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            # Start refilling only once the pause is over
+            self.tokens = 0
+            self.updated = self.blocked_until
+
+
+class TMDBClient:
+    """Shared HTTP client for the TMDB API with a keep-alive connection pool
+
+    Idle connections are kept and reused by the next request, so a detection run
+    with several searches pays for a single TLS handshake. Responses are requested
+    gzip-compressed. base_url can point to a local stub server (http:// is allowed).
+
+    All requests share one token bucket (rate per second). Rate limit answers (429)
+    and temporary server errors are retried with exponential backoff, honouring the
+    Retry-After header, instead of being reported as a failed search.
+    """
+
+    # Errors that mean a pooled connection was closed by the server while idle
+    STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                    ConnectionResetError, BrokenPipeError)
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, api_key, base_url='https://api.themoviedb.org/3', timeout=10, pool_size=4,
+                 rate=40, retries=4, backoff=0.5):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.bucket = TokenBucket(rate)
+        self.retries = retries
+        self.backoff = backoff
+
+        url = urllib.parse.urlsplit(base_url)
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.base_path = url.path.rstrip('/')
+
+        self.lock = threading.Lock()
+        self.idle = []
+        self.connections_opened = 0
+
+    def get(self, endpoint, params=None):
+        """GET an API endpoint (e.g. 'search/tv') and return the decoded JSON"""
+        query = urllib.parse.urlencode({k: v for k, v in (params or {}).items() if v is not None and v != ''})
+        path = f"{self.base_path}/{endpoint.lstrip('/')}"
+        if query:
+            path += '?' + query
+
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive'
+        }
+
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                status, reason, body, retry_after = self._request(path, headers)
+            except OSError as e:
+                # Timeouts and connection errors
+                if attempt >= self.retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                print(f"    TMDB connection error ({e}), retry in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if status in self.RETRY_STATUS and attempt < self.retries:
+                delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+                if status == 429:
+                    # Everybody waits, not just this request
+                    self.bucket.pause(delay)
+                print(f"    TMDB HTTP {status}, retry in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if status != 200:
+                raise TMDBError(status, reason)
+            return json.loads(body.decode('utf-8'))
+
+    def _request(self, path, headers):
+        """Send one GET on a pooled connection, returns (status, reason, body, retry_after)"""
+        conn, reused = self._acquire()
+        try:
+            try:
+                response = self._send(conn, path, headers)
+            except self.STALE_ERRORS:
+                if not reused:
+                    raise
+                # Server dropped the idle connection, retry once on a fresh one
+                conn.close()
+                conn = self._new_connection()
+                response = self._send(conn, path, headers)
+        except Exception:
+            conn.close()
+            raise
+
+        status, reason, body, keep, retry_after = response
+        self._release(conn, keep)
+        return status, reason, body, retry_after
+
+    def _backoff_delay(self, attempt):
+        return self.backoff * (2 ** attempt) * random.uniform(0.8, 1.2)
+
+    def close(self):
+        """Close all idle connections"""
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+    def _send(self, conn, path, headers):
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        if response.getheader('Content-Encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+
+        retry_after = None
+        try:
+            retry_after = max(0.0, float(response.getheader('Retry-After')))
+        except (TypeError, ValueError):
+            pass
+        return response.status, response.reason, body, not response.will_close, retry_after
+
+    def _new_connection(self):
+        with self.lock:
+            self.connections_opened += 1
+        if self.scheme == 'http':
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+        return self._new_connection(), False
+
+    def _release(self, conn, keep):
+        if keep:
+            with self.lock:
+                if len(self.idle) < self.pool_size:
+                    self.idle.append(conn)
+                    return
+        conn.close()
@@ -509,59 +509,104 @@ $(document).ready(function() {
 	checkForumStatus();
 	checkTmdbStatus();
 	
-	function loadData() {
-		$.getJSON("status.json", function(data) {
-			var version = data.data[0].version;
-			var status = data.data[0].status;
-			var datetime = data.data[0].datetime;
-			var action = data.data[0].action;
-			
-			if(!www_beendet) {
-				$(".button_sfdl_link, .button_ftp, .button_upload, .button_kill").prop("disabled", false);
-			}
-			
-			if(!loader_beendet) {
-				var isDone = (status == "done");
-				$(".button_start").prop("disabled", !isDone);
-				$(".button_stop").prop("disabled", isDone);
-			} else {
-				$(".button_start").prop("disabled", false);
-				$(".button_stop").prop("disabled", true);
-			}
-			
-			$('.title').html("SFDL-Medialoader v" + version);
-			if(action == "NULL" || action == "NULL" || action == "") {
-				action = "done";
-			}
-			
-			// Update media bar
-			updateMediaBar(data);
-			
-			var formattedDate = datetime;
-			try {
-				var dateObj = new Date(datetime);
-				if(!isNaN(dateObj.getTime())) {
-					formattedDate = dateObj.toLocaleString('de-DE', {
-						day: '2-digit',
-						month: '2-digit',
-						year: 'numeric',
-						hour: '2-digit',
-						minute: '2-digit',
-						second: '2-digit'
-					});
-				}
-			} catch(e) {}
-			
-			$('.info').html("Status: <b>" + status + "</b> | Letzte Aktivität: <b>" + formattedDate + "</b>");
-			
-			if(action == "done") {
-				$('.info').html("Status: <b>BEREIT</b>");
+	// Apply a full status object to the page
+	function handleStatus(data) {
+		var version = data.data[0].version;
+		var status = data.data[0].status;
+		var datetime = data.data[0].datetime;
+		var action = data.data[0].action;
+		
+		if(!www_beendet) {
+			$(".button_sfdl_link, .button_ftp, .button_upload, .button_kill").prop("disabled", false);
+		}
+		
+		if(!loader_beendet) {
+			var isDone = (status == "done");
+			$(".button_start").prop("disabled", !isDone);
+			$(".button_stop").prop("disabled", isDone);
+		} else {
+			$(".button_start").prop("disabled", false);
+			$(".button_stop").prop("disabled", true);
+		}
+		
+		$('.title').html("SFDL-Medialoader v" + version);
+		if(action == "NULL" || action == "NULL" || action == "") {
+			action = "done";
+		}
+		
+		// Update media bar
+		updateMediaBar(data);
+		
+		var formattedDate = datetime;
+		try {
+			var dateObj = new Date(datetime);
+			if(!isNaN(dateObj.getTime())) {
+				formattedDate = dateObj.toLocaleString('de-DE', {
+					day: '2-digit',
+					month: '2-digit',
+					year: 'numeric',
+					hour: '2-digit',
+					minute: '2-digit',
+					second: '2-digit'
+				});
 			}
-		});
+		} catch(e) {}
+		
+		$('.info').html("Status: <b>" + status + "</b> | Letzte Aktivität: <b>" + formattedDate + "</b>");
+		
+		if(action == "done") {
+			$('.info').html("Status: <b>BEREIT</b>");
+		}
+	}
+	
+	// Fallback: poll status.json when Server-Sent Events are unavailable
+	function loadData() {
+		$.getJSON("status.json", handleStatus);
 	
 		refTimer = setTimeout(loadData, 250);  // Poll every 250ms for faster updates
 	}
 	
+	// Receive status pushes from /events: full status first, then only changed fields
+	var eventSource = null;
+	var statusState = null;
+	
+	function connectEvents() {
+		if(!window.EventSource) {
+			loadData();
+			return;
+		}
+		
+		eventSource = new EventSource('/events');
+		
+		eventSource.addEventListener('status', function(e) {
+			statusState = JSON.parse(e.data);
+			handleStatus(statusState);
+		});
+		
+		eventSource.addEventListener('delta', function(e) {
+			if(!statusState) {
+				return;
+			}
+			var delta = JSON.parse(e.data);
+			var entry = statusState.data[0];
+			$.each(delta.changes, function(key, value) {
+				entry[key] = value;
+			});
+			$.each(delta.removed || [], function(i, key) {
+				delete entry[key];
+			});
+			handleStatus(statusState);
+		});
+		
+		eventSource.onerror = function() {
+			// Stream refused (server busy) or closed for good: fall back to polling
+			if(eventSource.readyState === EventSource.CLOSED) {
+				eventSource = null;
+				loadData();
+			}
+		};
+	}
+	
 	$(".button_start").click(function() {
 		var usrpass = prompt("Bitte Passwort zum Starten eingeben", "");
 		if(usrpass) {
@@ -629,6 +674,9 @@ $(document).ready(function() {
 						$(".button_start, .button_stop, .button_kill, .button_sfdl_link, .button_ftp, .button_upload").prop("disabled", true);
 						alert("Webserver beendet!");
 						clearTimeout(refTimer);
+						if(eventSource) {
+							eventSource.close();
+						}
 					} else {
 						alert("Fehler: " + command);
 					}
@@ -701,7 +749,7 @@ $(document).ready(function() {
 		});
 	});
 	
-	loadData();
+	connectEvents();
 	loadSFDLFiles();
 	
 	// Reload SFDL files list every 5 seconds
@@ -756,8 +804,18 @@ function shutdownServer() {
 	}
 }
 
+var pendingRefresh = null;
+
 function loadSFDLFiles() {
 	$.getJSON("files.json", function(data) {
+		// Refresh sooner while media detection is still running
+		if(data.pending > 0 && !pendingRefresh) {
+			pendingRefresh = setTimeout(function() {
+				pendingRefresh = null;
+				loadSFDLFiles();
+			}, 1500);
+		}
+		
 		if(data.success && data.count > 0) {
 			$('#sfdlFilesSection').removeClass('hidden');
 			
@@ -851,6 +909,9 @@ function loadSFDLFiles() {
 				} else if(file.media_type == 'other') {
 					// Non-video content (Software, Games, etc.)
 					mediaTypeBadge = '<span class="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-gray-500/20 text-gray-400 border border-gray-500/30">📦 Sonstiges</span>';
+				} else if(file.media_type == 'pending') {
+					// Detection still running in the background
+					mediaTypeBadge = '<span class="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-yellow-500/20 text-yellow-400 border border-yellow-500/30 animate-pulse" title="Film/Serie wird über TMDB erkannt">⏳ Wird erkannt...</span>';
 				} else if(file.media_type == 'unknown') {
 					// Show selection buttons for unknown type
 					mediaTypeBadge = '<div class="inline-flex gap-1">';
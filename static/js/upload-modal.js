@@ -103,7 +103,7 @@ function uploadFromUrl() {
 }
 
 // File Upload
-let modalSelectedFile = null;
+let modalSelectedFiles = [];
 
 const modalDropZone = document.getElementById('modal-drop-zone');
 const modalFileInput = document.getElementById('modal-file-input');
@@ -116,7 +116,7 @@ modalDropZone.addEventListener('click', () => {
 // File input change
 modalFileInput.addEventListener('change', (e) => {
 	if (e.target.files.length > 0) {
-		handleModalFile(e.target.files[0]);
+		handleModalFiles(e.target.files);
 	}
 });
 
@@ -136,36 +136,39 @@ modalDropZone.addEventListener('drop', (e) => {
 	modalDropZone.classList.remove('border-blue-500', 'bg-blue-500/10');
 	
 	if (e.dataTransfer.files.length > 0) {
-		handleModalFile(e.dataTransfer.files[0]);
+		handleModalFiles(e.dataTransfer.files);
 	}
 });
 
-function handleModalFile(file) {
-	if (!file.name.endsWith('.sfdl')) {
+function handleModalFiles(fileList) {
+	const files = Array.from(fileList).filter(file => file.name.endsWith('.sfdl'));
+	
+	if (files.length === 0) {
 		console.log('Bitte nur .sfdl Dateien hochladen');
 		return;
 	}
 	
-	modalSelectedFile = file;
+	modalSelectedFiles = files;
 	
 	// Show file info
+	const totalSize = files.reduce((sum, file) => sum + file.size, 0);
 	document.getElementById('modal-file-info').classList.remove('hidden');
-	document.getElementById('modal-selected-filename').textContent = file.name;
-	document.getElementById('modal-selected-filesize').textContent = formatFileSize(file.size);
+	document.getElementById('modal-selected-filename').textContent = files.length === 1 ? files[0].name : files.length + ' SFDL Dateien';
+	document.getElementById('modal-selected-filesize').textContent = formatFileSize(totalSize);
 	
 	// Enable upload button
 	document.getElementById('modal-upload-button').disabled = false;
 }
 
 function clearModalFileSelection() {
-	modalSelectedFile = null;
+	modalSelectedFiles = [];
 	modalFileInput.value = '';
 	document.getElementById('modal-file-info').classList.add('hidden');
 	document.getElementById('modal-upload-button').disabled = true;
 }
 
 function uploadModalFile() {
-	if (!modalSelectedFile) {
+	if (modalSelectedFiles.length === 0) {
 		console.log('Bitte wählen Sie eine Datei aus');
 		return;
 	}
@@ -173,23 +176,24 @@ function uploadModalFile() {
 	const buttonText = document.getElementById('modal-file-button-text');
 	buttonText.textContent = 'Lädt hoch...';
 	
+	// All files go in one request, media detection runs on the server in the background
 	const formData = new FormData();
-	formData.append('file', modalSelectedFile);
+	modalSelectedFiles.forEach(file => {
+		formData.append('files', file);
+	});
 	
-	fetch('/upload', {
+	fetch('/upload_batch', {
 		method: 'POST',
 		body: formData
 	})
 	.then(response => response.json())
 	.then(data => {
 		if (data.success) {
-			console.log('Datei erfolgreich hochgeladen: ' + data.filename);
+			console.log(data.count + ' Datei(en) erfolgreich hochgeladen');
 			clearModalFileSelection();
 			closeUploadModal();
-			// Reload file list with TMDB data - add small delay to ensure metadata is saved
-			setTimeout(() => {
-				loadSFDLFiles();
-			}, 500);
+			// Show the files right away, TMDB results fill in as they arrive
+			loadSFDLFiles();
 		} else {
 			console.error('Fehler: ' + (data.error || 'Unbekannter Fehler'));
 		}
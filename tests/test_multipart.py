@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+
+from src.multipart import MultipartParser, parse_boundary
+
+
+BOUNDARY = '----WebKitFormBoundaryX3b9'
+
+
+def body(*parts):
+    data = b''
+    for headers, content in parts:
+        data += b'--' + BOUNDARY.encode() + b'\r\n' + headers.encode() + b'\r\n\r\n' + content + b'\r\n'
+    return data + b'--' + BOUNDARY.encode() + b'--\r\n'
+
+
+def file_part(name, filename, content):
+    return (f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            'Content-Type: application/octet-stream', content)
+
+
+def field_part(name, value):
+    return (f'Content-Disposition: form-data; name="{name}"', value)
+
+
+class StoredFile(io.BytesIO):
+
+    def close(self):
+        self.stored = self.getvalue()
+        super().close()
+
+
+class Collector:
+
+    def __init__(self):
+        self.files = {}
+
+    def __call__(self, name, filename):
+        target = StoredFile()
+        self.files[filename] = target
+        return target
+
+
+def parse(data, chunk_size, **kwargs):
+    collector = Collector()
+    parser = MultipartParser(BOUNDARY, collector, **kwargs)
+    for start in range(0, len(data), chunk_size):
+        parser.feed(data[start:start + chunk_size])
+    parser.close()
+    return parser, {filename: target.stored for filename, target in collector.files.items()}
+
+
+class MultipartParserTest(unittest.TestCase):
+
+    def test_files_and_fields(self):
+        content = b'<SFDLFile>\r\n--not-a-boundary\r\n</SFDLFile>'
+        data = body(field_part('action', b'upload'), file_part('file', 'a.sfdl', content))
+        parser, files = parse(data, len(data))
+        self.assertEqual(parser.fields, {'action': 'upload'})
+        self.assertEqual(files, {'a.sfdl': content})
+        self.assertEqual(parser.files[0]['name'], 'file')
+        self.assertEqual(parser.files[0]['size'], len(content))
+        self.assertTrue(parser.files[0]['stored'])
+
+    def test_boundaries_split_across_reads(self):
+        first = bytes(range(256)) * 8 + b'\r\n-'
+        second = b'\r\n\r\n--' + BOUNDARY.encode()[:10]
+        data = body(file_part('file', 'a.sfdl', first), field_part('note', b'x' * 100),
+                    file_part('file', 'b.sfdl', second))
+        expected = None
+        # Every chunk size puts the delimiters at a different position in the reads
+        for chunk_size in list(range(1, 64)) + [255, 1024, len(data)]:
+            parser, files = parse(data, chunk_size)
+            result = (parser.fields, files, [part['size'] for part in parser.files])
+            if expected is None:
+                expected = result
+                self.assertEqual(files, {'a.sfdl': first, 'b.sfdl': second})
+                self.assertEqual(parser.fields, {'note': 'x' * 100})
+            self.assertEqual(result, expected, f"chunk size {chunk_size}")
+
+    def test_preamble_and_epilogue_ignored(self):
+        data = b'preamble\r\n' + body(field_part('a', b'1')) + b'epilogue'
+        parser, _ = parse(data, 7)
+        self.assertEqual(parser.fields, {'a': '1'})
+
+    def test_field_too_large(self):
+        data = body(field_part('big', b'x' * 2048))
+        with self.assertRaisesRegex(ValueError, 'too large'):
+            parse(data, 100, max_field_size=1024)
+
+    def test_headers_too_large(self):
+        parser = MultipartParser(BOUNDARY, Collector())
+        parser.feed(b'--' + BOUNDARY.encode() + b'\r\n')
+        with self.assertRaisesRegex(ValueError, 'headers too large'):
+            parser.feed(b'X-Filler: ' + b'a' * 20 * 1024)
+
+    def test_truncated_body_closes_file(self):
+        data = body(file_part('file', 'a.sfdl', b'content' * 100))
+        collector = Collector()
+        parser = MultipartParser(BOUNDARY, collector)
+        parser.feed(data[:len(data) // 2])
+        with self.assertRaisesRegex(ValueError, 'Incomplete'):
+            parser.close()
+        self.assertTrue(collector.files['a.sfdl'].closed)
+
+    def test_malformed_boundary(self):
+        parser = MultipartParser(BOUNDARY, Collector())
+        with self.assertRaisesRegex(ValueError, 'Malformed'):
+            parser.feed(b'--' + BOUNDARY.encode() + b'XX')
+
+
+class ParseBoundaryTest(unittest.TestCase):
+
+    def test_plain_and_quoted(self):
+        self.assertEqual(parse_boundary(f'multipart/form-data; boundary={BOUNDARY}'), BOUNDARY)
+        self.assertEqual(parse_boundary('multipart/form-data; boundary="a b;c"; charset=utf-8'), 'a b;c')
+
+    def test_missing(self):
+        self.assertIsNone(parse_boundary('multipart/form-data'))
+        self.assertIsNone(parse_boundary(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
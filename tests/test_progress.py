@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import threading
+import unittest
+
+from src.progress import ProgressCounter
+
+
+class ProgressCounterTest(unittest.TestCase):
+
+    def test_single_thread(self):
+        counter = ProgressCounter(100)
+        counter.add(5)
+        counter.cell()[0] += 10
+        self.assertEqual(counter.value(), 115)
+
+    def test_no_lost_updates(self):
+        counter = ProgressCounter()
+        start = threading.Barrier(8)
+
+        def writer():
+            cell = counter.cell()
+            start.wait()
+            for _ in range(20000):
+                cell[0] += 3
+
+        threads = [threading.Thread(target=writer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.value(), 8 * 20000 * 3)
+
+    def test_finished_threads_folded(self):
+        counter = ProgressCounter()
+        for _ in range(50):
+            thread = threading.Thread(target=counter.add, args=(2,))
+            thread.start()
+            thread.join()
+        self.assertEqual(counter.value(), 100)
+        self.assertEqual(counter.cells, [])
+        self.assertEqual(counter.base, 100)
+
+    def test_set(self):
+        counter = ProgressCounter()
+        counter.add(40)
+        thread = threading.Thread(target=counter.add, args=(7,))
+        thread.start()
+        thread.join()
+        counter.set(10)
+        self.assertEqual(counter.value(), 10)
+        counter.add(5)
+        self.assertEqual(counter.value(), 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
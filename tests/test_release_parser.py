@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import re
+import unittest
+
+from src.release_parser import parse_release
+
+
+def legacy_parse(name):
+    """The inline parsing detect_media_type did before src/release_parser.py"""
+    name_upper = name.upper()
+    is_doku = any(re.search(pattern, name_upper) for pattern in [
+        r'\bDOKU\b', r'\bDOCU\b', r'\bDOCUMENTARY\b', r'\bDOKUMENTATION\b'])
+
+    non_video = any(re.search(pattern, name_upper) for pattern in [
+        r'\b(WISO|ADOBE|MICROSOFT|OFFICE|WINDOWS|MACOS|LINUX|UBUNTU|FEDORA)\b',
+        r'\b(PHOTOSHOP|ILLUSTRATOR|PREMIERE|AFTER.?EFFECTS|INDESIGN)\b',
+        r'\b(SPARBUCH|STEUER|TAX|ACCOUNTING|BUSINESS)\b',
+        r'\b(ANTIVIRUS|KASPERSKY|NORTON|MCAFEE|AVAST|AVG)\b',
+        r'\b(VMWARE|VIRTUALBOX|DOCKER|KUBERNETES)\b',
+        r'\b(AUTOCAD|SOLIDWORKS|CATIA|REVIT|SKETCHUP)\b',
+        r'\b(V\d+\.\d+|BUILD\.\d+|VERSION\.\d+)\b',
+        r'\b(REPACK|CODEX|SKIDROW|PLAZA|CPY|GOLDBERG|STEAM.?RIP)\b',
+        r'\b(GOG|STEAM|EPIC|UPLAY|ORIGIN)\b',
+        r'\b(GAME|GAMEPLAY|UPDATE|DLC|EXPANSION)\b',
+        r'\b(CRACKED|CRACK|KEYGEN|PATCH)\b',
+        r'\b(AUDIOBOOK|HOERBUCH|EBOOK|EPUB|MOBI|PDF|AZW3)\b',
+        r'\b(ALBUM|DISCOGRAPHY|FLAC|320KBPS|MP3|M4A|AAC)\b',
+        r'\b(UDEMY|TUTORIAL|COURSE|TRAINING|LYNDA)\b',
+        r'\b(XXX|PORN|ADULT|18\+)\b',
+    ])
+
+    year_match = re.search(r'\b(19\d{2}|20\d{2})\b', name)
+    is_tv = bool(re.search(r'\bS\d{1,2}(E\d{1,2})?\b', name, flags=re.IGNORECASE))
+
+    clean_name = name.replace('.', ' ').replace('_', ' ')
+    clean_name = re.sub(r'\b(19|20)\d{2}\b', '', clean_name)
+    clean_name = re.sub(r'\bS\d{1,2}(E\d{1,2})?\b', '', clean_name, flags=re.IGNORECASE)
+    clean_name = re.sub(r'\b(German|English|GERMAN|ENGLISH|Deutsch|Multi|MULTi|DL|ML)\b', '', clean_name, flags=re.IGNORECASE)
+    clean_name = re.sub(r'\b(1080p|720p|2160p|4K|UHD|BluRay|BDRip|BDRiP|WEB-DL|WEBRip|WEB|HDTV|DVDRip|x264|x265|h264|h265|HEVC|AVC|AAC|DTS|AC3|Atmos|ATVP|NF|AMZN|DSNP|HMAX|HULU|PCOK|PMTP|STAN|iP|DSCP|CR|DD5\.1|DD|TrueHD|DTS-HD|FLAC|Opus|HDR|HDR10|HDR10\+|DV|SDR|REMUX|HYBRID|Retail|SUBBED|DUBBED|DiRFiX|COMPLETE|READ\.NFO|FS|WS)\b', '', clean_name, flags=re.IGNORECASE)
+    clean_name = re.sub(r'-[A-Za-z0-9]+\s*$', '', clean_name)
+    clean_name = re.sub(r'\b(REPACK|PROPER|iNTERNAL|LIMITED|UNRATED|DC|EXTENDED|REMASTERED)\b', '', clean_name, flags=re.IGNORECASE)
+
+    return {
+        'title': ' '.join(clean_name.split()).strip(),
+        'year': year_match.group(1) if year_match else None,
+        'is_tv': is_tv,
+        'is_doku': is_doku,
+        'non_video': non_video,
+    }
+
+
+RELEASES = [
+    'The.Matrix.1999.German.DL.1080p.BluRay.x264-GRP',
+    'Dark.S01E01.German.DL.720p.WEB.h264-GRP',
+    'Dark.S02.German.1080p.NF.WEBRip.x265-GRP',
+    'Breaking_Bad_S05E14_English_720p_HDTV_x264-GRP',
+    'Inception.2010.MULTi.2160p.UHD.BluRay.REMUX.HDR.HEVC.Atmos-GRP',
+    'Planet.Erde.III.DOKU.German.2023.1080p.WEB.x264-GRP',
+    'Some.Documentary.2019.DOCUMENTARY.English.720p.HDTV-GRP',
+    'Alien.1979.Directors.Cut.REMASTERED.German.DD5.1.1080p.BluRay.AVC-GRP',
+    'Der.Tatort.S2024E01.German.720p.HDTV.x264-GRP',
+    'Mad.Max.Fury.Road.2015.iNTERNAL.German.DL.AC3.Dubbed.1080p.BDRip.x264-GRP',
+    'Blade.Runner.2049.2017.German.TrueHD.Atmos.2160p.UHD.BluRay.x265-GRP',
+    'Adobe.Photoshop.2024.v25.1.Multilingual-GRP',
+    'Cyberpunk.2077.Update.v2.1-CODEX',
+    'WISO.Steuer.Sparbuch.2024-GRP',
+    'Some.Artist.Discography.FLAC-GRP',
+    'Harry.Potter.Hoerbuch.German-GRP',
+    'Udemy.Python.Course.2023-GRP',
+    'The.Office.US.S03E05.720p.WEB.h264-GRP',
+    'Game.of.Thrones.S08E06.German.DL.1080p.BluRay.x264-GRP',
+    'Stranger.Things.S04.COMPLETE.German.DL.1080p.NF.WEB.H264-GRP',
+    'Oppenheimer.2023.German.DL.EAC3.1080p.AMZN.WEB.H264-GRP',
+    'Movie_Title_2001_German_DVDRip_XviD-GRP',
+    'No.Group.At.All.2012.German.1080p',
+    'Title With Spaces 2020 German 1080p WEB x264-GRP',
+    'Star.Wars.Episode.IV.1977.UNRATED.EXTENDED.German.DL.1080p-GRP',
+]
+
+
+class LegacyParityTest(unittest.TestCase):
+
+    def test_matches_old_inline_parsing(self):
+        for name in RELEASES:
+            with self.subTest(name=name):
+                old = legacy_parse(name)
+                new = parse_release(name)
+                self.assertEqual(new['year'], old['year'])
+                self.assertEqual(new['is_tv'], old['is_tv'])
+                self.assertEqual(new['is_doku'], old['is_doku'])
+                self.assertEqual(new['non_video'], old['non_video'])
+                self.assertEqual(new['title'], old['title'])
+
+    def test_leftover_separators_dropped(self):
+        # The old chain removed DL and WEB separately and left a lone '-' behind
+        name = 'Dark.S01E01.German.WEB-DL.1080p.x264-GRP'
+        self.assertEqual(legacy_parse(name)['title'], 'Dark -')
+        self.assertEqual(parse_release(name)['title'], 'Dark')
+        self.assertIn('WEB-DL', parse_release(name)['tags'])
+
+
+class ParseReleaseTest(unittest.TestCase):
+
+    def test_episode(self):
+        release = parse_release('Dark.S02E07.German.DL.720p.WEB.h264-GRP')
+        self.assertEqual(release['title'], 'Dark')
+        self.assertEqual((release['season'], release['episode']), (2, 7))
+        self.assertTrue(release['is_tv'])
+        self.assertEqual(release['group'], 'GRP')
+        self.assertEqual(release['tags'], ['German', 'DL', '720p', 'WEB', 'h264'])
+
+    def test_season_pack(self):
+        release = parse_release('Dark.S03.German.1080p.NF.WEBRip.x265-GRP')
+        self.assertEqual((release['season'], release['episode']), (3, None))
+
+    def test_movie(self):
+        release = parse_release('The.Matrix.1999.German.DL.1080p.BluRay.x264-GRP')
+        self.assertEqual(release['title'], 'The Matrix')
+        self.assertEqual(release['year'], '1999')
+        self.assertFalse(release['is_tv'])
+        self.assertFalse(release['non_video'])
+
+    def test_non_video_match(self):
+        release = parse_release('Cyberpunk.2077.Update.v2.1-CODEX')
+        self.assertTrue(release['non_video'])
+        self.assertEqual(release['non_video_match'], 'UPDATE')
+
+
+if __name__ == '__main__':
+    unittest.main()
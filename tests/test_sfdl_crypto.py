@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import base64
+import hashlib
+import unittest
+
+from src.sfdl_crypto import HAS_CRYPTO, password_key, decrypt_many, decode_field, find_key, shutdown_search_pool
+
+if HAS_CRYPTO:
+    from src.sfdl_crypto import AES
+
+
+def encrypt(password, text, padding='pkcs7'):
+    """Encrypt like an SFDL tool: base64(IV + AES-128-CBC(text))"""
+    iv = os.urandom(16)
+    data = text.encode()
+    if padding == 'pkcs7':
+        pad = 16 - len(data) % 16
+        data += bytes([pad]) * pad
+    else:
+        data += b'\x00' * (-len(data) % 16)
+    cipher = AES.new(password_key(password), AES.MODE_CBC, iv)
+    return base64.b64encode(iv + cipher.encrypt(data)).decode()
+
+
+def reference_decrypt(password, encrypted_base64):
+    """Per-field AES-128-CBC decrypt as Downloader.aes128cbc_decrypt did before decrypt_many"""
+    try:
+        key = hashlib.md5(password.encode()).digest()
+        encrypted_data = base64.b64decode(encrypted_base64)
+        cipher = AES.new(key, AES.MODE_CBC, encrypted_data[:16])
+        decrypted = cipher.decrypt(encrypted_data)[16:]
+
+        padding_length = decrypted[-1]
+        if isinstance(padding_length, int) and padding_length < 16:
+            decrypted = decrypted[:-padding_length]
+
+        result = decrypted.decode('utf-8', errors='ignore')
+        result = result.replace('\x00', '')
+        result = ''.join(char for char in result if char.isprintable() or char in '\n\r\t')
+        result = result.strip()
+        return re.sub(r'[\u200b-\u200f\ufeff]', '', result)
+    except Exception:
+        return None
+
+
+@unittest.skipUnless(HAS_CRYPTO, "pycryptodome not installed")
+class DecryptManyTest(unittest.TestCase):
+
+    def test_matches_per_field_decrypt(self):
+        password = 'secret1'
+        values = [
+            encrypt(password, 'ftp.example.com'),
+            encrypt(password, '/pub/Show.S01E01.German.1080p.WEB.x264-GRP/show.r00'),
+            encrypt(password, 'exactly16bytes!!'),
+            encrypt(password, 'Überträger ✓'),
+            encrypt(password, 'zero padded', padding='zero'),
+            encrypt(password, ' padded value\t'),
+            encrypt('wrong', 'ftp.example.com'),
+            'not base64 !!',
+            base64.b64encode(os.urandom(16)).decode(),
+            base64.b64encode(os.urandom(40)).decode(),
+            '',
+        ]
+        expected = [reference_decrypt(password, value) for value in values]
+        self.assertEqual(decrypt_many(password_key(password), values), expected)
+        self.assertEqual(expected[0], 'ftp.example.com')
+
+        # One field at a time gives the same result as the batch
+        for value, result in zip(values, expected):
+            self.assertEqual(decrypt_many(password_key(password), [value]), [result])
+
+    def test_empty(self):
+        self.assertEqual(decrypt_many(password_key('x'), []), [])
+
+
+@unittest.skipUnless(HAS_CRYPTO, "pycryptodome not installed")
+class FindKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = decode_field(encrypt('right', 'ftp.example.com'))
+        self.keys = [password_key(f'wrong{i}') for i in range(3000)]
+
+    def tearDown(self):
+        shutdown_search_pool()
+
+    def test_sequential(self):
+        self.keys[1234] = password_key('right')
+        self.assertEqual(find_key(self.data, self.keys, workers=1), 1234)
+        self.assertIsNone(find_key(self.data, self.keys, 1235, workers=1))
+
+    def test_parallel_returns_lowest_index(self):
+        self.keys[900] = password_key('right')
+        self.keys[2500] = password_key('right')
+        self.assertEqual(find_key(self.data, self.keys, workers=2, parallel_min=0), 900)
+        # The pool is kept, a second search on it starts from a clean state
+        self.assertEqual(find_key(self.data, self.keys, 901, workers=2, parallel_min=0), 2500)
+        self.assertIsNone(find_key(self.data, self.keys, 2501, workers=2, parallel_min=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
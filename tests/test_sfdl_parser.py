@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from src.sfdl_parser import parse_sfdl_data
+
+
+def sfdl(auth_required, username='user1', password='secret'):
+    return f"""<?xml version="1.0"?>
+<SFDLFile>
+  <Description>Show.S01E01.German.1080p.WEB.x264-GRP</Description>
+  <Uploader>up</Uploader>
+  <Encrypted>false</Encrypted>
+  <ConnectionInfo>
+    <Host>ftp.example.com</Host>
+    <Port>2121</Port>
+    <Username>{username}</Username>
+    <Password>{password}</Password>
+    <AuthRequired>{auth_required}</AuthRequired>
+  </ConnectionInfo>
+  <Packages><SFDLPackage><FileList><FileInfo>
+    <FileName>show.r00</FileName>
+    <FileFullPath>/pub/Show</FileFullPath>
+    <FileSize>1000</FileSize>
+  </FileInfo></FileList></SFDLPackage></Packages>
+</SFDLFile>""".encode('utf-8')
+
+
+class AuthRequiredTest(unittest.TestCase):
+
+    def test_credentials_used_when_auth_required(self):
+        info = parse_sfdl_data(sfdl('true'))
+        self.assertTrue(info['auth_required'])
+        self.assertEqual(info['username'], 'user1')
+        self.assertEqual(info['password'], 'secret')
+
+    def test_anonymous_when_auth_not_required(self):
+        info = parse_sfdl_data(sfdl('false'))
+        self.assertFalse(info['auth_required'])
+        self.assertEqual(info['username'], 'anonymous')
+        self.assertEqual(info['password'], 'anonymous@anonymous.nix')
+
+    def test_anonymous_without_auth_required_tag(self):
+        data = sfdl('false').replace(b'<AuthRequired>false</AuthRequired>', b'')
+        info = parse_sfdl_data(data)
+        self.assertEqual(info['username'], 'anonymous')
+        self.assertEqual(info['password'], 'anonymous@anonymous.nix')
+
+    def test_defaults_for_empty_credentials(self):
+        info = parse_sfdl_data(sfdl('true', username='', password=''))
+        self.assertEqual(info['username'], 'anonymous')
+        self.assertEqual(info['password'], 'anonymous@anonymous.nix')
+
+    def test_connection_and_files(self):
+        info = parse_sfdl_data(sfdl('true'))
+        self.assertEqual(info['host'], 'ftp.example.com')
+        self.assertEqual(info['port'], 2121)
+        self.assertEqual(info['files'], [{'name': 'show.r00', 'size': 1000, 'path': '/pub/Show'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
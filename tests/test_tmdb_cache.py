@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.tmdb_cache import TMDBCache
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds=1):
+        self.now += seconds
+
+
+class TMDBCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.clock = Clock()
+        patcher = mock.patch('src.tmdb_cache.time.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cache(self, **kwargs):
+        cache = TMDBCache(os.path.join(self.tmp.name, 'cache', 'tmdb.sqlite'), **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_make_key(self):
+        key = TMDBCache.make_key('/search/movie', {'query': 'Dark', 'year': None, 'language': 'de-DE', 'page': ''})
+        self.assertEqual(key, 'search/movie?language=de-DE&query=Dark')
+        self.assertEqual(key, TMDBCache.make_key('search/movie', {'language': 'de-DE', 'query': 'Dark'}))
+
+    def test_get_and_set(self):
+        cache = self.cache()
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', {'results': []})
+        self.assertEqual(cache.get('a'), {'results': []})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_ttl_expiry(self):
+        cache = self.cache(ttl=60)
+        cache.set('a', {'id': 1})
+        self.clock.advance(60)
+        self.assertEqual(cache.get('a'), {'id': 1})
+        self.clock.advance(1)
+        self.assertIsNone(cache.get('a'))
+        # Expired entries are removed on access, not kept around
+        self.clock.now -= 61
+        self.assertIsNone(cache.get('a'))
+
+    def test_purge_expired(self):
+        cache = self.cache(ttl=60)
+        cache.set('old', {})
+        self.clock.advance(30)
+        cache.set('new', {})
+        self.clock.advance(31)
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertIsNone(cache.get('old'))
+        self.assertEqual(cache.get('new'), {})
+
+    def test_lru_eviction(self):
+        cache = self.cache(max_entries=3)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, {'key': key})
+            self.clock.advance()
+        # Reading a makes b the least recently used entry
+        cache.get('a')
+        self.clock.advance()
+        cache.set('d', {'key': 'd'})
+        self.assertIsNone(cache.get('b'))
+        for key in ('a', 'c', 'd'):
+            self.assertEqual(cache.get(key), {'key': key})
+
+    def test_persisted_on_disk(self):
+        path = os.path.join(self.tmp.name, 'cache', 'tmdb.sqlite')
+        cache = TMDBCache(path)
+        cache.set('a', {'id': 1})
+        cache.close()
+        self.assertEqual(self.cache().get('a'), {'id': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Password Search Benchmark
+
+Compares the sequential and the multi-process password search for encrypted
+SFDLs. The working password is placed at the end of a random list, so every
+run has to reject all other candidates.
+
+Usage: python utils/benchmark_passwords.py [sizes=1000,20000,100000] [workers=N]
+"""
+
+import os
+import sys
+import time
+import base64
+import random
+import string
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sfdl_crypto import HAS_CRYPTO, password_key, find_key, shutdown_search_pool  # noqa: E402
+
+
+def encrypt(password, text):
+    """Encrypt like an SFDL tool: base64(IV + AES-128-CBC(PKCS7(text)))"""
+    from src.sfdl_crypto import AES
+    
+    iv = os.urandom(16)
+    data = text.encode()
+    pad = 16 - len(data) % 16
+    data += bytes([pad]) * pad
+    cipher = AES.new(password_key(password), AES.MODE_CBC, iv)
+    return base64.b64encode(iv + cipher.encrypt(data)).decode()
+
+
+def random_password():
+    return ''.join(random.choice(string.ascii_letters + string.digits) for _ in range(random.randint(6, 16)))
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    sizes = [1000, 20000, 100000]
+    workers = os.cpu_count() or 1
+
+    for arg in sys.argv[1:]:
+        key, _, value = arg.partition('=')
+        if key == 'sizes':
+            sizes = [int(size) for size in value.split(',')]
+        elif key == 'workers':
+            workers = max(1, int(value))
+
+    if not HAS_CRYPTO:
+        print("Fehler: pycryptodome ist nicht installiert")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"Passwort-Suche Benchmark ({workers} Prozesse)")
+    print("=" * 60)
+
+    # The search pool is started once and kept, its start-up is reported on its own
+    data = base64.b64decode(encrypt('the-right-one', 'ftp.example.com'))
+    keys = [password_key(random_password()) for _ in range(1000)]
+    _, startup = timed(lambda: find_key(data, keys, workers=workers, parallel_min=0))
+    print(f"Pool-Start (einmalig): {startup * 1000:.1f} ms")
+    print(f"{'Passwörter':>12} {'sequentiell':>14} {'parallel':>14} {'Speedup':>9}")
+
+    for size in sizes:
+        passwords = [random_password() for _ in range(size - 1)] + ['the-right-one']
+        keys = [password_key(password) for password in passwords]
+
+        sequential, seq_time = timed(lambda: find_key(data, keys, workers=1))
+        parallel, par_time = timed(lambda: find_key(data, keys, workers=workers, parallel_min=0))
+
+        if sequential != size - 1 or parallel != size - 1:
+            print(f"  ✗ Falsches Ergebnis: {sequential} / {parallel}")
+        print(f"{size:>12} {seq_time * 1000:>11.1f} ms {par_time * 1000:>11.1f} ms {seq_time / par_time:>8.2f}x")
+
+    shutdown_search_pool()
+
+
+if __name__ == '__main__':
+    main()